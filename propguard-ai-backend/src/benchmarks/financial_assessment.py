@@ -0,0 +1,90 @@
+"""
+Benchmark for FinancialImpactAssessor
+Reports the per-call cost of assess and stress over a synthetic loan book, and
+how many times each underlying calculation runs per assessment
+
+Usage: python -m src.benchmarks.financial_assessment [loans]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from src.routes.data_pipeline import FinancialImpactAssessor
+from src.services.portfolio_stress import STRESS_SCENARIOS
+
+COUNTED_METHODS = ('_calculate_valuation', '_get_climate_risk', '_get_market_sentiment',
+                   '_evaluate_compliance', '_calculate_default_probability')
+
+
+def synthetic_loans(count: int, seed: int = 11):
+    """(property_data, loan_amount) pairs spread across Australia"""
+    rng = random.Random(seed)
+    suburbs = ['Sydney', 'Melbourne', 'Brisbane', 'Perth', 'Dubbo', 'Hobart']
+    return [
+        ({
+            'address': f"{i} Bench St {rng.choice(suburbs)}",
+            'lat': rng.uniform(-38.0, -12.0),
+            'lng': rng.uniform(115.0, 153.0),
+            'bedrooms': rng.randint(1, 6),
+            'bathrooms': rng.randint(1, 4),
+            'land_size': rng.randint(150, 1500),
+            'year_built': rng.randint(1920, 2024)
+        }, rng.uniform(200000, 1500000))
+        for i in range(count)
+    ]
+
+
+def count_calls(assessor: FinancialImpactAssessor, property_data, loan_amount):
+    """Calls made to each underlying calculation by one assess"""
+    counts = dict.fromkeys(COUNTED_METHODS, 0)
+
+    def counted(name, method):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+    for name in COUNTED_METHODS:
+        setattr(assessor, name, counted(name, getattr(assessor, name)))
+    try:
+        assessor.assess(property_data, loan_amount)
+    finally:
+        for name in COUNTED_METHODS:
+            delattr(assessor, name)
+    return counts
+
+
+def run_benchmark(count: int = 20000):
+    assessor = FinancialImpactAssessor()
+    loans = synthetic_loans(count)
+    # Warm the climate-risk cache so both passes measure the assessor itself
+    for property_data, loan_amount in loans:
+        assessor.assess(property_data, loan_amount)
+
+    start = time.perf_counter()
+    for property_data, loan_amount in loans:
+        assessor.assess(property_data, loan_amount)
+    assess_seconds = time.perf_counter() - start
+
+    scenario = STRESS_SCENARIOS['property_down_20']
+    start = time.perf_counter()
+    for property_data, loan_amount in loans:
+        assessor.stress(property_data, loan_amount, scenario)
+    stress_seconds = time.perf_counter() - start
+
+    return {
+        'assess_us': round(assess_seconds / count * 1e6, 2),
+        'stress_us': round(stress_seconds / count * 1e6, 2),
+        'calls_per_assess': count_calls(assessor, *loans[0])
+    }
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    result = run_benchmark(count)
+    print(f"assess: {result['assess_us']} us/loan, stress: {result['stress_us']} us/loan over {count} loans")
+    print("calls per assess: " + ", ".join(f"{name} x{calls}" for name, calls in result['calls_per_assess'].items()))
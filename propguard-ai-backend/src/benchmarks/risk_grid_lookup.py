@@ -0,0 +1,69 @@
+"""
+Benchmark for the precomputed climate-risk grid
+Compares bilinear grid lookups against evaluating RiskWorker's risk factors
+on the fly, and reports the interpolation error per layer
+
+Usage: python -m src.benchmarks.risk_grid_lookup [points] [resolution]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import numpy as np
+from src.services.xnode_workers import RiskWorker
+from src.services.risk_grid import RiskGrid, LAYERS, AUSTRALIA_BOUNDS, DEFAULT_RESOLUTION
+
+
+def run_benchmark(points: int = 20000, resolution: float = DEFAULT_RESOLUTION, seed: int = 11):
+    """Per-point cost of both paths plus mean/max absolute error of the grid"""
+    worker = RiskWorker("bench_risk")
+    grid = RiskGrid.build(worker._risk_layers, AUSTRALIA_BOUNDS, resolution)
+
+    rng = np.random.default_rng(seed)
+    lat_min, lat_max, lng_min, lng_max = AUSTRALIA_BOUNDS
+    lats = rng.uniform(lat_min, lat_max, points)
+    lngs = rng.uniform(lng_min, lng_max, points)
+    # Requests carry plain floats; numpy scalars would add their own arithmetic overhead
+    points_list = list(zip(lats.tolist(), lngs.tolist()))
+
+    start = time.perf_counter()
+    exact = [worker._risk_layers(lat, lng) for lat, lng in points_list]
+    on_the_fly_us = (time.perf_counter() - start) / points * 1e6
+
+    start = time.perf_counter()
+    looked_up = [grid.lookup(lat, lng) for lat, lng in points_list]
+    lookup_us = (time.perf_counter() - start) / points * 1e6
+
+    start = time.perf_counter()
+    grid.lookup_many(lats, lngs)
+    lookup_many_us = (time.perf_counter() - start) / points * 1e6
+
+    errors = {}
+    for name in LAYERS:
+        diff = np.abs(np.array([float(e[name]) for e in exact]) - np.array([g[name] for g in looked_up]))
+        errors[name] = {'mean_abs_error': round(float(diff.mean()), 5), 'max_abs_error': round(float(diff.max()), 5)}
+
+    return {
+        'grid_shape': list(grid.data.shape),
+        'grid_mb': round(grid.data.nbytes / 1e6, 1),
+        'build_seconds': grid.metadata['build_seconds'],
+        'on_the_fly_us_per_point': round(on_the_fly_us, 2),
+        'lookup_us_per_point': round(lookup_us, 2),
+        'lookup_many_us_per_point': round(lookup_many_us, 3),
+        'speedup': round(on_the_fly_us / lookup_us, 1),
+        'errors': errors
+    }
+
+
+if __name__ == "__main__":
+    points = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    resolution = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RESOLUTION
+    result = run_benchmark(points, resolution)
+    print(f"grid {result['grid_shape']} ({result['grid_mb']} MB, built in {result['build_seconds']}s)")
+    print(f"on the fly {result['on_the_fly_us_per_point']}us/point, grid lookup {result['lookup_us_per_point']}us/point "
+          f"({result['speedup']}x), vectorised lookup {result['lookup_many_us_per_point']}us/point")
+    for name, error in result['errors'].items():
+        print(f"  {name}: mean |error| {error['mean_abs_error']}, max |error| {error['max_abs_error']}")
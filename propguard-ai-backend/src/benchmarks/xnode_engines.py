@@ -0,0 +1,90 @@
+"""
+Benchmark for the XNode valuation engines
+Runs the same synthetic batch through every engine's calculate_batch and
+reports throughput and agreement with the batched MLP engine
+
+Usage: python -m src.benchmarks.xnode_engines [properties]
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import numpy as np
+from src.routes.xnode import LinearValuationWorker, PerPropertyValuationWorker, ValuationWorker
+
+ENGINES = {
+    'simple-linear': lambda: LinearValuationWorker("bench_lin"),
+    'numpy-mlp': lambda: PerPropertyValuationWorker("bench_mlp"),
+    'batched-mlp': lambda: ValuationWorker("bench_batched")
+}
+
+
+def synthetic_items(count: int, seed: int = 7):
+    """Valuation requests with a realistic spread of attributes and comparables"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        comparables = [
+            {
+                'price': rng.randint(500000, 2000000),
+                'sale_date': f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}",
+                'floor_area': rng.randint(80, 300),
+                'bedrooms': rng.randint(1, 5),
+                'bathrooms': rng.randint(1, 3)
+            }
+            for _ in range(rng.randint(3, 20))
+        ]
+        items.append({
+            'property_data': {
+                'address': f"{i} Bench St Sydney",
+                'bedrooms': rng.randint(1, 6),
+                'bathrooms': rng.randint(1, 4),
+                'land_size': rng.randint(200, 1200),
+                'floor_area': rng.randint(80, 350),
+                'year_built': rng.randint(1920, 2024)
+            },
+            'comparables': comparables,
+            'risk_data': {'composite': rng.random() * 0.6},
+            'market_factors': {'interest_rates': 0.04 + rng.random() * 0.03}
+        })
+    return items
+
+
+def run_benchmark(count: int = 2000):
+    """Throughput of each engine, and its mean absolute deviation from batched-mlp"""
+    items = synthetic_items(count)
+    values = {}
+    results = {}
+
+    for name, factory in ENGINES.items():
+        worker = factory()
+        # The result cache would turn a second pass into lookups; measure cold inference only
+        worker.computation_cache.clear()
+        start = time.perf_counter()
+        output = asyncio.run(worker.calculate_batch(items, worker.prepare_batch(items), mode='inference'))
+        elapsed = time.perf_counter() - start
+
+        values[name] = np.array([result['value'] for result in output], dtype=np.float64)
+        results[name] = {
+            'seconds': round(elapsed, 4),
+            'properties_per_second': round(count / elapsed, 1),
+            'errors': sum(1 for result in output if 'error' in result)
+        }
+
+    reference = values['batched-mlp']
+    for name in ENGINES:
+        results[name]['mean_abs_deviation'] = round(float(np.mean(np.abs(values[name] - reference))), 2)
+    return results
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for name, result in run_benchmark(count).items():
+        print(f"[{name}] {result['properties_per_second']} properties/s "
+              f"({result['seconds']}s for {count}), "
+              f"mean |value - batched-mlp| {result['mean_abs_deviation']}, errors {result['errors']}")
@@ -0,0 +1,62 @@
+"""
+Benchmark for ValuationWorker._forward_pass
+Compares the NumPy/BLAS forward pass against the pure Python reference path,
+and the fused inference path against training-mode dropout
+
+Usage: python -m src.benchmarks.xnode_forward_pass [iterations]
+"""
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import numpy as np
+from src.services.xnode_workers import ValuationWorker
+
+
+def _time_per_call(fn, features, iterations, mode='inference'):
+    """Average wall time per call in microseconds"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(features, mode=mode)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def run_benchmark(iterations: int = 2000, dtype=np.float64):
+    """Check parity and measure per-call cost of both forward pass implementations"""
+    worker = ValuationWorker("bench_node", dtype=dtype)
+    features = [random.random() for _ in range(50)]
+
+    reference = worker._forward_pass_reference(features, mode='inference')
+    vectorized = worker._forward_pass(features, mode='inference')
+    tolerance = 1e-6 if worker.dtype == np.float64 else 1.0
+
+    reference_us = _time_per_call(worker._forward_pass_reference, features, max(1, iterations // 10))
+    vectorized_us = _time_per_call(worker._forward_pass, features, iterations)
+    train_us = _time_per_call(worker._forward_pass, features, iterations, mode='train')
+
+    return {
+        'dtype': worker.dtype.name,
+        'reference_value': reference,
+        'vectorized_value': vectorized,
+        'abs_difference': abs(reference - vectorized),
+        'within_tolerance': abs(reference - vectorized) <= tolerance,
+        'reference_us_per_call': round(reference_us, 2),
+        'vectorized_us_per_call': round(vectorized_us, 2),
+        'speedup': round(reference_us / vectorized_us, 1),
+        'train_us_per_call': round(train_us, 2)
+    }
+
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    for dtype in (np.float64, np.float32):
+        result = run_benchmark(iterations, dtype)
+        print(f"[{result['dtype']}] reference {result['reference_us_per_call']}us/call, "
+              f"numpy {result['vectorized_us_per_call']}us/call, "
+              f"speedup {result['speedup']}x, train-mode {result['train_us_per_call']}us/call, "
+              f"|diff| {result['abs_difference']:.3g} "
+              f"({'ok' if result['within_tolerance'] else 'MISMATCH'})")
@@ -7,16 +7,30 @@ Features: Async streaming, fallback models, sentiment analysis, and GPU accelera
 import requests
 import json
 import time
-from typing import Dict, Any, List, Optional
+from contextlib import closing
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import logging
+from src.services.metrics import registry
+from src.services.ollama_client import OllamaClient, get_ollama_client, OLLAMA_BASE_URL
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+LLM_REQUEST_SECONDS = registry.histogram('llm_request_seconds', 'Ollama generate latency', ('model',))
+LLM_REQUESTS = registry.counter('llm_requests_total', 'Ollama generate calls by outcome', ('model', 'outcome'))
+LLM_TOKENS = registry.counter('llm_tokens_generated_total', 'Tokens generated, as reported by Ollama eval_count', ('model',))
+LLM_EVAL_SECONDS = registry.counter('llm_eval_seconds_total', 'Time Ollama spent generating tokens (eval_duration)', ('model',))
+LLM_FALLBACKS = registry.counter('llm_fallbacks_total', 'Responses served by the fallback model or the canned reply', ('kind',))
+LLM_IN_FLIGHT = registry.gauge('llm_in_flight', 'Ollama generate calls currently waiting on a response')
+LLM_TIME_TO_FIRST_TOKEN = registry.histogram('llm_time_to_first_token_seconds', 'Streamed generate: request to first token', ('model',))
+LLM_STREAM_TOKENS_PER_SECOND = registry.histogram('llm_stream_tokens_per_second', 'Streamed generate: tokens per second after the first token', ('model',))
+
 class OllamaGenerator:
-    def __init__(self, base_url: str = "http://localhost:11434"):
+    def __init__(self, base_url: str = OLLAMA_BASE_URL):
         self.base_url = base_url
+        # The shared pooled client, unless pointed at a different server
+        self.client = get_ollama_client() if base_url == OLLAMA_BASE_URL else OllamaClient(base_url)
         self.available_models = ["deepseek-r1:8b", "llama3.2:1b", "codellama:7b"]
         self.active_model = "llama3.2:1b"  # Default to fastest model
         self.fallback_model = "llama3.2:1b"
@@ -24,8 +38,7 @@ class OllamaGenerator:
     def health_check(self) -> bool:
         """Verify Ollama service availability"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
+            return self.client.get('/api/tags').status_code == 200
         except requests.RequestException:
             return False
 
@@ -50,10 +63,38 @@ class OllamaGenerator:
         Generate LLM responses with fallback handling
         Supports both JSON and text output formats
         """
+        model = self.active_model
+        payload = self._build_payload(model, prompt, system_prompt, temperature, max_tokens, format_json)
+        started = time.perf_counter()
+        try:
+            with LLM_IN_FLIGHT.track_inprogress():
+                response = self.client.generate(payload)
+            LLM_REQUEST_SECONDS.labels(model=model).observe(time.perf_counter() - started)
+            
+            if response.status_code == 200:
+                result = response.json()
+                LLM_REQUESTS.labels(model=model, outcome='success').inc()
+                # Ollama reports generated tokens and generation time (ns) on the final response
+                LLM_TOKENS.labels(model=model).inc(result.get("eval_count", 0))
+                LLM_EVAL_SECONDS.labels(model=model).inc(result.get("eval_duration", 0) / 1e9)
+                return result.get("response", "")
+            else:
+                logger.error(f"Ollama API error: {response.status_code}")
+                LLM_REQUESTS.labels(model=model, outcome='http_error').inc()
+                return self._fallback_response(prompt, system_prompt, temperature, max_tokens, format_json)
+                
+        except requests.RequestException as e:
+            logger.error(f"Ollama connection error: {e}")
+            LLM_REQUESTS.labels(model=model, outcome='connection_error').inc()
+            return self._fallback_response(prompt, system_prompt, temperature, max_tokens, format_json)
+
+    @staticmethod
+    def _build_payload(model: str, prompt: str, system_prompt: Optional[str], temperature: float,
+                       max_tokens: int, format_json: bool, stream: bool = False) -> Dict[str, Any]:
         payload = {
-            "model": self.active_model,
+            "model": model,
             "prompt": prompt,
-            "stream": False,
+            "stream": stream,
             "options": {
                 "temperature": temperature,
                 "num_ctx": max_tokens,
@@ -66,29 +107,93 @@ class OllamaGenerator:
         
         if format_json:
             payload["format"] = "json"
-        
+        return payload
+
+    def generate_stream(
+        self,
+        prompt: str,
+        system_prompt: str = None,
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        model: str = None,
+        stats: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """
+        Yield response text as Ollama produces it, with the same fallback chain as generate
+        stats, if given, is filled in once the stream ends: model, tokens, time to first token, tokens/sec
+        """
+        model = model or self.active_model
+        stats = {} if stats is None else stats
+        payload = self._build_payload(model, prompt, system_prompt, temperature, max_tokens, False, stream=True)
+        chunks = self.client.iter_generate(payload)
+        started = time.perf_counter()
+        first_token_at = None
+        tokens = 0
+        final = {}
         try:
-            response = requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "")
-            else:
-                logger.error(f"Ollama API error: {response.status_code}")
-                return self._fallback_response(prompt, system_prompt, temperature, max_tokens, format_json)
-                
+            with closing(chunks), LLM_IN_FLIGHT.track_inprogress():
+                for chunk in chunks:
+                    piece = chunk.get("response", "")
+                    if piece:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            LLM_TIME_TO_FIRST_TOKEN.labels(model=model).observe(first_token_at - started)
+                        tokens += 1
+                        yield piece
+                    if chunk.get("done"):
+                        final = chunk
+                        break
+        except GeneratorExit:
+            # The client went away; closing the chunk stream hands the connection back
+            LLM_REQUESTS.labels(model=model, outcome='cancelled').inc()
+            raise
         except requests.RequestException as e:
-            logger.error(f"Ollama connection error: {e}")
-            return self._fallback_response(prompt, system_prompt, temperature, max_tokens, format_json)
+            outcome = 'http_error' if isinstance(e, requests.HTTPError) else 'connection_error'
+            LLM_REQUESTS.labels(model=model, outcome=outcome).inc()
+            if first_token_at is not None:
+                # Text already sent cannot be taken back, so a broken stream is not retried on another model
+                raise
+            logger.error(f"Ollama streaming error: {e}")
+            yield from self._fallback_stream(model, prompt, system_prompt, temperature, max_tokens, stats)
+            return
+
+        finished = time.perf_counter()
+        LLM_REQUEST_SECONDS.labels(model=model).observe(finished - started)
+        LLM_REQUESTS.labels(model=model, outcome='success').inc()
+        LLM_TOKENS.labels(model=model).inc(final.get("eval_count", tokens))
+        LLM_EVAL_SECONDS.labels(model=model).inc(final.get("eval_duration", 0) / 1e9)
+        tokens_per_second = None
+        if tokens > 1 and finished > first_token_at:
+            tokens_per_second = (tokens - 1) / (finished - first_token_at)
+            LLM_STREAM_TOKENS_PER_SECOND.labels(model=model).observe(tokens_per_second)
+        stats.update(
+            model=model,
+            tokens=tokens,
+            time_to_first_token_seconds=round(first_token_at - started, 4) if first_token_at is not None else None,
+            tokens_per_second=round(tokens_per_second, 2) if tokens_per_second else None,
+            elapsed_seconds=round(finished - started, 4),
+            fallback=False
+        )
+
+    def _fallback_stream(self, model: str, prompt: str, system_prompt: str, temperature: float,
+                         max_tokens: int, stats: Dict[str, Any]) -> Iterator[str]:
+        """Stream from the fallback model, or yield the canned reply"""
+        if model != self.fallback_model:
+            logger.info("Attempting fallback model")
+            LLM_FALLBACKS.labels(kind='model').inc()
+            yield from self.generate_stream(prompt, system_prompt, temperature, max_tokens, self.fallback_model, stats)
+        else:
+            logger.warning("All models unavailable, using mock response")
+            LLM_FALLBACKS.labels(kind='canned').inc()
+            stats.update(model=None, tokens=0, time_to_first_token_seconds=None, tokens_per_second=None,
+                         elapsed_seconds=None, fallback=True)
+            yield "Service temporarily unavailable. Please try again later."
 
     def _fallback_response(self, prompt: str, system_prompt: str, temperature: float, max_tokens: int, format_json: bool) -> str:
         """Fallback to secondary model or mock response"""
         if self.active_model != self.fallback_model:
             logger.info("Attempting fallback model")
+            LLM_FALLBACKS.labels(kind='model').inc()
             original_model = self.active_model
             self.switch_model(self.fallback_model)
             result = self.generate(prompt, system_prompt, temperature, max_tokens, format_json)
@@ -96,6 +201,7 @@ class OllamaGenerator:
             return result
         else:
             logger.warning("All models unavailable, using mock response")
+            LLM_FALLBACKS.labels(kind='canned').inc()
             if format_json:
                 return '{"error": "Service unavailable", "fallback": true}'
             return "Service temporarily unavailable. Please try again later."
@@ -131,8 +237,9 @@ class OllamaGenerator:
             logger.warning("Failed to parse sentiment analysis, using defaults")
             return {"sentiment": 0.0, "risk_level": 5}
 
-    def generate_dynamic_lvr_report(self, property_data: Dict[str, Any]) -> str:
-        """Generate Dynamic LVR certificate narrative"""
+    @staticmethod
+    def _lvr_report_prompts(property_data: Dict[str, Any]) -> Tuple[str, str]:
+        """(system, user) prompts for the Dynamic LVR report"""
         system_prompt = (
             "You are a banking compliance officer generating a Dynamic Loan-to-Value Ratio report. "
             "Write a professional, detailed report suitable for regulatory submission."
@@ -162,9 +269,19 @@ REPORT SECTIONS:
 Write a professional report (500-800 words) addressing each section with specific recommendations.
 """
         
+        return system_prompt, user_prompt
+
+    def generate_dynamic_lvr_report(self, property_data: Dict[str, Any]) -> str:
+        """Generate Dynamic LVR certificate narrative"""
+        system_prompt, user_prompt = self._lvr_report_prompts(property_data)
         response = self.generate(user_prompt, system_prompt, temperature=0.3, max_tokens=2048)
         return response
 
+    def stream_dynamic_lvr_report(self, property_data: Dict[str, Any], stats: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Dynamic LVR certificate narrative, streamed as it is generated"""
+        system_prompt, user_prompt = self._lvr_report_prompts(property_data)
+        return self.generate_stream(user_prompt, system_prompt, temperature=0.3, max_tokens=2048, stats=stats)
+
     def analyze_market_sentiment(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze market sentiment from various data points"""
         system_prompt = (
@@ -211,8 +328,9 @@ JSON response only:
                 "summary": "Market analysis unavailable due to processing error"
             }
 
-    def generate_risk_assessment(self, property_data: Dict[str, Any], climate_data: Dict[str, Any]) -> str:
-        """Generate comprehensive risk assessment narrative"""
+    @staticmethod
+    def _risk_assessment_prompts(property_data: Dict[str, Any], climate_data: Dict[str, Any]) -> Tuple[str, str]:
+        """(system, user) prompts for the risk assessment narrative"""
         system_prompt = (
             "You are a risk assessment specialist for property lending. Generate a detailed risk assessment "
             "report considering property characteristics and climate risks."
@@ -244,9 +362,20 @@ ASSESSMENT REQUIREMENTS:
 Provide a structured assessment (400-600 words):
 """
         
+        return system_prompt, user_prompt
+
+    def generate_risk_assessment(self, property_data: Dict[str, Any], climate_data: Dict[str, Any]) -> str:
+        """Generate comprehensive risk assessment narrative"""
+        system_prompt, user_prompt = self._risk_assessment_prompts(property_data, climate_data)
         response = self.generate(user_prompt, system_prompt, temperature=0.4, max_tokens=1500)
         return response
 
+    def stream_risk_assessment(self, property_data: Dict[str, Any], climate_data: Dict[str, Any],
+                               stats: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Risk assessment narrative, streamed as it is generated"""
+        system_prompt, user_prompt = self._risk_assessment_prompts(property_data, climate_data)
+        return self.generate_stream(user_prompt, system_prompt, temperature=0.4, max_tokens=1500, stats=stats)
+
     def explain_valuation_methodology(self, valuation_data: Dict[str, Any]) -> str:
         """Generate explanation of valuation methodology for transparency"""
         system_prompt = (
@@ -10,7 +10,7 @@ from src.routes.user import user_bp
 from src.routes.propguard import propguard_bp
 from src.routes.ai_features import ai_features_bp
 from src.routes.blockchain import blockchain_bp
-from src.routes.xnode_simple import xnode_bp
+from src.routes.xnode import xnode_bp
 from src.routes.data_pipeline import data_pipeline_bp
 from src.routes.llm_integration import llm_bp
 from src.routes.heygen import heygen_bp
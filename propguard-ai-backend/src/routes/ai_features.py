@@ -1,14 +1,19 @@
-from flask import Blueprint, request, jsonify
-import requests
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 import json
 import random
 import math
+import numpy as np
 from datetime import datetime, timedelta
+from src.services.spatial_index import get_geo_reference
+from src.services.address_index import lookup_address, place_country
+from src.services.ollama_client import get_ollama_client
+from src.services.risk_cache import RiskCache, risk_noise
+from src.services.monte_carlo import MonteCarloEngine, DEFAULT_SIMULATIONS, HAZARD_SHOCKS
 
 ai_features_bp = Blueprint('ai_features', __name__)
 
 # Ollama API configuration
-OLLAMA_BASE_URL = "http://localhost:11434"
+ollama_client = get_ollama_client()
 
 class PropertyGeocoder:
     """Property geocoding service for global addresses"""
@@ -16,87 +21,28 @@ class PropertyGeocoder:
     @staticmethod
     def address_to_coords(address):
         """Convert address to coordinates with mock data for demo"""
-        # Mock geocoding based on global cities
-        city_coords = {
-            # North America
-            'new york': {'lat': 40.7128, 'lng': -74.0060},
-            'manhattan': {'lat': 40.7831, 'lng': -73.9712},
-            'brooklyn': {'lat': 40.6782, 'lng': -73.9442},
-            'los angeles': {'lat': 34.0522, 'lng': -118.2437},
-            'hollywood': {'lat': 34.0928, 'lng': -118.3287},
-            'toronto': {'lat': 43.6532, 'lng': -79.3832},
-            'chicago': {'lat': 41.8781, 'lng': -87.6298},
-            'miami': {'lat': 25.7617, 'lng': -80.1918},
-            'seattle': {'lat': 47.6062, 'lng': -122.3321},
-            
-            # Europe
-            'london': {'lat': 51.5074, 'lng': -0.1278},
-            'westminster': {'lat': 51.4994, 'lng': -0.1245},
-            'berlin': {'lat': 52.5200, 'lng': 13.4050},
-            'paris': {'lat': 48.8566, 'lng': 2.3522},
-            'madrid': {'lat': 40.4168, 'lng': -3.7038},
-            'rome': {'lat': 41.9028, 'lng': 12.4964},
-            
-            # Asia-Pacific
-            'sydney': {'lat': -33.8688, 'lng': 151.2093},
-            'melbourne': {'lat': -37.8136, 'lng': 144.9631},
-            'brisbane': {'lat': -27.4698, 'lng': 153.0251},
-            'perth': {'lat': -31.9505, 'lng': 115.8605},
-            'adelaide': {'lat': -34.9285, 'lng': 138.6007},
-            'tokyo': {'lat': 35.6762, 'lng': 139.6503},
-            'singapore': {'lat': 1.3521, 'lng': 103.8198},
-            'hong kong': {'lat': 22.3193, 'lng': 114.1694},
-            'seoul': {'lat': 37.5665, 'lng': 126.9780},
-            
-            # Other regions
-            'dubai': {'lat': 25.2048, 'lng': 55.2708},
-            'mumbai': {'lat': 19.0760, 'lng': 72.8777},
-            'sao paulo': {'lat': -23.5505, 'lng': -46.6333},
-            'mexico city': {'lat': 19.4326, 'lng': -99.1332}
-        }
-        
-        address_lower = address.lower()
-        for city, coords in city_coords.items():
-            if city in address_lower:
-                # Add small random variation
-                coords['lat'] += (random.random() - 0.5) * 0.1
-                coords['lng'] += (random.random() - 0.5) * 0.1
-                return {
-                    'lat': coords['lat'],
-                    'lng': coords['lng'],
-                    'formatted_address': address,
-                    'country': PropertyGeocoder._detect_country(city)
-                }
-        
-        # Default to New York with variation
+        # No random variation: the same address must land in the same risk cache cell
+        lat, lng, country = PropertyGeocoder.place_coords(address)
         return {
-            'lat': 40.7128 + (random.random() - 0.5) * 0.5,
-            'lng': -74.0060 + (random.random() - 0.5) * 0.5,
+            'lat': lat,
+            'lng': lng,
             'formatted_address': address,
-            'country': 'US'
+            'country': country or 'US'
         }
     
+    @staticmethod
+    def place_coords(address):
+        """(lat, lng, country) of the place named in the address; New York and None when none is recognised"""
+        # Mock geocoding based on global cities, from the shared place table
+        location = lookup_address(address)
+        if location.city is not None:
+            return location.lat, location.lng, location.country
+        return 40.7128, -74.0060, None
+    
     @staticmethod
     def _detect_country(city):
         """Detect country based on city name"""
-        country_mapping = {
-            # North America
-            'new york': 'US', 'manhattan': 'US', 'brooklyn': 'US', 'los angeles': 'US', 
-            'hollywood': 'US', 'chicago': 'US', 'miami': 'US', 'seattle': 'US',
-            'toronto': 'CA',
-            
-            # Europe
-            'london': 'UK', 'westminster': 'UK', 'berlin': 'DE', 'paris': 'FR',
-            'madrid': 'ES', 'rome': 'IT',
-            
-            # Asia-Pacific
-            'sydney': 'AU', 'melbourne': 'AU', 'brisbane': 'AU', 'perth': 'AU', 'adelaide': 'AU',
-            'tokyo': 'JP', 'singapore': 'SG', 'hong kong': 'HK', 'seoul': 'KR',
-            
-            # Other
-            'dubai': 'AE', 'mumbai': 'IN', 'sao paulo': 'BR', 'mexico city': 'MX'
-        }
-        return country_mapping.get(city, 'US')
+        return place_country(city)
 
 class CoreLogicClient:
     """Global Property Data API client"""
@@ -108,10 +54,9 @@ class CoreLogicClient:
         country = coords.get('country', 'US')
         
         # Determine property characteristics based on address and location
-        is_apartment = any(word in address.lower() for word in ['apt', 'unit', 'apartment', 'condo', '/'])
-        is_premium = any(word in address.lower() for word in [
-            'manhattan', 'westminster', 'beverly hills', 'tokyo', 'singapore', 'sydney'
-        ])
+        location = lookup_address(address)
+        is_apartment = location.is_apartment
+        is_premium = location.is_premium_market
         
         # Base pricing by country and premium status
         base_prices = {
@@ -160,15 +105,36 @@ class CoreLogicClient:
         
         return comparables
 
+climate_risk_cache = RiskCache('ai_features')
+
 class ClimateRiskCalculator:
     """Climate risk assessment for properties"""
     
     @staticmethod
     def get_risk_factors(lat, lng):
-        """Calculate comprehensive climate risk factors"""
+        """Calculate comprehensive climate risk factors, memoised per geohash cell"""
+        return climate_risk_cache.get_or_compute(lat, lng, ClimateRiskCalculator._compute_risk_factors)
+    
+    @staticmethod
+    def _compute_risk_factors(lat, lng):
+        """Uncached get_risk_factors"""
+        factors = ClimateRiskCalculator._risk_factors(float(lat), float(lng))
+        return {name: float(value) for name, value in factors.items()}
+    
+    @staticmethod
+    def get_risk_factors_batch(lats, lngs):
+        """Vectorised get_risk_factors over equal-length lat/lng arrays, returning one array per risk"""
+        lat = np.asarray(lats, dtype=np.float64).reshape(-1)
+        lng = np.asarray(lngs, dtype=np.float64).reshape(-1)
+        if lat.shape != lng.shape:
+            raise ValueError("lats and lngs must have the same length")
+        return ClimateRiskCalculator._risk_factors(lat, lng)
+    
+    @staticmethod
+    def _risk_factors(lat, lng):
+        """Every risk factor for a scalar lat/lng or equally shaped arrays; the scalar and batch paths share it"""
         # Distance from coast calculation
         coast_distance = ClimateRiskCalculator._calculate_distance_from_coast(lat, lng)
-        is_northern = lat > -25
         is_coastal = coast_distance < 20
         is_urban = ClimateRiskCalculator._is_urban_area(lat, lng)
         
@@ -181,8 +147,6 @@ class ClimateRiskCalculator:
         heatwave_risk = ClimateRiskCalculator._calculate_heatwave_risk(lat, coast_distance)
         
         risks = [flood_risk, fire_risk, coastal_risk, subsidence_risk, cyclone_risk, heatwave_risk]
-        composite_risk = ClimateRiskCalculator._calculate_composite_risk(risks)
-        
         return {
             'flood': flood_risk,
             'fire': fire_risk,
@@ -190,101 +154,59 @@ class ClimateRiskCalculator:
             'subsidence': subsidence_risk,
             'cyclone': cyclone_risk,
             'heatwave': heatwave_risk,
-            'composite': composite_risk
+            'composite': ClimateRiskCalculator._calculate_composite_risk(risks)
         }
     
     @staticmethod
     def _calculate_distance_from_coast(lat, lng):
         """Calculate approximate distance from Australian coast"""
-        australian_coasts = [
-            {'lat': -33.8688, 'lng': 151.2093},  # Sydney
-            {'lat': -37.8136, 'lng': 144.9631},  # Melbourne
-            {'lat': -31.9505, 'lng': 115.8605},  # Perth
-            {'lat': -27.4698, 'lng': 153.0251},  # Brisbane
-        ]
-        
-        distances = []
-        for coast in australian_coasts:
-            distance = math.sqrt((lat - coast['lat'])**2 + (lng - coast['lng'])**2) * 111
-            distances.append(distance)
-        
-        return min(distances)
+        return get_geo_reference().distance_to_coast(lat, lng)
     
     @staticmethod
     def _is_urban_area(lat, lng):
         """Check if location is in major urban area"""
-        urban_centers = [
-            {'lat': -33.8688, 'lng': 151.2093, 'radius': 0.5},  # Sydney
-            {'lat': -37.8136, 'lng': 144.9631, 'radius': 0.5},  # Melbourne
-            {'lat': -27.4698, 'lng': 153.0251, 'radius': 0.3},  # Brisbane
-            {'lat': -31.9505, 'lng': 115.8605, 'radius': 0.3},  # Perth
-            {'lat': -34.9285, 'lng': 138.6007, 'radius': 0.2},  # Adelaide
-        ]
-        
-        for center in urban_centers:
-            distance = math.sqrt((lat - center['lat'])**2 + (lng - center['lng'])**2)
-            if distance < center['radius']:
-                return True
-        return False
+        return get_geo_reference().in_urban_area(lat, lng)
     
     @staticmethod
     def _calculate_flood_risk(lat, lng, is_coastal):
         """Calculate flood risk based on location"""
-        base_risk = 0.1
-        if is_coastal:
-            base_risk += 0.3
+        base_risk = 0.1 + 0.3 * is_coastal
         # River proximity simulation
-        if abs(math.sin(lat * 10) * math.cos(lng * 10)) > 0.5:
-            base_risk += 0.2
-        return min(1.0, base_risk + random.random() * 0.2)
+        base_risk = base_risk + 0.2 * (np.abs(np.sin(lat * 10) * np.cos(lng * 10)) > 0.5)
+        return np.minimum(1.0, base_risk + risk_noise(lat, lng, 'flood') * 0.2)
     
     @staticmethod
     def _calculate_fire_risk(lat, lng, is_urban):
         """Calculate bushfire risk"""
-        base_risk = 0.1 if is_urban else 0.3
+        base_risk = np.where(is_urban, 0.1, 0.3)
         # Inland and dry areas have higher risk
-        if lng > 140:  # Rough inland approximation
-            base_risk += 0.2
-        return min(1.0, base_risk + random.random() * 0.2)
+        base_risk = base_risk + 0.2 * (lng > 140)  # Rough inland approximation
+        return np.minimum(1.0, base_risk + risk_noise(lat, lng, 'fire') * 0.2)
     
     @staticmethod
     def _calculate_coastal_risk(coast_distance):
         """Calculate coastal erosion risk"""
-        if coast_distance > 10:
-            return 0
-        elif coast_distance > 5:
-            return 0.1
-        elif coast_distance > 1:
-            return 0.3
-        else:
-            return 0.7
+        return np.select([coast_distance > 10, coast_distance > 5, coast_distance > 1], [0.0, 0.1, 0.3], 0.7)
     
     @staticmethod
     def _calculate_subsidence_risk(lat, lng):
         """Calculate subsidence risk"""
-        base_risk = 0.1
-        # Mining areas (simplified)
-        if -32 < lat < -28 and 148 < lng < 152:  # Hunter Valley approximation
-            base_risk += 0.4
-        return min(1.0, base_risk + random.random() * 0.1)
+        # Mining areas (simplified): Hunter Valley approximation
+        mining = (lat > -32) & (lat < -28) & (lng > 148) & (lng < 152)
+        return np.minimum(1.0, 0.1 + 0.4 * mining + risk_noise(lat, lng, 'subsidence') * 0.1)
     
     @staticmethod
     def _calculate_cyclone_risk(lat):
         """Calculate cyclone risk based on latitude"""
-        if lat > -20:
-            return min(0.8, max(0.3, (lat + 20) / 15))
-        elif lat > -25:
-            return 0.2
-        else:
-            return 0.05
+        return np.where(lat > -20, np.clip((lat + 20) / 15, 0.3, 0.8), np.where(lat > -25, 0.2, 0.05))
     
     @staticmethod
     def _calculate_heatwave_risk(lat, coast_distance):
         """Calculate heatwave risk"""
         base_risk = 0.2
-        base_risk += min(0.4, coast_distance / 100)  # Inland factor
-        base_risk += min(0.4, (35 - abs(lat)) / 20)  # Northern factor
-        return min(1.0, base_risk)
+        base_risk = base_risk + np.minimum(0.4, coast_distance / 100)  # Inland factor
+        base_risk = base_risk + np.minimum(0.4, (35 - np.abs(lat)) / 20)  # Northern factor
+        return np.minimum(1.0, base_risk)
     
     @staticmethod
     def _calculate_composite_risk(risks):
@@ -295,9 +217,8 @@ class ClimateRiskCalculator:
 def call_ollama_ai(model, prompt):
     """Enhanced Ollama API call with better error handling"""
     try:
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            json={
+        response = ollama_client.generate(
+            {
                 "model": model,
                 "prompt": prompt,
                 "stream": False,
@@ -501,8 +422,11 @@ def risk_simulation():
     try:
         data = request.get_json()
         scenario = data.get('scenario', 'flood')
-        property_value = data.get('property_value', 1000000)
         location = data.get('location', 'Sydney')
+        try:
+            property_value = _finite_number(data.get('property_value', 1000000), 'property_value')
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
         coords = PropertyGeocoder.address_to_coords(location)
         base_risks = ClimateRiskCalculator.get_risk_factors(coords['lat'], coords['lng'])
@@ -539,9 +463,19 @@ def risk_simulation():
         
         simulated_value = property_value * (1 + impact['value_impact'])
         
+        # Optional full distribution across all correlated shocks, not just the chosen scenario
+        monte_carlo = None
+        if data.get('simulations'):
+            try:
+                engine = _monte_carlo_engine(data)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            monte_carlo = engine.simulate([{'value': property_value, 'risks': base_risks}])['portfolio']
+        
         return jsonify({
             "success": True,
             "scenario": scenario,
+            "monte_carlo": monte_carlo,
             "simulation": {
                 "original_value": property_value,
                 "simulated_value": int(simulated_value),
@@ -558,6 +492,113 @@ def risk_simulation():
         print(f"Error in risk simulation: {e}")
         return jsonify({"error": "Risk simulation failed"}), 500
 
+@ai_features_bp.route('/risk-simulation/monte-carlo', methods=['POST'])
+def monte_carlo_risk_simulation():
+    """Monte-Carlo stress of one property or a whole loan book under correlated shocks"""
+    try:
+        data = request.get_json() or {}
+        items = data.get('properties')
+        if items is None:
+            items = [{
+                'value': data.get('property_value', 1000000),
+                'loan_amount': data.get('loan_amount'),
+                'location': data.get('location', 'Sydney'),
+                'lat': data.get('lat'),
+                'lng': data.get('lng')
+            }]
+        if not isinstance(items, list) or not items:
+            return jsonify({"error": "properties must be a non-empty list"}), 400
+        
+        try:
+            engine = _monte_carlo_engine(data)
+            portfolio = _simulation_portfolio(items)
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid simulation request: {str(e)}"}), 400
+        
+        if not data.get('stream'):
+            return jsonify({"success": True, **engine.simulate(portfolio)})
+        
+    except Exception as e:
+        print(f"Error in Monte-Carlo simulation: {e}")
+        return jsonify({"error": "Monte-Carlo simulation failed"}), 500
+    
+    def generate():
+        # One line per property chunk, then the portfolio summary; memory stays at one chunk
+        try:
+            for block in engine.iter_simulate(portfolio):
+                yield json.dumps(block) + "\n"
+        except Exception as e:
+            print(f"Error in Monte-Carlo simulation: {e}")
+            yield json.dumps({"error": "Monte-Carlo simulation failed"}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _monte_carlo_engine(data):
+    """MonteCarloEngine for a request's simulations, correlation, seed and market_probabilities; ValueError if malformed"""
+    try:
+        simulations = int(data.get('simulations', DEFAULT_SIMULATIONS))
+    except (TypeError, ValueError):
+        raise ValueError("simulations must be an integer")
+    try:
+        return MonteCarloEngine(simulations, correlation=data.get('correlation'), seed=data.get('seed'),
+                                market_probabilities=data.get('market_probabilities'))
+    except TypeError as e:
+        raise ValueError(str(e))
+
+def _simulation_portfolio(items):
+    """Engine inputs with climate risks attached; coordinates are scored in one vectorised pass"""
+    portfolio = []
+    coords = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise ValueError(f"properties[{index}] must be an object")
+        value = item.get('value', item.get('property_value'))
+        if value is None:
+            raise ValueError(f"properties[{index}] needs a value")
+        entry = {'id': item.get('id', index), 'value': _finite_number(value, f"properties[{index}].value"),
+                 'loan_amount': None, 'risks': None}
+        if item.get('loan_amount') is not None:
+            entry['loan_amount'] = _finite_number(item['loan_amount'], f"properties[{index}].loan_amount")
+        if item.get('risks') is not None:
+            entry['risks'] = _simulation_risks(item['risks'], f"properties[{index}].risks")
+        elif item.get('lat') is not None and item.get('lng') is not None:
+            lat = _finite_number(item['lat'], f"properties[{index}].lat")
+            lng = _finite_number(item['lng'], f"properties[{index}].lng")
+            if abs(lat) > 90 or abs(lng) > 180:
+                raise ValueError(f"properties[{index}] coordinates are out of range")
+            coords.append((index, lat, lng))
+        else:
+            lat, lng, _ = PropertyGeocoder.place_coords(item.get('location', 'Sydney'))
+            coords.append((index, lat, lng))
+        portfolio.append(entry)
+    
+    if coords:
+        risks = ClimateRiskCalculator.get_risk_factors_batch([c[1] for c in coords], [c[2] for c in coords])
+        for row, (index, _, _) in enumerate(coords):
+            portfolio[index]['risks'] = {'flood': float(risks['flood'][row]), 'fire': float(risks['fire'][row])}
+    return portfolio
+
+def _simulation_risks(risks, name):
+    """Caller-supplied hazard scores, each a number between 0 and 1"""
+    if not isinstance(risks, dict):
+        raise ValueError(f"{name} must be an object")
+    scores = {}
+    for shock in HAZARD_SHOCKS:
+        scores[shock] = _finite_number(risks.get(shock, 0.0), f"{name}.{shock}")
+        if not 0 <= scores[shock] <= 1:
+            raise ValueError(f"{name}.{shock} must be between 0 and 1")
+    return scores
+
+def _finite_number(value, name):
+    """float(value), raising ValueError for non-numeric or non-finite input"""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number")
+    if not math.isfinite(number):
+        raise ValueError(f"{name} must be finite")
+    return number
+
 def generate_enhanced_mock_analysis(property_data, climate_risks, comparables):
     """Generate comprehensive mock analysis when AI is unavailable"""
     avg_comparable_price = sum(comp['price'] for comp in comparables) / len(comparables) if comparables else property_data['last_sale_price']
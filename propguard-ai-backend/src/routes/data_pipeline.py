@@ -1,12 +1,73 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import os
+import sys
 import json
 import time
+import bisect
 import random
+import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from functools import cached_property
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from src.services.risk_cache import RiskCache, risk_noise, risk_cache_stats, geohash_cell_centres
+from src.services.cache import SpillCache, canonical_hash
+from src.services.metrics import registry, PROMETHEUS_CONTENT_TYPE
+from src.services.address_index import lookup_address
+from src.services.bulk_ingest import RecordError, detect_format, iter_lines, iter_records, iter_ndjson_output
 
 data_pipeline_bp = Blueprint('data_pipeline', __name__)
 
+climate_risk_cache = RiskCache('data_pipeline')
+# Added default probability per unit of rate rise at 100% LVR
+STRESS_RATE_SENSITIVITY = 2.0
+
+# Processed-property results; set PIPELINE_CACHE_SPILL to a path to keep evicted results on disk
+PIPELINE_CACHE_MAX_ENTRIES = int(os.getenv('PIPELINE_CACHE_MAX_ENTRIES', '10000'))
+PIPELINE_CACHE_MAX_BYTES = int(os.getenv('PIPELINE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+PIPELINE_CACHE_TTL = float(os.getenv('PIPELINE_CACHE_TTL', '900'))
+PIPELINE_CACHE_SPILL = os.getenv('PIPELINE_CACHE_SPILL', '')
+PIPELINE_CACHE_SPILL_MAX_ENTRIES = int(os.getenv('PIPELINE_CACHE_SPILL_MAX_ENTRIES', '100000'))
+PIPELINE_VERSION = "1.0.0"
+
+# Tiers come from address_index (PREMIUM_LOCATIONS / MAJOR_LOCATIONS keywords)
+LOCATION_TIERS = ('Premium', 'Major', 'Regional')
+SUBURB_MEDIANS = {'Premium': 1500000, 'Major': 800000, 'Regional': 500000}
+GROWTH_RATES = {'Premium': 0.05, 'Major': 0.03, 'Regional': 0.02}
+# A score at or below RISK_GRADE_THRESHOLDS[i] gets RISK_GRADES[i]; above the last gets 'D'
+RISK_GRADE_THRESHOLDS = (0.2, 0.3, 0.4, 0.5, 0.6, 0.7)
+RISK_GRADES = ('A+', 'A', 'B+', 'B', 'C+', 'C', 'D')
+# Defaults _validate_property_data fills in for missing fields
+PROPERTY_DEFAULTS = {
+    'address': 'Unknown Address', 'bedrooms': 3, 'bathrooms': 2, 'land_size': 600, 'year_built': 2000,
+    'property_type': 'House', 'lat': -33.8688, 'lng': 151.2093
+}
+
+STAGE_SECONDS = registry.histogram('pipeline_stage_seconds', 'Time spent in each data pipeline stage', ('stage',))
+REQUEST_SECONDS = registry.histogram('pipeline_request_seconds', 'End-to-end process_property_data latency', ('cache',))
+REQUESTS = registry.counter('pipeline_requests_total', 'Pipeline runs by outcome', ('outcome',))
+IN_FLIGHT = registry.gauge('pipeline_in_flight', 'Pipeline runs currently executing')
+DATA_QUALITY = registry.counter('pipeline_data_quality_sum', 'Sum of data quality scores of successful runs')
+BULK_RECORDS = registry.counter('pipeline_bulk_records_total', 'Bulk ingest records by outcome', ('outcome',))
+
+
+def _latency_ms(snapshot: Dict) -> Dict:
+    """Histogram snapshot in seconds as rounded milliseconds"""
+    summary = {'count': snapshot['count']}
+    for key in ('mean', 'p50', 'p95', 'p99'):
+        summary[key] = round(snapshot[key] * 1000, 3) if snapshot[key] is not None else None
+    return summary
+
+
+def _peak_memory_mb() -> Optional[float]:
+    """Peak resident set size of this process, or None where the resource module is unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
 class FinancialImpactAssessor:
     """Financial Impact Assessment for PropGuard AI"""
     
@@ -19,34 +80,23 @@ class FinancialImpactAssessor:
         
     def assess(self, property_data: Dict, loan_amount: float) -> Dict:
         """Perform comprehensive financial impact assessment"""
+        started = time.perf_counter()
         try:
-            # 1. Core metrics calculation
-            valuation = self._calculate_valuation(property_data)
-            lvr = loan_amount / valuation if valuation > 0 else 0
-            climate_risk = self._get_climate_risk(property_data)
-            
-            # 2. Compliance check
-            compliance = self._evaluate_compliance(property_data, lvr)
-            
-            # 3. Critical event detection
-            critical_event = self._detect_critical_events(property_data, climate_risk, lvr)
-            
-            # 4. Generate analysis
-            analysis = self._generate_analysis(valuation, lvr, climate_risk, compliance)
-            
-            # 5. Calculate additional metrics
-            market_sentiment = self._get_market_sentiment(property_data.get('address', ''))
-            default_probability = self._calculate_default_probability(lvr, climate_risk)
+            # Every quantity below is computed once per request and shared, so the
+            # figures in one response agree with each other
+            context = AssessmentContext(self, property_data, loan_amount)
+            climate_risk = context.climate_risk
+            compliance = context.compliance
             
             return {
-                "analysis": analysis,
+                "analysis": self._generate_analysis(context.valuation, context.lvr, climate_risk, compliance),
                 "metrics": {
-                    "propertyValuation": round(valuation, 2),
-                    "loanToValueRatio": round(lvr, 4),
+                    "propertyValuation": round(context.valuation, 2),
+                    "loanToValueRatio": round(context.lvr, 4),
                     "riskExposure": round(climate_risk.get('composite', 0.25), 4),
                     "climateRiskScore": round(climate_risk.get('fire', 0.3), 4),
-                    "marketSentiment": round(market_sentiment, 4),
-                    "estimatedDefaultProbability": round(default_probability, 4),
+                    "marketSentiment": round(context.market_sentiment, 4),
+                    "estimatedDefaultProbability": round(context.default_probability, 4),
                     "regulatoryComplianceScore": compliance['score']
                 },
                 "complianceStatus": {
@@ -54,7 +104,7 @@ class FinancialImpactAssessor:
                     "NCCP_Act": compliance['NCCP_Act'],
                     "Basel_III": compliance['Basel_III']
                 },
-                "criticalEvent": critical_event,
+                "criticalEvent": self._detect_critical_events(context),
                 "timestamp": datetime.now().isoformat(),
                 "assessmentId": f"FIA_{int(time.time())}"
             }
@@ -64,6 +114,22 @@ class FinancialImpactAssessor:
                 "error": f"Financial impact assessment failed: {str(e)}",
                 "timestamp": datetime.now().isoformat()
             }
+        finally:
+            STAGE_SECONDS.labels(stage='assess').observe(time.perf_counter() - started)
+    
+    def stress(self, property_data: Dict, loan_amount: float, scenario: Optional[Dict] = None) -> Dict:
+        """Headline loan metrics under a stress scenario, without the narrative or random market sentiment"""
+        context = AssessmentContext(self, property_data, loan_amount, scenario)
+        compliance = context.compliance
+        return {
+            'valuation': context.valuation,
+            'lvr': context.lvr,
+            'climate_risk': context.climate_risk['composite'],
+            'default_probability': context.default_probability,
+            'compliance_score': compliance['score'],
+            'apra_compliant': compliance['APRA_CPS230'],
+            'basel_compliant': compliance['Basel_III']
+        }
     
     def _calculate_valuation(self, property_data: Dict) -> float:
         """Calculate property valuation with risk adjustments"""
@@ -92,26 +158,56 @@ class FinancialImpactAssessor:
             base_value *= 0.9  # Older property discount
         
         # Location premium
-        address = property_data.get('address', '').lower()
-        if any(premium in address for premium in ['sydney', 'melbourne', 'toorak', 'mosman']):
+        location_tier = lookup_address(property_data.get('address', '')).tier
+        if location_tier == 'Premium':
             base_value *= 1.3
-        elif any(regional in address for regional in ['brisbane', 'perth', 'adelaide']):
+        elif location_tier == 'Major':
             base_value *= 1.1
         
         return max(200000, base_value)  # Minimum value floor
     
     def _get_climate_risk(self, property_data: Dict) -> Dict:
-        """Get climate risk assessment for property"""
+        """Get climate risk assessment for property, memoised per geohash cell"""
         lat = property_data.get('lat', -33.8688)
         lng = property_data.get('lng', 151.2093)
-        
+        return climate_risk_cache.get_or_compute(lat, lng, self._compute_climate_risk)
+    
+    def _compute_climate_risk(self, lat: float, lng: float) -> Dict:
+        """Uncached climate risk for one coordinate"""
         # Calculate various climate risks
         flood_risk = max(0, min(1, abs(lat + 33) * 0.3))
         fire_risk = max(0, min(1, abs(lng - 150) * 0.25))
         coastal_risk = 0.1 if abs(lat + 33) < 2 else 0.0
-        subsidence_risk = 0.1 + random.random() * 0.2
+        subsidence_risk = 0.1 + risk_noise(lat, lng, 'subsidence') * 0.2
         cyclone_risk = 0.4 if lat > -25 else 0.1
-        heatwave_risk = 0.2 + random.random() * 0.3
+        heatwave_risk = 0.2 + risk_noise(lat, lng, 'heatwave') * 0.3
+        
+        composite = (flood_risk * 0.25 + fire_risk * 0.25 + coastal_risk * 0.15 + 
+                    subsidence_risk * 0.15 + cyclone_risk * 0.1 + heatwave_risk * 0.1)
+        
+        return {
+            'flood': flood_risk,
+            'fire': fire_risk,
+            'coastal': coastal_risk,
+            'subsidence': subsidence_risk,
+            'cyclone': cyclone_risk,
+            'heatwave': heatwave_risk,
+            'composite': composite
+        }
+    
+    def climate_risk_batch(self, lats, lngs) -> Dict[str, np.ndarray]:
+        """Vectorised _get_climate_risk over coordinate arrays, including the per-cell evaluation the cache applies"""
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        if climate_risk_cache.enabled:
+            lats, lngs = geohash_cell_centres(lats, lngs, climate_risk_cache.precision)
+        
+        flood_risk = np.clip(np.abs(lats + 33) * 0.3, 0, 1)
+        fire_risk = np.clip(np.abs(lngs - 150) * 0.25, 0, 1)
+        coastal_risk = np.where(np.abs(lats + 33) < 2, 0.1, 0.0)
+        subsidence_risk = 0.1 + risk_noise(lats, lngs, 'subsidence') * 0.2
+        cyclone_risk = np.where(lats > -25, 0.4, 0.1)
+        heatwave_risk = 0.2 + risk_noise(lats, lngs, 'heatwave') * 0.3
         
         composite = (flood_risk * 0.25 + fire_risk * 0.25 + coastal_risk * 0.15 + 
                     subsidence_risk * 0.15 + cyclone_risk * 0.1 + heatwave_risk * 0.1)
@@ -126,7 +222,8 @@ class FinancialImpactAssessor:
             'composite': composite
         }
     
-    def _evaluate_compliance(self, property_data: Dict, lvr: float) -> Dict:
+    def _evaluate_compliance(self, property_data: Dict, lvr: float, climate_risk: Optional[Dict] = None,
+                             property_value: Optional[float] = None) -> Dict:
         """Evaluate regulatory compliance"""
         score = 100
         
@@ -140,7 +237,8 @@ class FinancialImpactAssessor:
         
         # NCCP Act - National Consumer Credit Protection
         nccp_compliant = True
-        property_value = self._calculate_valuation(property_data)
+        if property_value is None:
+            property_value = self._calculate_valuation(property_data)
         if property_value < 300000:  # Low value property risk
             score -= 10
         
@@ -151,7 +249,8 @@ class FinancialImpactAssessor:
             score -= 25
         
         # Climate risk impact on compliance
-        climate_risk = self._get_climate_risk(property_data)
+        if climate_risk is None:
+            climate_risk = self._get_climate_risk(property_data)
         if climate_risk['composite'] > 0.7:
             score -= 15
             if climate_risk['composite'] > 0.9:
@@ -164,8 +263,10 @@ class FinancialImpactAssessor:
             'Basel_III': basel_compliant
         }
     
-    def _detect_critical_events(self, property_data: Dict, climate_risk: Dict, lvr: float) -> Optional[str]:
+    def _detect_critical_events(self, context: 'AssessmentContext') -> Optional[str]:
         """Detect critical financial events"""
+        climate_risk, lvr = context.climate_risk, context.lvr
+        
         # Bushfire risk
         if climate_risk.get('fire', 0) > 0.8:
             return 'bushfire'
@@ -179,13 +280,11 @@ class FinancialImpactAssessor:
             return 'rateHike'
         
         # Market sentiment
-        market_sentiment = self._get_market_sentiment(property_data.get('address', ''))
-        if market_sentiment < -0.4:
+        if context.market_sentiment < -0.4:
             return 'marketCrash'
         
         # Compliance breach
-        compliance = self._evaluate_compliance(property_data, lvr)
-        if compliance['score'] < 70:
+        if context.compliance['score'] < 70:
             return 'complianceBreach'
         
         return None
@@ -236,11 +335,7 @@ class FinancialImpactAssessor:
         base_sentiment = 0.1  # Slightly positive base
         
         # Location-based sentiment
-        address_lower = address.lower()
-        if any(premium in address_lower for premium in ['sydney', 'melbourne']):
-            base_sentiment += 0.2
-        elif any(growth in address_lower for growth in ['brisbane', 'perth']):
-            base_sentiment += 0.1
+        base_sentiment += lookup_address(address).sentiment_boost
         
         # Add some market volatility
         market_volatility = (random.random() - 0.5) * 0.6  # -0.3 to +0.3
@@ -272,64 +367,274 @@ class FinancialImpactAssessor:
         
         return min(0.99, max(0.001, base_probability))
 
+def _numeric_column(values, default: float, rows: int):
+    """(float64 array, parsed mask) from a column of numbers or strings; blanks take the default"""
+    if values is None:
+        return np.full(rows, float(default)), np.ones(rows, dtype=bool)
+    values = np.asarray(values)
+    if values.dtype.kind in 'biuf':
+        result = values.astype(np.float64)
+        missing = np.isnan(result)
+        result[missing] = default
+        return result, np.ones(rows, dtype=bool)
+    
+    text = np.char.strip(values.astype(str))
+    blank = text == ''
+    try:
+        result = np.where(blank, 'nan', text).astype(np.float64)
+        parsed = np.ones(rows, dtype=bool)
+    except ValueError:
+        # Fall back to per-cell parsing only when some cell is not a number
+        result = np.empty(rows, dtype=np.float64)
+        parsed = np.ones(rows, dtype=bool)
+        for i, cell in enumerate(text.tolist()):
+            try:
+                result[i] = float(cell) if cell else np.nan
+            except ValueError:
+                result[i] = np.nan
+                parsed[i] = False
+    result[np.isnan(result)] = default
+    return result, parsed
+
+class AssessmentContext:
+    """One loan's assessment inputs with each derived quantity computed at most once"""
+    
+    def __init__(self, assessor: FinancialImpactAssessor, property_data: Dict, loan_amount: float,
+                 scenario: Optional[Dict] = None):
+        self.assessor = assessor
+        self.property_data = property_data
+        self.loan_amount = loan_amount
+        self.scenario = scenario or {}
+    
+    @cached_property
+    def valuation(self) -> float:
+        return self.assessor._calculate_valuation(self.property_data) * (1 + self.scenario.get('value_shock', 0.0))
+    
+    @cached_property
+    def lvr(self) -> float:
+        return self.loan_amount / self.valuation if self.valuation > 0 else 0
+    
+    @cached_property
+    def climate_risk(self) -> Dict:
+        climate_risk = self.assessor._get_climate_risk(self.property_data)
+        if 'climate_multiplier' in self.scenario:
+            climate_risk['composite'] = min(1.0, climate_risk['composite'] * self.scenario['climate_multiplier'])
+        return climate_risk
+    
+    @cached_property
+    def market_sentiment(self) -> float:
+        return self.assessor._get_market_sentiment(self.property_data.get('address', ''))
+    
+    @cached_property
+    def compliance(self) -> Dict:
+        return self.assessor._evaluate_compliance(self.property_data, self.lvr, self.climate_risk, self.valuation)
+    
+    @cached_property
+    def default_probability(self) -> float:
+        probability = self.assessor._calculate_default_probability(self.lvr, self.climate_risk)
+        # Serviceability buffer: each point of rate rise adds default risk in proportion to leverage
+        rate_shock = self.scenario.get('rate_shock', 0.0)
+        return min(0.99, probability + rate_shock * STRESS_RATE_SENSITIVITY * self.lvr) if rate_shock else probability
+
 class DataPipelineManager:
     """Manages data pipeline operations for PropGuard AI"""
     
     def __init__(self):
         self.assessor = FinancialImpactAssessor()
-        self.pipeline_cache = {}
+        self.pipeline_cache = SpillCache(
+            max_entries=PIPELINE_CACHE_MAX_ENTRIES,
+            ttl_seconds=PIPELINE_CACHE_TTL,
+            max_bytes=PIPELINE_CACHE_MAX_BYTES,
+            spill_path=PIPELINE_CACHE_SPILL,
+            max_spill_entries=PIPELINE_CACHE_SPILL_MAX_ENTRIES
+        )
         
     def process_property_data(self, raw_data: Dict) -> Dict:
-        """Process raw property data through the pipeline"""
-        try:
-            # Data validation
-            validated_data = self._validate_property_data(raw_data)
-            
-            # Data enrichment
+        """Process raw property data through the pipeline, reusing results for identical normalised input"""
+        started = time.perf_counter()
+        cache_hit = False
+        with IN_FLIGHT.track_inprogress():
+            try:
+                # Data validation
+                with STAGE_SECONDS.labels(stage='validate').time():
+                    validated_data = self._validate_property_data(raw_data)
+                
+                # Validation fills defaults and coerces types, so equivalent requests share a key;
+                # the address only matters through its case-insensitive location tier
+                key_fields = dict(validated_data, address=' '.join(validated_data['address'].lower().split()))
+                processed, cache_hit = self.pipeline_cache.get_or_compute(
+                    canonical_hash(PIPELINE_VERSION, key_fields), lambda: self._process_validated(validated_data)
+                )
+                processed['property'].update(validated_data)
+                quality = self._assess_data_quality(validated_data)
+                REQUESTS.labels(outcome='success').inc()
+                DATA_QUALITY.inc(quality)
+                
+                return {
+                    "success": True,
+                    "processed_data": processed,
+                    "pipeline_metadata": {
+                        "processing_time_ms": round((time.perf_counter() - started) * 1000, 3),
+                        "data_quality_score": quality,
+                        "pipeline_version": PIPELINE_VERSION,
+                        "cache_hit": cache_hit
+                    }
+                }
+                
+            except Exception as e:
+                REQUESTS.labels(outcome='error').inc()
+                return {
+                    "success": False,
+                    "error": f"Data pipeline processing failed: {str(e)}",
+                    "timestamp": datetime.now().isoformat()
+                }
+            finally:
+                REQUEST_SECONDS.labels(cache='hit' if cache_hit else 'miss').observe(time.perf_counter() - started)
+    
+    def iter_bulk(self, records: Iterator[Tuple[int, Any]]) -> Iterator[Dict]:
+        """
+        Validate, enrich and risk-score (index, record) pairs lazily, one result per record;
+        a RecordError or a failing stage becomes an inline error result
+        """
+        for index, record in records:
+            result = {"index": index}
+            if isinstance(record, dict) and 'id' in record:
+                result["id"] = record['id']
+            try:
+                if isinstance(record, RecordError):
+                    raise record
+                with STAGE_SECONDS.labels(stage='validate').time():
+                    validated_data = self._validate_property_data(record)
+                with STAGE_SECONDS.labels(stage='enrich').time():
+                    enriched_data = self._enrich_property_data(validated_data)
+                with STAGE_SECONDS.labels(stage='risk').time():
+                    risk_scores = self._calculate_risk_scores(enriched_data)
+                result.update(success=True, property=enriched_data, risk_scores=risk_scores)
+                BULK_RECORDS.labels(outcome='success').inc()
+            except Exception as e:
+                result.update(success=False, error=f"{type(e).__name__}: {e}")
+                BULK_RECORDS.labels(outcome='error').inc()
+            yield result
+    
+    def process_table(self, columns: Dict[str, Any], seed: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Columnar validate -> enrich -> risk scoring over a whole property table ({column: array}),
+        matching the per-record pipeline; rows with unparseable numbers get valid=False and defaults
+        """
+        rows = len(next(iter(columns.values()))) if columns else 0
+        rng = np.random.default_rng(seed)
+        valid = np.ones(rows, dtype=bool)
+        
+        def numeric(name):
+            values, parsed = _numeric_column(columns.get(name), PROPERTY_DEFAULTS[name], rows)
+            valid[:] &= parsed
+            return values
+        
+        def text(name):
+            values = columns.get(name)
+            if values is None:
+                return np.full(rows, PROPERTY_DEFAULTS[name])
+            values = np.asarray(values).astype(str)
+            return np.where(values == '', PROPERTY_DEFAULTS[name], values)
+        
+        # Validation
+        table = {}
+        for name in ('id',):
+            if name in columns:
+                table[name] = np.asarray(columns[name]).astype(str)
+        table['address'] = text('address')
+        table['bedrooms'] = np.maximum(1, np.trunc(numeric('bedrooms'))).astype(np.int64)
+        table['bathrooms'] = np.maximum(1, np.trunc(numeric('bathrooms'))).astype(np.int64)
+        table['land_size'] = np.maximum(100.0, numeric('land_size'))
+        table['year_built'] = np.clip(np.trunc(numeric('year_built')), 1900, 2024).astype(np.int64)
+        table['property_type'] = text('property_type')
+        table['lat'] = numeric('lat')
+        table['lng'] = numeric('lng')
+        table['valid'] = valid
+        
+        # Enrichment
+        table['property_age'] = 2024 - table['year_built']
+        table['size_category'] = np.select(
+            [(table['bedrooms'] >= 5) | (table['land_size'] >= 1000), (table['bedrooms'] >= 3) | (table['land_size'] >= 500)],
+            ['Large', 'Medium'], 'Small'
+        )
+        # One memoised lookup per distinct address, broadcast back to the rows
+        addresses, inverse = np.unique(table['address'], return_inverse=True)
+        tier_positions = {tier: i for i, tier in enumerate(LOCATION_TIERS)}
+        tier_index = np.array([tier_positions[lookup_address(address).tier] for address in addresses.tolist()],
+                              dtype=np.int64)[inverse]
+        table['location_tier'] = np.array(LOCATION_TIERS)[tier_index]
+        table['suburb_median'] = np.array([SUBURB_MEDIANS[tier] for tier in LOCATION_TIERS])[tier_index] * rng.uniform(0.8, 1.2, rows)
+        growth = np.array([GROWTH_RATES[tier] for tier in LOCATION_TIERS])[tier_index]
+        table['annual_growth_rate'] = growth
+        table['five_year_forecast'] = growth * 5
+        table['growth_confidence'] = rng.uniform(0.7, 0.9, rows)
+        
+        # Risk scoring
+        climate_risk = self.assessor.climate_risk_batch(table['lat'], table['lng'])
+        for name, values in climate_risk.items():
+            table[f'climate_{name}'] = values
+        regional = tier_index == 2
+        age = table['property_age']
+        market_risk = 0.3 + np.where(regional, 0.2, np.where(tier_index == 0, 0.1, 0.0))
+        market_risk = np.minimum(1.0, market_risk + np.where(age > 50, 0.15, np.where(age < 5, 0.05, 0.0)))
+        size = table['size_category']
+        liquidity_risk = 0.2 + np.where(size == 'Large', 0.2, np.where(size == 'Small', 0.1, 0.0))
+        liquidity_risk = np.minimum(1.0, liquidity_risk + np.where(regional, 0.3, 0.0))
+        overall_risk = climate_risk['composite'] * 0.4 + market_risk * 0.35 + liquidity_risk * 0.25
+        table['market_risk'] = market_risk
+        table['liquidity_risk'] = liquidity_risk
+        table['overall_risk'] = overall_risk
+        table['risk_grade'] = np.array(RISK_GRADES)[np.searchsorted(RISK_GRADE_THRESHOLDS, overall_risk, side='left')]
+        return table
+    
+    def _process_validated(self, validated_data: Dict) -> Dict:
+        """Enrichment, risk scoring and market analysis of validated data"""
+        with STAGE_SECONDS.labels(stage='enrich').time():
             enriched_data = self._enrich_property_data(validated_data)
-            
-            # Risk scoring
+        with STAGE_SECONDS.labels(stage='risk').time():
             risk_scores = self._calculate_risk_scores(enriched_data)
-            
-            # Market analysis
-            market_data = self._analyze_market_conditions(enriched_data)
-            
-            return {
-                "success": True,
-                "processed_data": {
-                    "property": enriched_data,
-                    "risk_scores": risk_scores,
-                    "market_analysis": market_data
-                },
-                "pipeline_metadata": {
-                    "processing_time": time.time(),
-                    "data_quality_score": self._assess_data_quality(validated_data),
-                    "pipeline_version": "1.0.0"
-                }
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": f"Data pipeline processing failed: {str(e)}",
-                "timestamp": datetime.now().isoformat()
-            }
+        with STAGE_SECONDS.labels(stage='market').time():
+            market_analysis = self._analyze_market_conditions(enriched_data)
+        return {
+            "property": enriched_data,
+            "risk_scores": risk_scores,
+            "market_analysis": market_analysis
+        }
+    
+    def performance_metrics(self) -> Dict:
+        """Measured latency percentiles, per-stage timings, success rate, cache hit rate and data quality"""
+        succeeded = REQUESTS.labels(outcome='success').value
+        failed = REQUESTS.labels(outcome='error').value
+        runs = succeeded + failed
+        return {
+            "requests": int(runs),
+            "in_flight": int(IN_FLIGHT.value),
+            "processing_time_ms": _latency_ms(REQUEST_SECONDS.total()),
+            "processing_time_ms_by_cache": {
+                labels['cache']: _latency_ms(series.snapshot()) for labels, series in REQUEST_SECONDS.series()
+            },
+            "stage_time_ms": {labels['stage']: _latency_ms(series.snapshot()) for labels, series in STAGE_SECONDS.series()},
+            "success_rate": round(succeeded / runs, 4) if runs else None,
+            "cache_hit_rate": self.pipeline_cache.stats()['hit_rate'],
+            "data_quality_average": round(DATA_QUALITY.value / succeeded, 4) if succeeded else None
+        }
     
     def _validate_property_data(self, data: Dict) -> Dict:
         """Validate and clean property data"""
         validated = {}
         
         # Required fields with defaults
-        validated['address'] = data.get('address', 'Unknown Address')
-        validated['bedrooms'] = max(1, int(data.get('bedrooms', 3)))
-        validated['bathrooms'] = max(1, int(data.get('bathrooms', 2)))
-        validated['land_size'] = max(100, float(data.get('land_size', 600)))
-        validated['year_built'] = max(1900, min(2024, int(data.get('year_built', 2000))))
+        validated['address'] = data.get('address', PROPERTY_DEFAULTS['address'])
+        validated['bedrooms'] = max(1, int(data.get('bedrooms', PROPERTY_DEFAULTS['bedrooms'])))
+        validated['bathrooms'] = max(1, int(data.get('bathrooms', PROPERTY_DEFAULTS['bathrooms'])))
+        validated['land_size'] = max(100, float(data.get('land_size', PROPERTY_DEFAULTS['land_size'])))
+        validated['year_built'] = max(1900, min(2024, int(data.get('year_built', PROPERTY_DEFAULTS['year_built']))))
         
         # Optional fields
-        validated['property_type'] = data.get('property_type', 'House')
-        validated['lat'] = float(data.get('lat', -33.8688))
-        validated['lng'] = float(data.get('lng', 151.2093))
+        validated['property_type'] = data.get('property_type', PROPERTY_DEFAULTS['property_type'])
+        validated['lat'] = float(data.get('lat', PROPERTY_DEFAULTS['lat']))
+        validated['lng'] = float(data.get('lng', PROPERTY_DEFAULTS['lng']))
         
         return validated
     
@@ -362,26 +667,13 @@ class DataPipelineManager:
     
     def _determine_location_tier(self, address: str) -> str:
         """Determine location tier for pricing"""
-        address_lower = address.lower()
-        
-        if any(premium in address_lower for premium in ['sydney', 'melbourne', 'toorak', 'mosman']):
-            return 'Premium'
-        elif any(major in address_lower for major in ['brisbane', 'perth', 'adelaide']):
-            return 'Major'
-        else:
-            return 'Regional'
+        return lookup_address(address).tier
     
     def _get_suburb_median(self, address: str) -> float:
         """Get suburb median price (simulated)"""
         location_tier = self._determine_location_tier(address)
         
-        base_medians = {
-            'Premium': 1500000,
-            'Major': 800000,
-            'Regional': 500000
-        }
-        
-        base = base_medians.get(location_tier, 600000)
+        base = SUBURB_MEDIANS.get(location_tier, 600000)
         variance = random.uniform(0.8, 1.2)
         
         return base * variance
@@ -390,13 +682,7 @@ class DataPipelineManager:
         """Get growth forecast for location"""
         location_tier = self._determine_location_tier(address)
         
-        base_growth = {
-            'Premium': 0.05,
-            'Major': 0.03,
-            'Regional': 0.02
-        }
-        
-        annual_growth = base_growth.get(location_tier, 0.025)
+        annual_growth = GROWTH_RATES.get(location_tier, 0.025)
         
         return {
             'annual_growth_rate': annual_growth,
@@ -465,20 +751,7 @@ class DataPipelineManager:
     
     def _assign_risk_grade(self, overall_risk: float) -> str:
         """Assign letter grade to risk score"""
-        if overall_risk <= 0.2:
-            return 'A+'
-        elif overall_risk <= 0.3:
-            return 'A'
-        elif overall_risk <= 0.4:
-            return 'B+'
-        elif overall_risk <= 0.5:
-            return 'B'
-        elif overall_risk <= 0.6:
-            return 'C+'
-        elif overall_risk <= 0.7:
-            return 'C'
-        else:
-            return 'D'
+        return RISK_GRADES[bisect.bisect_left(RISK_GRADE_THRESHOLDS, overall_risk)]
     
     def _analyze_market_conditions(self, data: Dict) -> Dict:
         """Analyze current market conditions"""
@@ -554,6 +827,7 @@ impact_assessor = FinancialImpactAssessor()
 @data_pipeline_bp.route('/financial-impact-assessment', methods=['POST'])
 def financial_impact_assessment():
     """Perform comprehensive financial impact assessment"""
+    started = time.perf_counter()
     try:
         data = request.get_json()
         
@@ -581,7 +855,7 @@ def financial_impact_assessment():
             "financial_impact_assessment": assessment,
             "data_pipeline_result": pipeline_result,
             "processing_metadata": {
-                "total_processing_time": time.time(),
+                "total_processing_time_ms": round((time.perf_counter() - started) * 1000, 3),
                 "pipeline_version": "1.0.0",
                 "assessment_version": "1.0.0"
             }
@@ -596,6 +870,20 @@ def financial_impact_assessment():
             "timestamp": datetime.now().isoformat()
         }), 500
 
+@data_pipeline_bp.route('/process-property-data/bulk', methods=['POST'])
+def process_property_data_bulk():
+    """Stream an NDJSON or CSV body through the pipeline, one NDJSON result line per record"""
+    fmt = request.args.get('format') or detect_format(request.content_type)
+    try:
+        # Records are pulled from the body as results are written, never buffered whole
+        records = iter_records(iter_lines(request.stream), fmt)
+    except ValueError as e:
+        return jsonify({"error": f"Invalid bulk request: {str(e)}"}), 400
+    
+    summary = {"format": fmt, "pipeline_version": PIPELINE_VERSION}
+    output = iter_ndjson_output(pipeline_manager.iter_bulk(records), summary)
+    return Response(stream_with_context(output), mimetype='application/x-ndjson')
+
 @data_pipeline_bp.route('/process-property-data', methods=['POST'])
 def process_property_data():
     """Process raw property data through the data pipeline"""
@@ -656,8 +944,11 @@ def market_analysis():
 
 @data_pipeline_bp.route('/pipeline-health', methods=['GET'])
 def pipeline_health():
-    """Check data pipeline health and status"""
+    """Check data pipeline health and status; ?format=prometheus returns the pipeline metrics as Prometheus text"""
     try:
+        if request.args.get('format') == 'prometheus':
+            return Response(registry.render_prometheus('pipeline_'), content_type=PROMETHEUS_CONTENT_TYPE)
+        
         health_status = {
             "pipeline_status": "operational",
             "components": {
@@ -667,17 +958,15 @@ def pipeline_health():
                 "market_analyzer": "healthy",
                 "impact_assessor": "healthy"
             },
-            "performance_metrics": {
-                "average_processing_time": "2.3s",
-                "success_rate": "98.7%",
-                "cache_hit_rate": "85.2%",
-                "data_quality_average": "0.89"
-            },
+            "performance_metrics": pipeline_manager.performance_metrics(),
+            "pipeline_cache": pipeline_manager.pipeline_cache.stats(),
+            "metrics": registry.snapshot('pipeline_'),
+            "risk_cache": risk_cache_stats(),
             "system_info": {
-                "pipeline_version": "1.0.0",
+                "pipeline_version": PIPELINE_VERSION,
                 "last_updated": datetime.now().isoformat(),
-                "active_connections": len(pipeline_manager.pipeline_cache),
-                "memory_usage": "Normal"
+                "cached_results": len(pipeline_manager.pipeline_cache),
+                "peak_memory_mb": _peak_memory_mb()
             }
         }
         
@@ -1,14 +1,43 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 import json
 import time
 from datetime import datetime
-from src.generatory import get_generator
+from src.generatory import (get_generator, LLM_REQUESTS, LLM_TOKENS, LLM_EVAL_SECONDS, LLM_FALLBACKS, LLM_IN_FLIGHT,
+                            LLM_REQUEST_SECONDS, LLM_TIME_TO_FIRST_TOKEN, LLM_STREAM_TOKENS_PER_SECOND)
+from src.services.metrics import registry, PROMETHEUS_CONTENT_TYPE
 
 llm_bp = Blueprint('llm', __name__)
 
 # Initialize Ollama generator
 generator = get_generator()
 
+def _sse(data, event=None):
+    """One Server-Sent Events message"""
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+def _wants_stream(data):
+    """Streaming is requested by "stream": true, ?stream=true or Accept: text/event-stream"""
+    return (bool(data.get('stream')) or request.args.get('stream', '').lower() in ('1', 'true')
+            or 'text/event-stream' in request.headers.get('Accept', ''))
+
+def _stream_response(start, tokens, stats):
+    """SSE response: a start event, one message per token, then done (with timing) or error"""
+    def events():
+        yield _sse(dict(start, timestamp=datetime.now().isoformat()), 'start')
+        try:
+            for piece in tokens:
+                yield _sse({"token": piece})
+            yield _sse(dict(stats, success=True, timestamp=datetime.now().isoformat()), 'done')
+        except Exception as e:
+            yield _sse({"success": False, "error": f"Generation stream failed: {str(e)}",
+                        "timestamp": datetime.now().isoformat()}, 'error')
+    
+    # Disable proxy buffering so each token reaches the client as soon as it is generated
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @llm_bp.route('/health', methods=['GET'])
 def llm_health():
     """Check LLM service health and available models"""
@@ -21,6 +50,7 @@ def llm_health():
             "active_model": generator.active_model,
             "available_models": generator.available_models,
             "fallback_model": generator.fallback_model,
+            "ollama_pool": generator.client.stats(),
             "timestamp": datetime.now().isoformat()
         })
         
@@ -120,6 +150,11 @@ def generate_lvr_report():
         if not property_data:
             return jsonify({"error": "property_data is required"}), 400
         
+        if _wants_stream(data):
+            stats = {}
+            tokens = generator.stream_dynamic_lvr_report(property_data, stats)
+            return _stream_response({"property_data": property_data}, tokens, stats)
+        
         # Generate LVR report
         report = generator.generate_dynamic_lvr_report(property_data)
         
@@ -149,6 +184,11 @@ def risk_assessment():
         if not property_data:
             return jsonify({"error": "property_data is required"}), 400
         
+        if _wants_stream(data):
+            stats = {}
+            tokens = generator.stream_risk_assessment(property_data, climate_data, stats)
+            return _stream_response({"property_data": property_data, "climate_data": climate_data}, tokens, stats)
+        
         # Generate risk assessment
         assessment = generator.generate_risk_assessment(property_data, climate_data)
         
@@ -210,6 +250,11 @@ def generate_text():
         if not prompt:
             return jsonify({"error": "prompt is required"}), 400
         
+        if _wants_stream(data) and not format_json:
+            stats = {}
+            tokens = generator.generate_stream(prompt, system_prompt, temperature, max_tokens, stats=stats)
+            return _stream_response({"parameters": {"temperature": temperature, "max_tokens": max_tokens}}, tokens, stats)
+        
         # Generate text
         response = generator.generate(
             prompt=prompt,
@@ -304,24 +349,43 @@ def comprehensive_analysis():
 
 @llm_bp.route('/model-performance', methods=['GET'])
 def model_performance():
-    """Get model performance metrics and statistics"""
+    """Get measured model performance; ?format=prometheus returns the LLM metrics as Prometheus text"""
     try:
-        # Simulate performance metrics (in real implementation, track actual metrics)
+        if request.args.get('format') == 'prometheus':
+            return Response(registry.render_prometheus('llm_'), content_type=PROMETHEUS_CONTENT_TYPE)
+        
+        requests_by_outcome = {}
+        for labels, series in LLM_REQUESTS.series():
+            requests_by_outcome[labels['outcome']] = requests_by_outcome.get(labels['outcome'], 0) + int(series.value)
+        total = sum(requests_by_outcome.values())
+        successful = requests_by_outcome.get('success', 0)
+        tokens = LLM_TOKENS.total()['value']
+        eval_seconds = LLM_EVAL_SECONDS.total()['value']
+        latency = LLM_REQUEST_SECONDS.total()
+        first_token = LLM_TIME_TO_FIRST_TOKEN.total()
+        stream_rate = LLM_STREAM_TOKENS_PER_SECOND.total()
+        
         performance_data = {
             "active_model": generator.active_model,
             "model_metrics": {
-                "average_response_time": "2.3s",
-                "success_rate": "98.7%",
-                "tokens_per_second": 45,
-                "gpu_utilization": "67%",
-                "memory_usage": "8.2GB"
+                "response_time_seconds": {key: latency[key] for key in ('count', 'mean', 'p50', 'p95', 'p99')},
+                "success_rate": round(successful / total, 4) if total else None,
+                "tokens_per_second": round(tokens / eval_seconds, 2) if eval_seconds else None,
+                "in_flight": int(LLM_IN_FLIGHT.value)
+            },
+            "streaming_metrics": {
+                "time_to_first_token_seconds": {key: first_token[key] for key in ('count', 'mean', 'p50', 'p95', 'p99')},
+                "tokens_per_second": {key: stream_rate[key] for key in ('count', 'mean', 'p50', 'p95')}
             },
             "request_statistics": {
-                "total_requests": 1247,
-                "successful_requests": 1231,
-                "failed_requests": 16,
-                "average_tokens_generated": 342
+                "total_requests": total,
+                "successful_requests": successful,
+                "failed_requests": total - successful,
+                "requests_by_outcome": requests_by_outcome,
+                "fallbacks": {labels['kind']: int(series.value) for labels, series in LLM_FALLBACKS.series()},
+                "average_tokens_generated": round(tokens / successful, 1) if successful else None
             },
+            "metrics": registry.snapshot('llm_'),
             "model_availability": {
                 model: generator.health_check() for model in generator.available_models
             },
@@ -1,9 +1,13 @@
 from flask import Blueprint, request, jsonify
+import os
 import json
 import time
 import random
+import threading
 from datetime import datetime
 from src.generatory import get_generator
+from src.services.address_index import AddressIndex, load_address_index
+from src.services.ollama_client import get_ollama_client
 
 propguard_bp = Blueprint('propguard', __name__)
 
@@ -11,7 +15,7 @@ propguard_bp = Blueprint('propguard', __name__)
 generator = get_generator()
 
 # Ollama API configuration
-OLLAMA_BASE_URL = "http://localhost:11434"
+ollama_client = get_ollama_client()
 
 # Mock property database
 MOCK_PROPERTIES = {
@@ -56,9 +60,8 @@ MOCK_PROPERTIES = {
 def call_ollama(model, prompt):
     """Call Ollama API with the specified model and prompt"""
     try:
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/generate",
-            json={
+        response = ollama_client.generate(
+            {
                 "model": model,
                 "prompt": prompt,
                 "stream": False,
@@ -76,13 +79,29 @@ def call_ollama(model, prompt):
         print(f"Error calling Ollama: {e}")
         return None
 
+# Property register: a saved index directory or a CSV/NDJSON register file; the mock database otherwise
+PROPERTY_REGISTER_PATH = os.getenv('PROPERTY_REGISTER_PATH')
+
+_address_index = None
+_address_index_lock = threading.Lock()
+
+
+def get_address_index():
+    """Process-wide register index, built or memory-mapped on first use"""
+    global _address_index
+    with _address_index_lock:
+        if _address_index is None:
+            if PROPERTY_REGISTER_PATH:
+                _address_index = load_address_index(PROPERTY_REGISTER_PATH)
+            else:
+                _address_index = AddressIndex.build(
+                    (property_data['address'], property_data) for property_data in MOCK_PROPERTIES.values()
+                )
+        return _address_index
+
 def find_property_by_address(command):
-    """Find property in mock database by address"""
-    command_lower = command.lower()
-    for key, property_data in MOCK_PROPERTIES.items():
-        if key in command_lower or any(word in command_lower for word in key.split()):
-            return property_data
-    return None
+    """Find the best-matching property in the register by address"""
+    return get_address_index().find(command)
 
 @propguard_bp.route('/process-command', methods=['POST'])
 def process_command():
@@ -332,17 +351,12 @@ def health_check():
     """Health check endpoint"""
     try:
         # Test Ollama connection
-        ollama_status = "connected"
-        try:
-            response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=5)
-            if response.status_code != 200:
-                ollama_status = "disconnected"
-        except:
-            ollama_status = "disconnected"
+        ollama_status = "connected" if ollama_client.is_available() else "disconnected"
         
         return jsonify({
             "status": "healthy",
             "ollama_status": ollama_status,
+            "ollama_pool": ollama_client.stats(),
             "available_models": ["llama3.2:1b", "deepseek-r1:8b", "codellama:7b"],
             "endpoints": [
                 "/api/propguard/process-command",
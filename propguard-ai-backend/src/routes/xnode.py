@@ -1,519 +1,97 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 import hashlib
 import json
 import time
 import random
 import asyncio
 import threading
-import math
-from datetime import datetime
+import os
+import uuid
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Dict, List, Optional, Any
+from src.services.xnode_cluster import XNodeProcessCluster
+from src.services.xnode_workers import (
+    XNodeWorker, ValuationWorker, RiskWorker, RISK_COLUMNS, RISK_GRID_PATH, RISK_GRID_RESOLUTION,
+    MC_DROPOUT_SAMPLES, get_weight_store, get_feature_store, get_risk_grid
+)
+from src.services.risk_grid import RiskGrid
+from src.services.spatial_index import get_geo_reference
+from src.services.risk_cache import risk_cache_stats
 
 xnode_bp = Blueprint('xnode', __name__)
 
-class XNodeWorker:
-    """Base XNode worker class for distributed computation"""
+class PerPropertyValuationWorker(ValuationWorker):
+    """The NumPy MLP run one property per forward pass, the baseline batched inference is measured against"""
     
-    def __init__(self, node_id: str = None):
-        self.node_id = node_id or f"node_{random.randint(1000, 9999)}"
-        self.initialized = False
-        self.computation_cache = {}
-        self.consensus_threshold = 0.75
-        
-    async def initialize(self):
-        """Initialize the worker"""
-        self.initialized = True
-        print(f"XNode Worker {self.node_id} initialized")
+    def prepare_batch(self, items):
+        return None
+    
+    async def calculate_batch(self, items, prepared=None, mode=None, mc_samples=None):
+        results = []
+        for item in items:
+            results.extend(await ValuationWorker.calculate_batch(self, [item], None, mode, mc_samples))
+        return results
 
-class ValuationWorker(XNodeWorker):
-    """Distributed property valuation worker"""
+class LinearValuationWorker(XNodeWorker):
+    """Hedonic linear valuation: a base price adjusted for bedrooms, bathrooms and land, then for risk"""
+    
+    BASE_VALUE = 800000
+    # Value per bedroom, bathroom and square metre of land relative to a 3 bed, 2 bath, 600 sqm home
+    COEFFICIENTS = np.array([50000.0, 30000.0, 100.0])
+    REFERENCE = np.array([3.0, 2.0, 600.0])
     
     def __init__(self, node_id: str = None):
         super().__init__(node_id)
-        self.model_weights = self._initialize_model_weights()
-        
-    def _initialize_model_weights(self):
-        """Initialize mock neural network weights using pure Python"""
-        # Simulate a 50-input neural network with random weights
-        return {
-            'layer1': [[random.gauss(0, 0.1) for _ in range(64)] for _ in range(50)],
-            'bias1': [random.gauss(0, 0.1) for _ in range(64)],
-            'layer2': [[random.gauss(0, 0.1) for _ in range(32)] for _ in range(64)],
-            'bias2': [random.gauss(0, 0.1) for _ in range(32)],
-            'layer3': [[random.gauss(0, 0.1) for _ in range(16)] for _ in range(32)],
-            'bias3': [random.gauss(0, 0.1) for _ in range(16)],
-            'output': [[random.gauss(0, 0.1)] for _ in range(16)],
-            'output_bias': [random.gauss(0, 0.1)]
-        }
+        # Fixed per-node spread so consensus still combines independent estimates
+        rng = random.Random(self.node_id)
+        self.node_variance = rng.uniform(0.9, 1.1)
+        self.node_confidence = 0.7 + rng.random() * 0.25
+    
+    def prepare_batch(self, items):
+        return None
     
     async def calculate_valuation(self, property_data, comparables, risk_data, market_factors):
         """Distributed valuation calculation"""
-        try:
-            # Prepare features for neural network
-            features = self._prepare_features(property_data, comparables, risk_data, market_factors)
-            
-            # Run through mock neural network
-            valuation = self._forward_pass(features)
-            
-            # Apply risk adjustments
-            risk_adjustment = self._calculate_risk_adjustment(risk_data)
-            final_valuation = valuation * risk_adjustment
-            
-            # Calculate confidence
-            confidence = self._calculate_confidence(property_data, comparables, risk_data)
-            
-            return {
-                'value': int(final_valuation),
-                'confidence': confidence,
-                'methodology': ['XNode Distributed Neural Network', 'Risk-Adjusted Valuation'],
-                'node_id': self.node_id,
-                'computation_time': time.time()
-            }
-            
-        except Exception as e:
-            print(f"Valuation error on node {self.node_id}: {e}")
-            return {
-                'value': 0,
-                'confidence': 0,
-                'error': str(e),
-                'node_id': self.node_id
-            }
-    
-    def _prepare_features(self, property_data, comparables, risk_data, market_factors):
-        """Prepare 50-dimensional feature vector using pure Python"""
-        features = [0.0] * 50
-        
-        # Property features (0-9)
-        features[0] = property_data.get('bedrooms', 3) / 5.0
-        features[1] = property_data.get('bathrooms', 2) / 3.0
-        features[2] = property_data.get('land_size', 600) / 1000.0
-        features[3] = property_data.get('floor_area', 150) / 200.0
-        features[4] = min((2024 - property_data.get('year_built', 2000)) / 50.0, 1.0)
-        features[5] = 1.0 if property_data.get('property_type') == 'House' else 0.0
-        features[6] = len(comparables) / 10.0
-        features[7] = self._average_comparable_price(comparables) / 1000000.0
-        features[8] = self._get_location_score(property_data.get('address', ''))
-        features[9] = property_data.get('last_sale_price', 800000) / 1000000.0
-        
-        # Risk features (10-19)
-        features[10] = risk_data.get('flood', 0.3)
-        features[11] = risk_data.get('fire', 0.3)
-        features[12] = risk_data.get('coastal_erosion', 0.1)
-        features[13] = risk_data.get('subsidence', 0.1)
-        features[14] = risk_data.get('cyclone', 0.1)
-        features[15] = risk_data.get('heatwave', 0.2)
-        features[16] = risk_data.get('composite', 0.25)
-        features[17] = 1.0 - risk_data.get('composite', 0.25)  # Risk inverse
-        features[18] = min(risk_data.get('flood', 0) + risk_data.get('fire', 0), 1.0)
-        features[19] = max(risk_data.get('coastal_erosion', 0), risk_data.get('subsidence', 0))
-        
-        # Market features (20-29)
-        features[20] = market_factors.get('interest_rates', 0.05) / 0.1
-        features[21] = market_factors.get('unemployment', 0.05) / 0.1
-        features[22] = market_factors.get('inflation', 0.03) / 0.1
-        features[23] = market_factors.get('population_growth', 0.02) / 0.05
-        features[24] = market_factors.get('market_sentiment', 0.7)
-        features[25] = market_factors.get('rental_yield', 0.035) / 0.1
-        features[26] = market_factors.get('auction_clearance', 0.7)
-        features[27] = market_factors.get('days_on_market', 45) / 100.0
-        features[28] = market_factors.get('price_growth', 0.05) / 0.2
-        features[29] = market_factors.get('volume_change', 0.1) / 0.5
-        
-        # Comparable features (30-39)
-        recent_comparables = [c for c in comparables if self._is_recent_sale(c.get('sale_date', ''))]
-        features[30] = len(recent_comparables) / 5.0
-        features[31] = self._comparable_price_variance(comparables)
-        features[32] = self._comparable_size_similarity(property_data, comparables)
-        features[33] = self._comparable_age_similarity(property_data, comparables)
-        features[34] = self._comparable_type_match(property_data, comparables)
-        features[35] = min(len([c for c in comparables if c.get('price', 0) > 0]), 10) / 10.0
-        features[36] = self._median_comparable_price(comparables) / 1000000.0
-        features[37] = self._comparable_distance_factor(comparables)
-        features[38] = self._comparable_market_time(comparables)
-        features[39] = self._comparable_quality_score(comparables)
-        
-        # Additional engineered features (40-49)
-        features[40] = features[0] * features[1]  # Bed-bath interaction
-        features[41] = features[2] * features[5]  # Land size * house type
-        features[42] = features[10] * features[11]  # Flood * fire risk
-        features[43] = features[20] * features[24]  # Interest rate * sentiment
-        features[44] = features[7] * features[16]  # Comparable price * risk
-        features[45] = math.sqrt(features[2] * features[3])  # Size composite
-        features[46] = (features[10] + features[11] + features[12]) / 3  # Climate risk avg
-        features[47] = (features[20] + features[21] + features[22]) / 3  # Economic factors avg
-        features[48] = features[6] * features[31]  # Comparable count * variance
-        features[49] = features[8] * features[24]  # Location * sentiment
-        
-        return features
-    
-    def _matrix_multiply(self, matrix, vector):
-        """Matrix multiplication using pure Python"""
-        result = []
-        for row in matrix:
-            dot_product = sum(a * b for a, b in zip(row, vector))
-            result.append(dot_product)
-        return result
-    
-    def _vector_add(self, vec1, vec2):
-        """Vector addition using pure Python"""
-        return [a + b for a, b in zip(vec1, vec2)]
-    
-    def _relu(self, vector):
-        """ReLU activation function"""
-        return [max(0, x) for x in vector]
-    
-    def _dropout(self, vector, rate=0.2):
-        """Simulate dropout during training"""
-        return [x if random.random() > rate else 0 for x in vector]
-    
-    def _forward_pass(self, features):
-        """Forward pass through mock neural network using pure Python"""
-        # Layer 1
-        x = self._matrix_multiply(self.model_weights['layer1'], features)
-        x = self._vector_add(x, self.model_weights['bias1'])
-        x = self._relu(x)
-        x = self._dropout(x, 0.2)
-        
-        # Layer 2
-        x = self._matrix_multiply(self.model_weights['layer2'], x)
-        x = self._vector_add(x, self.model_weights['bias2'])
-        x = self._relu(x)
-        x = self._dropout(x, 0.2)
-        
-        # Layer 3
-        x = self._matrix_multiply(self.model_weights['layer3'], x)
-        x = self._vector_add(x, self.model_weights['bias3'])
-        x = self._relu(x)
-        
-        # Output layer
-        output = self._matrix_multiply(self.model_weights['output'], x)
-        output = self._vector_add(output, self.model_weights['output_bias'])
-        
-        # Apply sigmoid-like scaling to get reasonable property values
-        valuation = 500000 + (1000000 * (1 / (1 + math.exp(-output[0]))))
-        
-        return valuation
-    
-    
-    def _calculate_risk_adjustment(self, risk_data):
-        """Calculate risk adjustment multiplier"""
-        composite_risk = risk_data.get('composite', 0.25)
-        # Risk adjustment between 0.7 and 1.0
-        return max(0.7, 1.0 - (composite_risk * 0.3))
-    
-    def _calculate_confidence(self, property_data, comparables, risk_data):
-        """Calculate confidence score"""
-        confidence = 0.5  # Base confidence
-        
-        # More comparables = higher confidence
-        confidence += min(0.3, len(comparables) * 0.03)
-        
-        # Recent comparables boost confidence
-        recent_count = len([c for c in comparables if self._is_recent_sale(c.get('sale_date', ''))])
-        confidence += min(0.2, recent_count * 0.04)
-        
-        # Complete property data
-        if all(property_data.get(field) for field in ['bedrooms', 'bathrooms', 'land_size']):
-            confidence += 0.1
-        
-        # Lower risk = higher confidence
-        confidence += (1 - risk_data.get('composite', 0.25)) * 0.15
-        
-        return max(0.3, min(0.95, confidence))
-    
-    def _average_comparable_price(self, comparables):
-        """Calculate average comparable price"""
-        if not comparables:
-            return 800000
-        prices = [c.get('price', 0) for c in comparables if c.get('price', 0) > 0]
-        return sum(prices) / len(prices) if prices else 800000
-    
-    def _get_location_score(self, address):
-        """Get location premium score"""
-        premium_areas = ['sydney', 'melbourne', 'toorak', 'mosman', 'double bay', 'paddington']
-        address_lower = address.lower()
-        return 0.8 if any(area in address_lower for area in premium_areas) else 0.5
-    
-    def _is_recent_sale(self, sale_date):
-        """Check if sale is within last 6 months"""
-        if not sale_date:
-            return False
-        try:
-            sale = datetime.strptime(sale_date, '%Y-%m-%d')
-            return (datetime.now() - sale).days < 180
-        except:
-            return False
-    
-    def _comparable_price_variance(self, comparables):
-        """Calculate price variance in comparables"""
-        if len(comparables) < 2:
-            return 0.5
-        prices = [c.get('price', 0) for c in comparables if c.get('price', 0) > 0]
-        if len(prices) < 2:
-            return 0.5
-        mean_price = sum(prices) / len(prices)
-        variance = sum((p - mean_price) ** 2 for p in prices) / len(prices)
-        return min(1.0, variance / (mean_price ** 2))
-    
-    def _comparable_size_similarity(self, property_data, comparables):
-        """Calculate size similarity with comparables"""
-        prop_size = property_data.get('floor_area', 150)
-        if not comparables:
-            return 0.5
-        
-        similarities = []
-        for comp in comparables:
-            comp_size = comp.get('floor_area', 150)
-            similarity = 1 - abs(prop_size - comp_size) / max(prop_size, comp_size)
-            similarities.append(max(0, similarity))
-        
-        return sum(similarities) / len(similarities) if similarities else 0.5
-    
-    def _comparable_age_similarity(self, property_data, comparables):
-        """Calculate age similarity with comparables"""
-        prop_age = 2024 - property_data.get('year_built', 2000)
-        if not comparables:
-            return 0.5
-        
-        similarities = []
-        for comp in comparables:
-            comp_age = 2024 - comp.get('year_built', 2000)
-            age_diff = abs(prop_age - comp_age)
-            similarity = max(0, 1 - age_diff / 50)  # 50 year max difference
-            similarities.append(similarity)
-        
-        return sum(similarities) / len(similarities) if similarities else 0.5
-    
-    def _comparable_type_match(self, property_data, comparables):
-        """Calculate property type match ratio"""
-        prop_type = property_data.get('property_type', 'House')
-        if not comparables:
-            return 0.5
-        
-        matches = sum(1 for c in comparables if c.get('property_type') == prop_type)
-        return matches / len(comparables)
-    
-    def _median_comparable_price(self, comparables):
-        """Calculate median comparable price"""
-        if not comparables:
-            return 800000
-        prices = sorted([c.get('price', 0) for c in comparables if c.get('price', 0) > 0])
-        if not prices:
-            return 800000
-        n = len(prices)
-        return prices[n // 2] if n % 2 == 1 else (prices[n // 2 - 1] + prices[n // 2]) / 2
-    
-    def _comparable_distance_factor(self, comparables):
-        """Mock distance factor for comparables"""
-        # In real implementation, would calculate actual distances
-        return 0.8 if len(comparables) > 3 else 0.6
-    
-    def _comparable_market_time(self, comparables):
-        """Calculate average market time for comparables"""
-        if not comparables:
-            return 0.5
-        
-        market_times = []
-        for comp in comparables:
-            # Mock market time calculation
-            days_on_market = comp.get('days_on_market', 45)
-            normalized_time = min(1.0, days_on_market / 100)
-            market_times.append(1 - normalized_time)  # Faster sale = better
-        
-        return sum(market_times) / len(market_times) if market_times else 0.5
-    
-    def _comparable_quality_score(self, comparables):
-        """Calculate overall quality score of comparables"""
-        if not comparables:
-            return 0.5
-        
-        quality_scores = []
-        for comp in comparables:
-            score = 0.5  # Base score
-            
-            # Recent sale bonus
-            if self._is_recent_sale(comp.get('sale_date', '')):
-                score += 0.2
-            
-            # Complete data bonus
-            if all(comp.get(field) for field in ['bedrooms', 'bathrooms', 'price']):
-                score += 0.2
-            
-            # Reasonable price range
-            price = comp.get('price', 0)
-            if 200000 <= price <= 5000000:
-                score += 0.1
-            
-            quality_scores.append(min(1.0, score))
-        
-        return sum(quality_scores) / len(quality_scores) if quality_scores else 0.5
-
-class RiskWorker(XNodeWorker):
-    """Distributed risk assessment worker"""
-    
-    async def assess_climate_risk(self, lat, lng):
-        """Distributed climate risk assessment"""
-        try:
-            # Simulate distributed risk calculation
-            risks = {
-                'flood': self._calculate_flood_risk(lat, lng),
-                'fire': self._calculate_fire_risk(lat, lng),
-                'coastal': self._calculate_coastal_risk(lat, lng),
-                'subsidence': self._calculate_subsidence_risk(lat, lng),
-                'cyclone': self._calculate_cyclone_risk(lat),
-                'heatwave': self._calculate_heatwave_risk(lat, lng)
-            }
-            
-            risks['composite'] = self._calculate_composite_risk(risks)
-            
-            confidence = self._calculate_risk_confidence(lat, lng)
-            
-            return {
-                'risks': risks,
-                'confidence': confidence,
-                'data_source': 'xnode_distributed',
-                'node_id': self.node_id,
-                'computation_time': time.time()
-            }
-            
-        except Exception as e:
-            print(f"Risk assessment error on node {self.node_id}: {e}")
-            return {
-                'risks': self._get_fallback_risks(lat, lng),
-                'confidence': 0.3,
-                'data_source': 'fallback',
-                'node_id': self.node_id,
-                'error': str(e)
-            }
-    
-    def _calculate_flood_risk(self, lat, lng):
-        """Calculate flood risk based on location"""
-        # Simulate flood risk calculation
-        coastal_factor = max(0, 1 - self._distance_from_coast(lat, lng) / 20)
-        river_factor = abs(np.sin(lat * 10) * np.cos(lng * 10))
-        elevation_factor = max(0, 1 - abs(lat + 33) * 0.1)  # Lower elevation = higher risk
-        
-        return min(1.0, (coastal_factor * 0.4 + river_factor * 0.4 + elevation_factor * 0.2))
-    
-    def _calculate_fire_risk(self, lat, lng):
-        """Calculate bushfire risk"""
-        # Higher risk for inland and northern areas
-        inland_factor = min(1.0, self._distance_from_coast(lat, lng) / 100)
-        northern_factor = max(0, (lat + 20) / 15)  # More northern = higher risk
-        vegetation_factor = 0.6 + random.random() * 0.4  # Mock vegetation density
-        
-        return min(1.0, (inland_factor * 0.3 + northern_factor * 0.4 + vegetation_factor * 0.3))
-    
-    def _calculate_coastal_risk(self, lat, lng):
-        """Calculate coastal erosion risk"""
-        distance = self._distance_from_coast(lat, lng)
-        if distance > 10:
-            return 0
-        elif distance > 5:
-            return 0.1
-        elif distance > 1:
-            return 0.3
-        else:
-            return 0.7
-    
-    def _calculate_subsidence_risk(self, lat, lng):
-        """Calculate subsidence risk"""
-        # Mock mining area detection
-        mining_areas = [
-            (-32.5, 151.5, 0.6),  # Hunter Valley
-            (-37.5, 145.0, 0.4),  # Latrobe Valley
-            (-23.5, 150.5, 0.5),  # Bowen Basin
-        ]
-        
-        base_risk = 0.1
-        for mine_lat, mine_lng, risk_level in mining_areas:
-            distance = np.sqrt((lat - mine_lat)**2 + (lng - mine_lng)**2)
-            if distance < 2:  # Within 2 degrees
-                base_risk += risk_level * (1 - distance / 2)
-        
-        return min(1.0, base_risk)
-    
-    def _calculate_cyclone_risk(self, lat):
-        """Calculate cyclone risk based on latitude"""
-        if lat > -20:
-            return min(0.8, max(0.3, (lat + 20) / 15))
-        elif lat > -25:
-            return 0.2
-        else:
-            return 0.05
-    
-    def _calculate_heatwave_risk(self, lat, lng):
-        """Calculate heatwave risk"""
-        inland_factor = min(0.4, self._distance_from_coast(lat, lng) / 100)
-        northern_factor = min(0.4, (35 - abs(lat)) / 20)
-        base_risk = 0.2
-        
-        return min(1.0, base_risk + inland_factor + northern_factor)
-    
-    def _calculate_composite_risk(self, risks):
-        """Calculate weighted composite risk"""
-        weights = {
-            'flood': 0.25,
-            'fire': 0.25,
-            'coastal': 0.15,
-            'subsidence': 0.15,
-            'cyclone': 0.10,
-            'heatwave': 0.10
-        }
-        
-        composite = 0
-        for risk_type, weight in weights.items():
-            if risk_type in risks:
-                composite += risks[risk_type] * weight
-        
-        return composite
-    
-    def _calculate_risk_confidence(self, lat, lng):
-        """Calculate confidence in risk assessment"""
-        # Higher confidence for well-known areas
-        major_cities = [
-            (-33.8688, 151.2093),  # Sydney
-            (-37.8136, 144.9631),  # Melbourne
-            (-27.4698, 153.0251),  # Brisbane
-        ]
-        
-        min_distance = min(
-            np.sqrt((lat - city_lat)**2 + (lng - city_lng)**2)
-            for city_lat, city_lng in major_cities
-        )
-        
-        # Closer to major cities = higher confidence
-        confidence = max(0.5, 1 - min_distance / 10)
-        return confidence
-    
-    def _distance_from_coast(self, lat, lng):
-        """Calculate approximate distance from Australian coast"""
-        # Simplified calculation using major coastal points
-        coastal_points = [
-            (-33.8688, 151.2093),  # Sydney
-            (-37.8136, 144.9631),  # Melbourne
-            (-31.9505, 115.8605),  # Perth
-            (-27.4698, 153.0251),  # Brisbane
-        ]
-        
-        distances = [
-            np.sqrt((lat - coast_lat)**2 + (lng - coast_lng)**2) * 111  # Convert to km
-            for coast_lat, coast_lng in coastal_points
-        ]
+        items = [{'property_data': property_data, 'comparables': comparables, 'risk_data': risk_data, 'market_factors': market_factors}]
+        return (await self.calculate_batch(items))[0]
+    
+    async def calculate_batch(self, items, prepared=None, mode=None, mc_samples=None):
+        """Value every item with one matrix-vector product"""
+        results = [None] * len(items)
+        rows, attributes, composite = [], [], []
+        for i, item in enumerate(items):
+            try:
+                if 'property_data' not in item:
+                    raise ValueError("property_data is required for the simple-linear engine")
+                property_data = item['property_data']
+                row = [
+                    float(property_data.get('bedrooms', 3)),
+                    float(property_data.get('bathrooms', 2)),
+                    float(property_data.get('land_size', 600))
+                ]
+                risk = float(item.get('risk_data', {}).get('composite', 0.25))
+            except Exception as e:
+                results[i] = {'value': 0, 'confidence': 0, 'error': str(e), 'node_id': self.node_id}
+                continue
+            rows.append(i)
+            attributes.append(row)
+            composite.append(risk)
+        
+        if rows:
+            values = self.BASE_VALUE + (np.asarray(attributes) - self.REFERENCE) @ self.COEFFICIENTS
+            values *= np.maximum(0.7, 1.0 - np.asarray(composite) * 0.3) * self.node_variance
+            computation_time = time.time()
+            for i, value in zip(rows, values):
+                results[i] = {
+                    'value': int(value),
+                    'confidence': self.node_confidence,
+                    'methodology': ['XNode Distributed Valuation', 'Linear Hedonic Model'],
+                    'node_id': self.node_id,
+                    'computation_time': computation_time
+                }
         
-        return min(distances)
-    
-    def _get_fallback_risks(self, lat, lng):
-        """Get fallback risk values"""
-        return {
-            'flood': 0.3,
-            'fire': 0.3,
-            'coastal': 0.1,
-            'subsidence': 0.1,
-            'cyclone': 0.1,
-            'heatwave': 0.2,
-            'composite': 0.25
-        }
+        return results
 
 class XNodeConsensus:
     """XNode consensus mechanism for distributed computation"""
@@ -580,6 +158,22 @@ class XNodeConsensus:
             'data_quality': self._assess_data_quality(valid_assessments)
         }
     
+    def aggregate_risk_rows(self, per_worker_rows):
+        """
+        Vectorised aggregate_risk_assessments over (N x 8) rows from each worker.
+        Returns (final risks N x 7, consensus confidence N, participating node count N).
+        """
+        stacked = np.stack(per_worker_rows)
+        confidence = stacked[:, :, -1]
+        weights = np.where(confidence > 0.3, confidence, 0.0)
+        total_weight = weights.sum(axis=0)
+        node_count = (weights > 0).sum(axis=0)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            final_risks = np.einsum('wn,wnc->nc', weights, stacked[:, :, :-1]) / total_weight[:, None]
+            consensus_confidence = total_weight / node_count
+        return final_risks, consensus_confidence, node_count
+    
     def _assess_data_quality(self, assessments):
         """Assess overall data quality"""
         live_data_count = sum(1 for a in assessments if a.get('data_source') == 'xnode_distributed')
@@ -594,10 +188,212 @@ class XNodeConsensus:
         else:
             return 'poor'
 
+class XNodeExecutor:
+    """Fan-out executor that runs worker coroutines concurrently on a shared thread pool"""
+    
+    def __init__(self, max_threads: int = 16, worker_timeout: float = 2.0):
+        self.max_threads = max_threads
+        self.worker_timeout = worker_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='xnode')
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.stats = {'dispatched': 0, 'completed': 0, 'failed': 0, 'timed_out': 0}
+    
+    def _run_in_thread(self, fn, *args):
+        """Run fn(*args) to completion on this pool thread's long-lived event loop"""
+        loop = getattr(self._local, 'loop', None)
+        if loop is None:
+            loop = asyncio.new_event_loop()
+            self._local.loop = loop
+        return loop.run_until_complete(fn(*args))
+    
+    def _record(self, key, count=1):
+        with self._stats_lock:
+            self.stats[key] += count
+    
+    def run(self, fn, *args):
+        """Run a single coroutine function on the pool and wait for its result"""
+        return self._pool.submit(self._run_in_thread, fn, *args).result()
+    
+    def fan_out(self, workers, call, timeout: float = None):
+        """
+        Dispatch call(worker) for every worker at once and gather under one deadline.
+        Returns (results, dropped_node_ids); results keep worker order.
+        """
+        timeout = self.worker_timeout if timeout is None else timeout
+        futures = [(worker, self._pool.submit(self._run_in_thread, call, worker)) for worker in workers]
+        self._record('dispatched', len(futures))
+        
+        wait([future for _, future in futures], timeout=timeout)
+        
+        results, dropped = [], []
+        for worker, future in futures:
+            if not future.done():
+                # Slow workers are left to finish in the background and excluded from consensus
+                future.cancel()
+                dropped.append(worker.node_id)
+                self._record('timed_out')
+                print(f"Worker {worker.node_id} missed the {timeout}s deadline")
+            elif future.exception() is not None:
+                self._record('failed')
+                print(f"Worker {worker.node_id} failed: {future.exception()}")
+            else:
+                self._record('completed')
+                results.append(future.result())
+        
+        return results, dropped
+
+class RemoteValuationWorker(ValuationWorker):
+    """ValuationWorker whose feature building and forward pass run in an XNode cluster process"""
+    
+    def __init__(self, local_worker: ValuationWorker, cluster):
+        XNodeWorker.__init__(self, local_worker.node_id)
+        self.dtype = local_worker.dtype
+        self.member = local_worker.member
+        self.mode = local_worker.mode
+        self.set_model_weights(local_worker.model_weights, local_worker.weights_checksum)
+        self.cluster = cluster
+    
+    def reload_weights(self):
+        """Reload in the hosting process, then mirror its version locally for health reporting"""
+        checksum = self.cluster.reload_weights(self.node_id)
+        super().reload_weights()
+        if checksum != self.weights_checksum:
+            raise RuntimeError(f"Process for {self.node_id} loaded weights {checksum[:16]}, expected {self.weights_checksum[:16]}")
+        return checksum
+    
+    def prepare_batch(self, items):
+        """Key under which workers sharing a process build the batch's features once"""
+        return uuid.uuid4().hex
+    
+    async def calculate_batch(self, items, prepared=None, mode=None, mc_samples=None):
+        """Value the batch in the hosting process, features, feature-store I/O and inference included"""
+        return self.cluster.value_batch(self.node_id, items, prepared, mode or self.mode, mc_samples)
+
+class RemoteRiskWorker(RiskWorker):
+    """RiskWorker whose assessments run in an XNode cluster process"""
+    
+    def __init__(self, local_worker: RiskWorker, cluster):
+        XNodeWorker.__init__(self, local_worker.node_id)
+        self.cluster = cluster
+    
+    async def assess_climate_risk(self, lat, lng):
+        """Distributed climate risk assessment"""
+        try:
+            rows, errors = self.cluster.assess_risk(self.node_id, [(lat, lng)])
+        except Exception as e:
+            print(f"Risk assessment error on node {self.node_id}: {e}")
+            errors, rows = {0: str(e)}, None
+        
+        if 0 in errors:
+            return {
+                'risks': self._get_fallback_risks(lat, lng),
+                'confidence': 0.3,
+                'data_source': 'fallback',
+                'node_id': self.node_id,
+                'error': errors[0]
+            }
+        
+        return {
+            'risks': dict(zip(RISK_COLUMNS, rows[0, :-1].tolist())),
+            'confidence': float(rows[0, -1]),
+            'data_source': 'xnode_distributed',
+            'node_id': self.node_id,
+            'computation_time': time.time()
+        }
+    
+    async def assess_climate_risk_batch(self, coords):
+        """Assess an (N x 2) lat/lng array in the hosting process"""
+        rows, errors = self.cluster.assess_risk(self.node_id, coords)
+        if errors:
+            raise RuntimeError(next(iter(errors.values())))
+        return rows
+
+def worker_spec(worker):
+    """Describe a worker so an XNode cluster process can rebuild it"""
+    if isinstance(worker, ValuationWorker):
+        return {'kind': 'valuation', 'node_id': worker.node_id, 'dtype': worker.dtype.str, 'member': worker.member}
+    return {'kind': 'risk', 'node_id': worker.node_id}
+
+def build_valuation_engines(batched):
+    """Interchangeable valuation backends sharing the calculate_valuation / calculate_batch API"""
+    return {
+        'simple-linear': [LinearValuationWorker(f"lin_node_{i}") for i in range(len(batched))],
+        'numpy-mlp': [
+            PerPropertyValuationWorker(f"mlp_node_{i}", member=worker.member, mode=INFERENCE_MODE)
+            for i, worker in enumerate(batched)
+        ],
+        # Only this engine is hosted in cluster processes when process mode is enabled
+        'batched-mlp': batched
+    }
+
+def build_workers():
+    """Create the XNode workers, hosting them in worker processes when process mode is enabled"""
+    valuation = [ValuationWorker(f"val_node_{i}", member=i, mode=INFERENCE_MODE) for i in range(3)]
+    risk = [RiskWorker(f"risk_node_{i}") for i in range(3)]
+    
+    if EXECUTION_MODE != 'process':
+        return valuation, risk, None
+    
+    cluster = XNodeProcessCluster(
+        pool_size=int(os.getenv('XNODE_PROCESS_POOL_SIZE', str(os.cpu_count() or 1))),
+        specs=[worker_spec(worker) for worker in valuation + risk],
+        call_timeout=float(os.getenv('XNODE_PROCESS_CALL_TIMEOUT', '30.0'))
+    )
+    for worker in valuation + risk:
+        worker.initialized = True
+    valuation = [RemoteValuationWorker(worker, cluster) for worker in valuation]
+    risk = [RemoteRiskWorker(worker, cluster) for worker in risk]
+    return valuation, risk, cluster
+
 # Initialize XNode components
-valuation_workers = [ValuationWorker(f"val_node_{i}") for i in range(3)]
-risk_workers = [RiskWorker(f"risk_node_{i}") for i in range(3)]
+weight_store = get_weight_store()
+# Coast, urban-centre, mining-area and major-city indexes shared by every risk calculator
+geo_reference = get_geo_reference()
+
+def open_risk_grid():
+    """Memory-map the risk grid, building it first if it is missing or stale and XNODE_RISK_GRID_AUTOBUILD=1"""
+    grid = get_risk_grid()
+    if grid is None and RISK_GRID_PATH and os.getenv('XNODE_RISK_GRID_AUTOBUILD', '0') == '1':
+        try:
+            RiskGrid.build(RiskWorker("risk_grid_builder")._risk_layers, resolution=RISK_GRID_RESOLUTION,
+                           source=geo_reference.checksum).save(RISK_GRID_PATH)
+            grid = get_risk_grid(reload=True)
+        except Exception as e:
+            print(f"Risk grid build failed, assessing risk on the fly: {e}")
+    elif grid is None and RISK_GRID_PATH:
+        print(f"No current risk grid at {RISK_GRID_PATH}; assessing risk on the fly "
+              f"(build one with: python -m src.services.risk_grid)")
+    return grid
+
+# Built before the cluster starts so its processes find a current grid on disk
+risk_grid = open_risk_grid()
+# Default valuation forward pass; requests may override it with 'inference_mode'
+INFERENCE_MODE = os.getenv('XNODE_INFERENCE_MODE', 'inference')
+MAX_MC_DROPOUT_SAMPLES = 256
+# 'thread' runs workers in this process; 'process' hosts each worker in an XNode cluster process
+EXECUTION_MODE = os.getenv('XNODE_EXECUTION_MODE', 'thread')
+batched_workers, risk_workers, process_cluster = build_workers()
+valuation_engines = build_valuation_engines(batched_workers)
+DEFAULT_VALUATION_ENGINE = os.getenv('XNODE_VALUATION_ENGINE', 'batched-mlp')
+if DEFAULT_VALUATION_ENGINE not in valuation_engines:
+    raise ValueError(f"Unknown XNODE_VALUATION_ENGINE: {DEFAULT_VALUATION_ENGINE}")
+valuation_workers = valuation_engines[DEFAULT_VALUATION_ENGINE]
+# Per-engine throughput, so backends can be compared on live traffic
+engine_stats = {name: {'requests': 0, 'properties': 0, 'seconds': 0.0} for name in valuation_engines}
+engine_stats_lock = threading.Lock()
 consensus_engine = XNodeConsensus()
+executor = XNodeExecutor(
+    max_threads=int(os.getenv('XNODE_EXECUTOR_THREADS', '16')),
+    worker_timeout=float(os.getenv('XNODE_WORKER_TIMEOUT', '2.0'))
+)
+
+# Per-worker deadline for one batch chunk, which carries far more work than a single valuation
+BATCH_WORKER_TIMEOUT = float(os.getenv('XNODE_BATCH_WORKER_TIMEOUT', '30.0'))
+# Properties pushed through the network per forward pass in batch mode
+BATCH_CHUNK_SIZE = 512
+# Coordinates assessed per worker call, and per streamed line, in batch risk mode
+RISK_BATCH_CHUNK_SIZE = int(os.getenv('XNODE_RISK_BATCH_CHUNK_SIZE', '10000'))
 
 @xnode_bp.route('/distributed-valuation', methods=['POST'])
 def distributed_valuation():
@@ -610,30 +406,31 @@ def distributed_valuation():
             if field not in data:
                 return jsonify({"error": f"Missing required field: {field}"}), 400
         
+        try:
+            mode, mc_samples = _inference_options(data)
+            engine, workers = _valuation_engine(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
         computation_id = hashlib.sha256(
             f"{json.dumps(data, sort_keys=True)}{time.time()}".encode()
         ).hexdigest()[:16]
         
-        # Distribute computation across nodes
-        valuations = []
-        for worker in valuation_workers:
-            try:
-                # Simulate async computation
-                result = asyncio.run(worker.calculate_valuation(
-                    data['property_data'],
-                    data['comparables'],
-                    data['risk_data'],
-                    data['market_factors']
-                ))
-                valuations.append(result)
-            except Exception as e:
-                print(f"Worker {worker.node_id} failed: {e}")
-                continue
+        # Features are worker-independent: build them once, then distribute inference across nodes
+        items = [{field: data[field] for field in required_fields}]
+        if data.get('property_id') is not None:
+            items[0]['property_id'] = data['property_id']
+        started = time.time()
+        prepared = workers[0].prepare_batch(items)
+        results, dropped_nodes = executor.fan_out(
+            workers,
+            lambda worker: worker.calculate_batch(items, prepared, mode, mc_samples)
+        )
+        valuations = [result[0] for result in results]
+        _record_engine(engine, 1, time.time() - started)
         
         # Aggregate results using consensus
-        consensus_result = asyncio.run(
-            consensus_engine.aggregate_valuations(computation_id, valuations)
-        )
+        consensus_result = executor.run(consensus_engine.aggregate_valuations, computation_id, valuations)
         
         if not consensus_result:
             return jsonify({"error": "Consensus failed - insufficient valid results"}), 500
@@ -644,9 +441,14 @@ def distributed_valuation():
             "consensus_result": consensus_result,
             "individual_results": valuations,
             "xnode_metadata": {
-                "total_nodes": len(valuation_workers),
+                "total_nodes": len(workers),
                 "participating_nodes": len(valuations),
+                "dropped_nodes": dropped_nodes,
                 "consensus_threshold": consensus_engine.threshold,
+                "engine": engine,
+                "inference_mode": mode,
+                "weights_version": weight_store.version,
+                "weights_checksum": weight_store.checksum,
                 "computation_time": time.time()
             }
         })
@@ -654,6 +456,160 @@ def distributed_valuation():
     except Exception as e:
         return jsonify({"error": f"Distributed valuation failed: {str(e)}"}), 500
 
+@xnode_bp.route('/distributed-valuation/batch', methods=['POST'])
+def distributed_valuation_batch():
+    """Value many properties per worker forward pass, streamed back as NDJSON"""
+    try:
+        data = request.get_json()
+        properties = data.get('properties') if data else None
+        
+        if not isinstance(properties, list) or not properties:
+            return jsonify({"error": "properties must be a non-empty list"}), 400
+        
+        for index, item in enumerate(properties):
+            if not isinstance(item, dict) or ('property_data' not in item and item.get('property_id') is None):
+                return jsonify({"error": f"Missing required field: property_data or property_id (properties[{index}])"}), 400
+        
+        try:
+            mode, mc_samples = _inference_options(data)
+            engine, workers = _valuation_engine(data)
+            chunk_size = _chunk_size(data, BATCH_CHUNK_SIZE)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        default_market_factors = data.get('market_factors', {})
+        batch_id = hashlib.sha256(f"{len(properties)}{time.time()}".encode()).hexdigest()[:16]
+        
+    except Exception as e:
+        return jsonify({"error": f"Distributed batch valuation failed: {str(e)}"}), 500
+    
+    def generate():
+        started = time.time()
+        succeeded = 0
+        
+        for offset in range(0, len(properties), chunk_size):
+            chunk = [_batch_item(item, default_market_factors) for item in properties[offset:offset + chunk_size]]
+            
+            try:
+                lines = _valuation_batch_chunk(batch_id, offset, chunk, engine, workers, mode, mc_samples)
+            except Exception as e:
+                lines = [
+                    {"index": offset + i, "success": False, "error": f"Batch chunk failed: {str(e)}"}
+                    for i in range(len(chunk))
+                ]
+            
+            for line in lines:
+                succeeded += 1 if line['success'] else 0
+                yield json.dumps(line) + "\n"
+        
+        yield json.dumps({
+            "summary": {
+                "batch_id": batch_id,
+                "total_properties": len(properties),
+                "successful": succeeded,
+                "failed": len(properties) - succeeded,
+                "chunk_size": chunk_size,
+                "engine": engine,
+                "inference_mode": mode,
+                "weights_version": weight_store.version,
+                "weights_checksum": weight_store.checksum,
+                "elapsed_seconds": round(time.time() - started, 4)
+            }
+        }) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _batch_item(item, default_market_factors):
+    """Normalise one batch entry; entries with only a property_id are valued from the feature store"""
+    entry = {'market_factors': item.get('market_factors', default_market_factors)}
+    if item.get('property_id') is not None:
+        entry['property_id'] = item['property_id']
+    if 'property_data' in item:
+        entry['property_data'] = item['property_data']
+        entry['comparables'] = item.get('comparables', [])
+        entry['risk_data'] = item.get('risk_data', {})
+    return entry
+
+def _inference_options(data):
+    """Validated (mode, mc_samples) for a valuation request, falling back to the configured defaults"""
+    mode = data.get('inference_mode', INFERENCE_MODE)
+    if mode not in ValuationWorker.MODES:
+        raise ValueError(f"inference_mode must be one of {', '.join(ValuationWorker.MODES)}")
+    
+    try:
+        mc_samples = int(data.get('mc_samples', MC_DROPOUT_SAMPLES))
+    except (TypeError, ValueError):
+        raise ValueError("mc_samples must be an integer")
+    if not 2 <= mc_samples <= MAX_MC_DROPOUT_SAMPLES:
+        raise ValueError(f"mc_samples must be between 2 and {MAX_MC_DROPOUT_SAMPLES}")
+    return mode, mc_samples
+
+def _chunk_size(data, limit):
+    """Requested chunk_size clamped to [1, limit]; defaults to limit"""
+    try:
+        chunk_size = int(data.get('chunk_size', limit))
+    except (TypeError, ValueError):
+        raise ValueError("chunk_size must be an integer")
+    return max(1, min(chunk_size, limit))
+
+def _valuation_engine(data):
+    """(engine name, workers) requested by a valuation call, falling back to XNODE_VALUATION_ENGINE"""
+    engine = data.get('engine', DEFAULT_VALUATION_ENGINE)
+    if not isinstance(engine, str) or engine not in valuation_engines:
+        raise ValueError(f"engine must be one of {', '.join(valuation_engines)}")
+    return engine, valuation_engines[engine]
+
+def _record_engine(engine, properties, seconds):
+    with engine_stats_lock:
+        stats = engine_stats[engine]
+        stats['requests'] += 1
+        stats['properties'] += properties
+        stats['seconds'] += seconds
+
+def _valuation_batch_chunk(batch_id, offset, chunk, engine=DEFAULT_VALUATION_ENGINE, workers=None,
+                           mode=None, mc_samples=None):
+    """Run one chunk through every valuation worker and reach consensus per property"""
+    workers = workers or valuation_engines[engine]
+    started = time.time()
+    prepared = workers[0].prepare_batch(chunk)
+    per_worker, dropped_nodes = executor.fan_out(
+        workers,
+        lambda worker: worker.calculate_batch(chunk, prepared, mode, mc_samples),
+        timeout=BATCH_WORKER_TIMEOUT
+    )
+    _record_engine(engine, len(chunk), time.time() - started)
+    return executor.run(_batch_consensus, batch_id, offset, chunk, per_worker)
+
+async def _batch_consensus(batch_id, offset, chunk, per_worker):
+    """Aggregate per-worker batch results into one consensus line per property"""
+    lines = []
+    for i in range(len(chunk)):
+        index = offset + i
+        computation_id = f"{batch_id}_{index}"
+        valuations = [results[i] for results in per_worker]
+        consensus_result = await consensus_engine.aggregate_valuations(computation_id, valuations)
+        
+        if consensus_result:
+            lines.append({
+                "index": index,
+                "success": True,
+                "computation_id": computation_id,
+                "consensus_result": consensus_result,
+                "individual_results": valuations
+            })
+        else:
+            lines.append({
+                "index": index,
+                "success": False,
+                "computation_id": computation_id,
+                "error": "Consensus failed - insufficient valid results",
+                "individual_results": valuations
+            })
+        if 'property_id' in chunk[i]:
+            lines[-1]['property_id'] = chunk[i]['property_id']
+    
+    return lines
+
 @xnode_bp.route('/distributed-risk-assessment', methods=['POST'])
 def distributed_risk_assessment():
     """Perform distributed risk assessment across XNodes"""
@@ -666,24 +622,26 @@ def distributed_risk_assessment():
         if lat is None or lng is None:
             return jsonify({"error": "Latitude and longitude are required"}), 400
         
+        try:
+            lat, lng = float(lat), float(lng)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Latitude and longitude must be numbers"}), 400
+        invalid = _invalid_coords(np.array([[lat, lng]]))
+        if invalid:
+            return jsonify({"error": f"Invalid coordinates: {invalid[0]['error']}"}), 400
+        
         computation_id = hashlib.sha256(
             f"{lat}{lng}{time.time()}".encode()
         ).hexdigest()[:16]
         
-        # Distribute risk assessment across nodes
-        assessments = []
-        for worker in risk_workers:
-            try:
-                result = asyncio.run(worker.assess_climate_risk(lat, lng))
-                assessments.append(result)
-            except Exception as e:
-                print(f"Risk worker {worker.node_id} failed: {e}")
-                continue
+        # Distribute risk assessment across nodes concurrently
+        assessments, dropped_nodes = executor.fan_out(
+            risk_workers,
+            lambda worker: worker.assess_climate_risk(lat, lng)
+        )
         
         # Aggregate results using consensus
-        consensus_result = asyncio.run(
-            consensus_engine.aggregate_risk_assessments(computation_id, assessments)
-        )
+        consensus_result = executor.run(consensus_engine.aggregate_risk_assessments, computation_id, assessments)
         
         if not consensus_result:
             return jsonify({"error": "Risk consensus failed"}), 500
@@ -696,6 +654,7 @@ def distributed_risk_assessment():
             "xnode_metadata": {
                 "total_nodes": len(risk_workers),
                 "participating_nodes": len(assessments),
+                "dropped_nodes": dropped_nodes,
                 "consensus_threshold": consensus_engine.threshold
             }
         })
@@ -703,39 +662,183 @@ def distributed_risk_assessment():
     except Exception as e:
         return jsonify({"error": f"Distributed risk assessment failed: {str(e)}"}), 500
 
+@xnode_bp.route('/distributed-risk-assessment/batch', methods=['POST'])
+def distributed_risk_assessment_batch():
+    """Assess many coordinates per worker call, streamed back as columnar NDJSON chunks"""
+    try:
+        data = request.get_json()
+        
+        try:
+            coords = _risk_batch_coords(data or {})
+        except (TypeError, ValueError, KeyError) as e:
+            return jsonify({"error": f"Invalid coordinates: {str(e)}"}), 400
+        
+        if len(coords) == 0:
+            return jsonify({"error": "lats/lngs or locations must be non-empty"}), 400
+        
+        invalid = _invalid_coords(coords)
+        if invalid:
+            return jsonify({"error": "Invalid coordinates", "invalid_locations": invalid}), 400
+        
+        try:
+            chunk_size = _chunk_size(data, RISK_BATCH_CHUNK_SIZE)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        batch_id = hashlib.sha256(f"risk{len(coords)}{time.time()}".encode()).hexdigest()[:16]
+        
+    except Exception as e:
+        return jsonify({"error": f"Distributed batch risk assessment failed: {str(e)}"}), 500
+    
+    def generate():
+        started = time.time()
+        succeeded = 0
+        
+        for offset in range(0, len(coords), chunk_size):
+            chunk = coords[offset:offset + chunk_size]
+            try:
+                line = _risk_batch_chunk(offset, chunk)
+            except Exception as e:
+                line = {"offset": offset, "count": len(chunk), "success": False, "error": f"Batch chunk failed: {str(e)}"}
+            
+            succeeded += line.get('successful', 0)
+            yield json.dumps(line) + "\n"
+        
+        yield json.dumps({
+            "summary": {
+                "batch_id": batch_id,
+                "total_locations": len(coords),
+                "successful": succeeded,
+                "failed": len(coords) - succeeded,
+                "chunk_size": chunk_size,
+                "risk_grid": risk_grid is not None,
+                "elapsed_seconds": round(time.time() - started, 4)
+            }
+        }) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _risk_batch_coords(data):
+    """(N x 2) lat/lng array from columnar lats/lngs lists or a list of {lat, lng} locations"""
+    if 'lats' in data or 'lngs' in data:
+        lats = np.asarray(data['lats'], dtype=np.float64)
+        lngs = np.asarray(data['lngs'], dtype=np.float64)
+        if lats.ndim != 1 or lats.shape != lngs.shape:
+            raise ValueError("lats and lngs must be equal-length lists")
+        return np.column_stack([lats, lngs])
+    
+    locations = data.get('locations') or []
+    return np.array([(location['lat'], location['lng']) for location in locations], dtype=np.float64).reshape(-1, 2)
+
+def _invalid_coords(coords, limit=100):
+    """Per-location errors for NaN/inf or out-of-range coordinates, first `limit` only"""
+    lats, lngs = coords[:, 0], coords[:, 1]
+    bad_lat = ~np.isfinite(lats) | (np.abs(lats) > 90)
+    bad_lng = ~np.isfinite(lngs) | (np.abs(lngs) > 180)
+    errors = []
+    for index in np.flatnonzero(bad_lat | bad_lng)[:limit].tolist():
+        problems = []
+        if bad_lat[index]:
+            problems.append("lat must be a finite number within [-90, 90]")
+        if bad_lng[index]:
+            problems.append("lng must be a finite number within [-180, 180]")
+        errors.append({"index": index, "error": "; ".join(problems)})
+    return errors
+
+def _risk_batch_chunk(offset, chunk):
+    """Run one coordinate chunk through every risk worker and reach consensus per location"""
+    per_worker, dropped_nodes = executor.fan_out(
+        risk_workers,
+        lambda worker: worker.assess_climate_risk_batch(chunk),
+        timeout=BATCH_WORKER_TIMEOUT
+    )
+    if not per_worker:
+        raise RuntimeError("no risk worker returned results")
+    
+    final_risks, consensus_confidence, node_count = consensus_engine.aggregate_risk_rows(per_worker)
+    failed = node_count == 0
+    line = {
+        "offset": offset,
+        "count": len(chunk),
+        "success": not failed.any(),
+        "successful": int((~failed).sum()),
+        "risks": {
+            column: np.round(final_risks[:, i], 6).tolist()
+            for i, column in enumerate(RISK_COLUMNS)
+        },
+        "consensus_confidence": np.round(consensus_confidence, 6).tolist(),
+        "node_count": node_count.tolist(),
+        "dropped_nodes": dropped_nodes
+    }
+    if failed.any():
+        # NaN is not valid JSON; failed locations are listed instead
+        for values in list(line['risks'].values()) + [line['consensus_confidence']]:
+            for i in np.flatnonzero(failed):
+                values[i] = None
+        line['failed_indices'] = (offset + np.flatnonzero(failed)).tolist()
+    return line
+
+def _node_health(worker):
+    """Health entry for one worker, reflecting its host process in process mode"""
+    health = {
+        'node_id': worker.node_id,
+        'initialized': worker.initialized,
+        'cache_size': len(worker.computation_cache),
+        'cache': worker.computation_cache.stats(),
+        'status': 'healthy' if worker.initialized else 'initializing'
+    }
+    if isinstance(worker, ValuationWorker):
+        health['model_version'] = worker.model_version
+    if isinstance(worker, (RemoteValuationWorker, RemoteRiskWorker)) and not process_cluster.is_node_alive(worker.node_id):
+        health['status'] = 'restarting'
+    return health
+
+def _engine_summary():
+    """Node count and observed throughput of every valuation engine"""
+    with engine_stats_lock:
+        snapshot = {name: dict(stats) for name, stats in engine_stats.items()}
+    return {
+        name: {
+            'nodes': [worker.node_id for worker in valuation_engines[name]],
+            'requests': stats['requests'],
+            'properties': stats['properties'],
+            'properties_per_second': round(stats['properties'] / stats['seconds'], 1) if stats['seconds'] else None
+        }
+        for name, stats in snapshot.items()
+    }
+
 @xnode_bp.route('/xnode-health', methods=['GET'])
 def xnode_health():
     """Check XNode cluster health"""
     try:
-        valuation_health = []
-        for worker in valuation_workers:
-            health = {
-                'node_id': worker.node_id,
-                'initialized': worker.initialized,
-                'cache_size': len(worker.computation_cache),
-                'status': 'healthy' if worker.initialized else 'initializing'
-            }
-            valuation_health.append(health)
-        
-        risk_health = []
-        for worker in risk_workers:
-            health = {
-                'node_id': worker.node_id,
-                'initialized': worker.initialized,
-                'cache_size': len(worker.computation_cache),
-                'status': 'healthy' if worker.initialized else 'initializing'
-            }
-            risk_health.append(health)
+        valuation_health = [_node_health(worker) for worker in valuation_workers]
+        risk_health = [_node_health(worker) for worker in risk_workers]
+        feature_store = get_feature_store()
         
         cluster_stats = {
             'total_valuation_nodes': len(valuation_workers),
-            'healthy_valuation_nodes': sum(1 for w in valuation_workers if w.initialized),
+            'healthy_valuation_nodes': sum(1 for h in valuation_health if h['status'] == 'healthy'),
             'total_risk_nodes': len(risk_workers),
-            'healthy_risk_nodes': sum(1 for w in risk_workers if w.initialized),
+            'healthy_risk_nodes': sum(1 for h in risk_health if h['status'] == 'healthy'),
             'consensus_threshold': consensus_engine.threshold,
-            'active_computations': len(consensus_engine.active_computations)
+            'active_computations': len(consensus_engine.active_computations),
+            'executor': {
+                'max_threads': executor.max_threads,
+                'worker_timeout': executor.worker_timeout,
+                **executor.stats
+            },
+            'execution_mode': 'process' if process_cluster else 'thread',
+            'weights': {'version': weight_store.version, 'checksum': weight_store.checksum},
+            'feature_store': feature_store.stats() if feature_store is not None else None,
+            'risk_grid': risk_grid.info() if risk_grid else None,
+            'geo_reference': geo_reference.info(),
+            'risk_cache': risk_cache_stats(),
+            'default_valuation_engine': DEFAULT_VALUATION_ENGINE,
+            'valuation_engines': _engine_summary()
         }
         
+        if process_cluster:
+            cluster_stats['processes'] = process_cluster.health()
+        
         return jsonify({
             "success": True,
             "cluster_health": {
@@ -749,6 +852,57 @@ def xnode_health():
     except Exception as e:
         return jsonify({"error": f"Health check failed: {str(e)}"}), 500
 
+def _mlp_workers():
+    """Every worker, across engines, that serves weights from the weight store"""
+    return [worker for workers in valuation_engines.values() for worker in workers if isinstance(worker, ValuationWorker)]
+
+@xnode_bp.route('/xnode-weights', methods=['GET'])
+def xnode_weights():
+    """Active model weight version and the version each valuation node is serving"""
+    try:
+        return jsonify({
+            "success": True,
+            "weights": weight_store.info(),
+            "nodes": [
+                {'node_id': worker.node_id, 'member': worker.member, 'weights_checksum': worker.weights_checksum}
+                for worker in _mlp_workers()
+            ]
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"Weight lookup failed: {str(e)}"}), 500
+
+@xnode_bp.route('/xnode-weights/reload', methods=['POST'])
+def xnode_weights_reload():
+    """Hot-swap model weights: activate a stored version (or re-read the active one) on every node"""
+    try:
+        data = request.get_json(silent=True) or {}
+        version = data.get('version')
+        
+        if version is not None and version not in weight_store.versions():
+            return jsonify({"error": f"Unknown weight version: {version}"}), 404
+        
+        previous = weight_store.version
+        weight_store.reload(version)
+        
+        nodes = []
+        for worker in _mlp_workers():
+            try:
+                nodes.append({'node_id': worker.node_id, 'success': True, 'weights_checksum': worker.reload_weights()})
+            except Exception as e:
+                nodes.append({'node_id': worker.node_id, 'success': False, 'error': str(e)})
+        
+        return jsonify({
+            "success": all(node['success'] for node in nodes),
+            "previous_version": previous,
+            "active_version": weight_store.version,
+            "weights_checksum": weight_store.checksum,
+            "nodes": nodes
+        })
+        
+    except Exception as e:
+        return jsonify({"error": f"Weight reload failed: {str(e)}"}), 500
+
 @xnode_bp.route('/xnode-consensus-test', methods=['POST'])
 def xnode_consensus_test():
     """Test XNode consensus mechanism"""
@@ -771,9 +925,7 @@ def xnode_consensus_test():
                 })
             
             computation_id = f"test_{int(time.time())}"
-            consensus_result = asyncio.run(
-                consensus_engine.aggregate_valuations(computation_id, mock_valuations)
-            )
+            consensus_result = executor.run(consensus_engine.aggregate_valuations, computation_id, mock_valuations)
             
             return jsonify({
                 "success": True,
@@ -804,9 +956,7 @@ def xnode_consensus_test():
                 })
             
             computation_id = f"test_{int(time.time())}"
-            consensus_result = asyncio.run(
-                consensus_engine.aggregate_risk_assessments(computation_id, mock_assessments)
-            )
+            consensus_result = executor.run(consensus_engine.aggregate_risk_assessments, computation_id, mock_assessments)
             
             return jsonify({
                 "success": True,
@@ -824,7 +974,7 @@ def xnode_consensus_test():
 # Initialize workers on module load
 async def initialize_workers():
     """Initialize all XNode workers"""
-    for worker in valuation_workers + risk_workers:
+    for worker in [worker for workers in valuation_engines.values() for worker in workers] + risk_workers:
         await worker.initialize()
 
 # Run initialization in background thread
@@ -834,629 +984,3 @@ def run_initialization():
 initialization_thread = threading.Thread(target=run_initialization)
 initialization_thread.daemon = True
 initialization_thread.start()
-
-
-        composite_risk = risk_data.get('composite', 0.25)
-        # Risk adjustment between 0.7 and 1.0
-        return max(0.7, 1.0 - (composite_risk * 0.3))
-    
-    def _calculate_confidence(self, property_data, comparables, risk_data):
-        """Calculate confidence score"""
-        confidence = 0.5  # Base confidence
-        
-        # More comparables = higher confidence
-        confidence += min(0.3, len(comparables) * 0.03)
-        
-        # Recent comparables boost confidence
-        recent_count = len([c for c in comparables if self._is_recent_sale(c.get('sale_date', ''))])
-        confidence += min(0.2, recent_count * 0.04)
-        
-        # Complete property data
-        if all(property_data.get(field) for field in ['bedrooms', 'bathrooms', 'land_size']):
-            confidence += 0.1
-        
-        # Lower risk = higher confidence
-        confidence += (1 - risk_data.get('composite', 0.25)) * 0.15
-        
-        return max(0.3, min(0.95, confidence))
-    
-    def _average_comparable_price(self, comparables):
-        """Calculate average comparable price"""
-        if not comparables:
-            return 800000
-        prices = [c.get('price', 0) for c in comparables if c.get('price', 0) > 0]
-        return sum(prices) / len(prices) if prices else 800000
-    
-    def _get_location_score(self, address):
-        """Get location premium score"""
-        premium_areas = ['sydney', 'melbourne', 'toorak', 'mosman', 'double bay', 'paddington']
-        address_lower = address.lower()
-        return 0.8 if any(area in address_lower for area in premium_areas) else 0.5
-    
-    def _is_recent_sale(self, sale_date):
-        """Check if sale is within last 6 months"""
-        if not sale_date:
-            return False
-        try:
-            sale = datetime.strptime(sale_date, '%Y-%m-%d')
-            return (datetime.now() - sale).days < 180
-        except:
-            return False
-    
-    def _comparable_price_variance(self, comparables):
-        """Calculate price variance in comparables"""
-        if len(comparables) < 2:
-            return 0.5
-        prices = [c.get('price', 0) for c in comparables if c.get('price', 0) > 0]
-        if len(prices) < 2:
-            return 0.5
-        mean_price = sum(prices) / len(prices)
-        variance = sum((p - mean_price) ** 2 for p in prices) / len(prices)
-        return min(1.0, variance / (mean_price ** 2))
-    
-    def _comparable_size_similarity(self, property_data, comparables):
-        """Calculate size similarity with comparables"""
-        prop_size = property_data.get('floor_area', 150)
-        if not comparables:
-            return 0.5
-        
-        similarities = []
-        for comp in comparables:
-            comp_size = comp.get('floor_area', 150)
-            similarity = 1 - abs(prop_size - comp_size) / max(prop_size, comp_size)
-            similarities.append(max(0, similarity))
-        
-        return sum(similarities) / len(similarities) if similarities else 0.5
-    
-    def _comparable_age_similarity(self, property_data, comparables):
-        """Calculate age similarity with comparables"""
-        prop_age = 2024 - property_data.get('year_built', 2000)
-        if not comparables:
-            return 0.5
-        
-        similarities = []
-        for comp in comparables:
-            comp_age = 2024 - comp.get('year_built', 2000)
-            age_diff = abs(prop_age - comp_age)
-            similarity = max(0, 1 - age_diff / 50)  # 50 year max difference
-            similarities.append(similarity)
-        
-        return sum(similarities) / len(similarities) if similarities else 0.5
-    
-    def _comparable_type_match(self, property_data, comparables):
-        """Calculate property type match ratio"""
-        prop_type = property_data.get('property_type', 'House')
-        if not comparables:
-            return 0.5
-        
-        matches = sum(1 for c in comparables if c.get('property_type') == prop_type)
-        return matches / len(comparables)
-    
-    def _median_comparable_price(self, comparables):
-        """Calculate median comparable price"""
-        if not comparables:
-            return 800000
-        prices = sorted([c.get('price', 0) for c in comparables if c.get('price', 0) > 0])
-        if not prices:
-            return 800000
-        n = len(prices)
-        return prices[n // 2] if n % 2 == 1 else (prices[n // 2 - 1] + prices[n // 2]) / 2
-    
-    def _comparable_distance_factor(self, comparables):
-        """Mock distance factor for comparables"""
-        return 0.8 if len(comparables) > 3 else 0.6
-    
-    def _comparable_market_time(self, comparables):
-        """Calculate average market time for comparables"""
-        if not comparables:
-            return 0.5
-        
-        market_times = []
-        for comp in comparables:
-            days_on_market = comp.get('days_on_market', 45)
-            normalized_time = min(1.0, days_on_market / 100)
-            market_times.append(1 - normalized_time)  # Faster sale = better
-        
-        return sum(market_times) / len(market_times) if market_times else 0.5
-    
-    def _comparable_quality_score(self, comparables):
-        """Calculate overall quality score of comparables"""
-        if not comparables:
-            return 0.5
-        
-        quality_scores = []
-        for comp in comparables:
-            score = 0.5  # Base score
-            
-            # Recent sale bonus
-            if self._is_recent_sale(comp.get('sale_date', '')):
-                score += 0.2
-            
-            # Complete data bonus
-            if all(comp.get(field) for field in ['bedrooms', 'bathrooms', 'price']):
-                score += 0.2
-            
-            # Reasonable price range
-            price = comp.get('price', 0)
-            if 200000 <= price <= 5000000:
-                score += 0.1
-            
-            quality_scores.append(min(1.0, score))
-        
-        return sum(quality_scores) / len(quality_scores) if quality_scores else 0.5
-
-class RiskWorker(XNodeWorker):
-    """Distributed risk assessment worker"""
-    
-    async def assess_climate_risk(self, lat, lng):
-        """Distributed climate risk assessment"""
-        try:
-            risks = {
-                'flood': self._calculate_flood_risk(lat, lng),
-                'fire': self._calculate_fire_risk(lat, lng),
-                'coastal': self._calculate_coastal_risk(lat, lng),
-                'subsidence': self._calculate_subsidence_risk(lat, lng),
-                'cyclone': self._calculate_cyclone_risk(lat),
-                'heatwave': self._calculate_heatwave_risk(lat, lng)
-            }
-            
-            risks['composite'] = self._calculate_composite_risk(risks)
-            confidence = self._calculate_risk_confidence(lat, lng)
-            
-            return {
-                'risks': risks,
-                'confidence': confidence,
-                'data_source': 'xnode_distributed',
-                'node_id': self.node_id,
-                'computation_time': time.time()
-            }
-            
-        except Exception as e:
-            print(f"Risk assessment error on node {self.node_id}: {e}")
-            return {
-                'risks': self._get_fallback_risks(lat, lng),
-                'confidence': 0.3,
-                'data_source': 'fallback',
-                'node_id': self.node_id,
-                'error': str(e)
-            }
-    
-    def _calculate_flood_risk(self, lat, lng):
-        """Calculate flood risk based on location"""
-        coastal_factor = max(0, 1 - self._distance_from_coast(lat, lng) / 20)
-        river_factor = abs(math.sin(lat * 10) * math.cos(lng * 10))
-        elevation_factor = max(0, 1 - abs(lat + 33) * 0.1)
-        
-        return min(1.0, (coastal_factor * 0.4 + river_factor * 0.4 + elevation_factor * 0.2))
-    
-    def _calculate_fire_risk(self, lat, lng):
-        """Calculate bushfire risk"""
-        inland_factor = min(1.0, self._distance_from_coast(lat, lng) / 100)
-        northern_factor = max(0, (lat + 20) / 15)
-        vegetation_factor = 0.6 + random.random() * 0.4
-        
-        return min(1.0, (inland_factor * 0.3 + northern_factor * 0.4 + vegetation_factor * 0.3))
-    
-    def _calculate_coastal_risk(self, lat, lng):
-        """Calculate coastal erosion risk"""
-        distance = self._distance_from_coast(lat, lng)
-        if distance > 10:
-            return 0
-        elif distance > 5:
-            return 0.1
-        elif distance > 1:
-            return 0.3
-        else:
-            return 0.7
-    
-    def _calculate_subsidence_risk(self, lat, lng):
-        """Calculate subsidence risk"""
-        mining_areas = [
-            (-32.5, 151.5, 0.6),  # Hunter Valley
-            (-37.5, 145.0, 0.4),  # Latrobe Valley
-            (-23.5, 150.5, 0.5),  # Bowen Basin
-        ]
-        
-        base_risk = 0.1
-        for mine_lat, mine_lng, risk_level in mining_areas:
-            distance = math.sqrt((lat - mine_lat)**2 + (lng - mine_lng)**2)
-            if distance < 2:
-                base_risk += risk_level * (1 - distance / 2)
-        
-        return min(1.0, base_risk)
-    
-    def _calculate_cyclone_risk(self, lat):
-        """Calculate cyclone risk based on latitude"""
-        if lat > -20:
-            return min(0.8, max(0.3, (lat + 20) / 15))
-        elif lat > -25:
-            return 0.2
-        else:
-            return 0.05
-    
-    def _calculate_heatwave_risk(self, lat, lng):
-        """Calculate heatwave risk"""
-        inland_factor = min(0.4, self._distance_from_coast(lat, lng) / 100)
-        northern_factor = min(0.4, (35 - abs(lat)) / 20)
-        base_risk = 0.2
-        
-        return min(1.0, base_risk + inland_factor + northern_factor)
-    
-    def _calculate_composite_risk(self, risks):
-        """Calculate weighted composite risk"""
-        weights = {
-            'flood': 0.25,
-            'fire': 0.25,
-            'coastal': 0.15,
-            'subsidence': 0.15,
-            'cyclone': 0.10,
-            'heatwave': 0.10
-        }
-        
-        composite = 0
-        for risk_type, weight in weights.items():
-            if risk_type in risks:
-                composite += risks[risk_type] * weight
-        
-        return composite
-    
-    def _calculate_risk_confidence(self, lat, lng):
-        """Calculate confidence in risk assessment"""
-        major_cities = [
-            (-33.8688, 151.2093),  # Sydney
-            (-37.8136, 144.9631),  # Melbourne
-            (-27.4698, 153.0251),  # Brisbane
-        ]
-        
-        min_distance = min(
-            math.sqrt((lat - city_lat)**2 + (lng - city_lng)**2)
-            for city_lat, city_lng in major_cities
-        )
-        
-        confidence = max(0.5, 1 - min_distance / 10)
-        return confidence
-    
-    def _distance_from_coast(self, lat, lng):
-        """Calculate approximate distance from Australian coast"""
-        coastal_points = [
-            (-33.8688, 151.2093),  # Sydney
-            (-37.8136, 144.9631),  # Melbourne
-            (-31.9505, 115.8605),  # Perth
-            (-27.4698, 153.0251),  # Brisbane
-        ]
-        
-        distances = [
-            math.sqrt((lat - coast_lat)**2 + (lng - coast_lng)**2) * 111
-            for coast_lat, coast_lng in coastal_points
-        ]
-        
-        return min(distances)
-    
-    def _get_fallback_risks(self, lat, lng):
-        """Get fallback risk values"""
-        return {
-            'flood': 0.3,
-            'fire': 0.3,
-            'coastal': 0.1,
-            'subsidence': 0.1,
-            'cyclone': 0.1,
-            'heatwave': 0.2,
-            'composite': 0.25
-        }
-
-class XNodeConsensus:
-    """XNode consensus mechanism for distributed computation"""
-    
-    def __init__(self, threshold=0.75):
-        self.threshold = threshold
-        self.active_computations = {}
-    
-    async def aggregate_valuations(self, computation_id, valuations):
-        """Aggregate valuation results from multiple nodes"""
-        if len(valuations) < 2:
-            return valuations[0] if valuations else None
-        
-        valid_valuations = [v for v in valuations if 'error' not in v and v.get('confidence', 0) > 0.3]
-        
-        if not valid_valuations:
-            return None
-        
-        total_weight = sum(v['confidence'] for v in valid_valuations)
-        if total_weight == 0:
-            return valid_valuations[0]
-        
-        weighted_value = sum(v['value'] * v['confidence'] for v in valid_valuations) / total_weight
-        consensus_confidence = total_weight / len(valid_valuations)
-        
-        return {
-            'final_value': int(weighted_value),
-            'consensus_confidence': consensus_confidence,
-            'participating_nodes': [v['node_id'] for v in valid_valuations],
-            'node_count': len(valid_valuations),
-            'computation_id': computation_id,
-            'consensus_method': 'weighted_average'
-        }
-    
-    async def aggregate_risk_assessments(self, computation_id, assessments):
-        """Aggregate risk assessment results"""
-        if len(assessments) < 2:
-            return assessments[0] if assessments else None
-        
-        valid_assessments = [a for a in assessments if 'error' not in a and a.get('confidence', 0) > 0.3]
-        
-        if not valid_assessments:
-            return None
-        
-        total_weight = sum(a['confidence'] for a in valid_assessments)
-        
-        final_risks = {}
-        for risk_type in ['flood', 'fire', 'coastal', 'subsidence', 'cyclone', 'heatwave', 'composite']:
-            weighted_risk = sum(
-                a['risks'].get(risk_type, 0) * a['confidence'] 
-                for a in valid_assessments
-            ) / total_weight
-            final_risks[risk_type] = weighted_risk
-        
-        return {
-            'final_risks': final_risks,
-            'consensus_confidence': total_weight / len(valid_assessments),
-            'participating_nodes': [a['node_id'] for a in valid_assessments],
-            'node_count': len(valid_assessments),
-            'computation_id': computation_id,
-            'data_quality': self._assess_data_quality(valid_assessments)
-        }
-    
-    def _assess_data_quality(self, assessments):
-        """Assess overall data quality"""
-        live_data_count = sum(1 for a in assessments if a.get('data_source') == 'xnode_distributed')
-        total_count = len(assessments)
-        
-        if live_data_count >= total_count * 0.8:
-            return 'excellent'
-        elif live_data_count >= total_count * 0.5:
-            return 'good'
-        elif live_data_count >= total_count * 0.3:
-            return 'fair'
-        else:
-            return 'poor'
-
-# Initialize XNode components
-valuation_workers = [ValuationWorker(f"val_node_{i}") for i in range(3)]
-risk_workers = [RiskWorker(f"risk_node_{i}") for i in range(3)]
-consensus_engine = XNodeConsensus()
-
-@xnode_bp.route('/distributed-valuation', methods=['POST'])
-def distributed_valuation():
-    """Perform distributed property valuation across XNodes"""
-    try:
-        data = request.get_json()
-        
-        required_fields = ['property_data', 'comparables', 'risk_data', 'market_factors']
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-        
-        computation_id = hashlib.sha256(
-            f"{json.dumps(data, sort_keys=True)}{time.time()}".encode()
-        ).hexdigest()[:16]
-        
-        # Distribute computation across nodes
-        valuations = []
-        for worker in valuation_workers:
-            try:
-                result = asyncio.run(worker.calculate_valuation(
-                    data['property_data'],
-                    data['comparables'],
-                    data['risk_data'],
-                    data['market_factors']
-                ))
-                valuations.append(result)
-            except Exception as e:
-                print(f"Worker {worker.node_id} failed: {e}")
-                continue
-        
-        # Aggregate results using consensus
-        consensus_result = asyncio.run(
-            consensus_engine.aggregate_valuations(computation_id, valuations)
-        )
-        
-        if not consensus_result:
-            return jsonify({"error": "Consensus failed - insufficient valid results"}), 500
-        
-        return jsonify({
-            "success": True,
-            "computation_id": computation_id,
-            "consensus_result": consensus_result,
-            "individual_results": valuations,
-            "xnode_metadata": {
-                "total_nodes": len(valuation_workers),
-                "participating_nodes": len(valuations),
-                "consensus_threshold": consensus_engine.threshold,
-                "computation_time": time.time()
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({"error": f"Distributed valuation failed: {str(e)}"}), 500
-
-@xnode_bp.route('/distributed-risk-assessment', methods=['POST'])
-def distributed_risk_assessment():
-    """Perform distributed risk assessment across XNodes"""
-    try:
-        data = request.get_json()
-        
-        lat = data.get('lat')
-        lng = data.get('lng')
-        
-        if lat is None or lng is None:
-            return jsonify({"error": "Latitude and longitude are required"}), 400
-        
-        computation_id = hashlib.sha256(
-            f"{lat}{lng}{time.time()}".encode()
-        ).hexdigest()[:16]
-        
-        # Distribute risk assessment across nodes
-        assessments = []
-        for worker in risk_workers:
-            try:
-                result = asyncio.run(worker.assess_climate_risk(lat, lng))
-                assessments.append(result)
-            except Exception as e:
-                print(f"Risk worker {worker.node_id} failed: {e}")
-                continue
-        
-        # Aggregate results using consensus
-        consensus_result = asyncio.run(
-            consensus_engine.aggregate_risk_assessments(computation_id, assessments)
-        )
-        
-        if not consensus_result:
-            return jsonify({"error": "Risk consensus failed"}), 500
-        
-        return jsonify({
-            "success": True,
-            "computation_id": computation_id,
-            "consensus_result": consensus_result,
-            "individual_assessments": assessments,
-            "xnode_metadata": {
-                "total_nodes": len(risk_workers),
-                "participating_nodes": len(assessments),
-                "consensus_threshold": consensus_engine.threshold
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({"error": f"Distributed risk assessment failed: {str(e)}"}), 500
-
-@xnode_bp.route('/xnode-health', methods=['GET'])
-def xnode_health():
-    """Check XNode cluster health"""
-    try:
-        valuation_health = []
-        for worker in valuation_workers:
-            health = {
-                'node_id': worker.node_id,
-                'initialized': worker.initialized,
-                'cache_size': len(worker.computation_cache),
-                'status': 'healthy' if worker.initialized else 'initializing'
-            }
-            valuation_health.append(health)
-        
-        risk_health = []
-        for worker in risk_workers:
-            health = {
-                'node_id': worker.node_id,
-                'initialized': worker.initialized,
-                'cache_size': len(worker.computation_cache),
-                'status': 'healthy' if worker.initialized else 'initializing'
-            }
-            risk_health.append(health)
-        
-        cluster_stats = {
-            'total_valuation_nodes': len(valuation_workers),
-            'healthy_valuation_nodes': sum(1 for w in valuation_workers if w.initialized),
-            'total_risk_nodes': len(risk_workers),
-            'healthy_risk_nodes': sum(1 for w in risk_workers if w.initialized),
-            'consensus_threshold': consensus_engine.threshold,
-            'active_computations': len(consensus_engine.active_computations)
-        }
-        
-        return jsonify({
-            "success": True,
-            "cluster_health": {
-                "valuation_nodes": valuation_health,
-                "risk_nodes": risk_health,
-                "cluster_stats": cluster_stats,
-                "overall_status": "healthy" if cluster_stats['healthy_valuation_nodes'] >= 2 and cluster_stats['healthy_risk_nodes'] >= 2 else "degraded"
-            }
-        })
-        
-    except Exception as e:
-        return jsonify({"error": f"Health check failed: {str(e)}"}), 500
-
-@xnode_bp.route('/xnode-consensus-test', methods=['POST'])
-def xnode_consensus_test():
-    """Test XNode consensus mechanism"""
-    try:
-        data = request.get_json()
-        test_type = data.get('test_type', 'valuation')
-        
-        if test_type == 'valuation':
-            # Generate mock valuation results
-            mock_valuations = []
-            for i, worker in enumerate(valuation_workers):
-                base_value = 1000000 + random.randint(-200000, 200000)
-                confidence = 0.7 + random.random() * 0.25
-                
-                mock_valuations.append({
-                    'value': base_value,
-                    'confidence': confidence,
-                    'node_id': worker.node_id,
-                    'computation_time': time.time()
-                })
-            
-            computation_id = f"test_{int(time.time())}"
-            consensus_result = asyncio.run(
-                consensus_engine.aggregate_valuations(computation_id, mock_valuations)
-            )
-            
-            return jsonify({
-                "success": True,
-                "test_type": "valuation_consensus",
-                "mock_results": mock_valuations,
-                "consensus_result": consensus_result
-            })
-            
-        elif test_type == 'risk':
-            # Generate mock risk assessments
-            mock_assessments = []
-            for worker in risk_workers:
-                risks = {
-                    'flood': random.random() * 0.8,
-                    'fire': random.random() * 0.8,
-                    'coastal': random.random() * 0.5,
-                    'subsidence': random.random() * 0.3,
-                    'cyclone': random.random() * 0.6,
-                    'heatwave': random.random() * 0.7
-                }
-                risks['composite'] = sum(risks.values()) / len(risks)
-                
-                mock_assessments.append({
-                    'risks': risks,
-                    'confidence': 0.6 + random.random() * 0.3,
-                    'node_id': worker.node_id,
-                    'data_source': 'xnode_distributed'
-                })
-            
-            computation_id = f"test_{int(time.time())}"
-            consensus_result = asyncio.run(
-                consensus_engine.aggregate_risk_assessments(computation_id, mock_assessments)
-            )
-            
-            return jsonify({
-                "success": True,
-                "test_type": "risk_consensus",
-                "mock_assessments": mock_assessments,
-                "consensus_result": consensus_result
-            })
-        
-        else:
-            return jsonify({"error": "Invalid test type"}), 400
-            
-    except Exception as e:
-        return jsonify({"error": f"Consensus test failed: {str(e)}"}), 500
-
-# Initialize workers on module load
-async def initialize_workers():
-    """Initialize all XNode workers"""
-    for worker in valuation_workers + risk_workers:
-        await worker.initialize()
-
-# Run initialization in background thread
-def run_initialization():
-    asyncio.run(initialize_workers())
-
-initialization_thread = threading.Thread(target=run_initialization)
-initialization_thread.daemon = True
-initialization_thread.start()
-
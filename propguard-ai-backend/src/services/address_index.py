@@ -0,0 +1,508 @@
+"""
+Shared address normalisation and location lookup
+Every known place name and market keyword is compiled once at import into a
+first-token -> phrases hash index. An address is lower-cased and tokenised,
+then scanned once; each position probes the index and matches whole-token
+phrases (so "new york" and "beverly hills" work, and "unit" no longer matches
+"community"). A lookup returns the geocoded city, country, coordinates,
+location tier, sentiment boost and premium/apartment flags together, and is
+memoised per normalised address
+
+AddressIndex is the property register lookup: an inverted index from address
+tokens, street numbers and postcodes to record ids, with idf-ranked and
+typo-tolerant matching. It is built from a CSV/NDJSON register or opened from
+a saved index directory whose postings are memory-mapped
+
+Usage: python -m src.services.address_index build REGISTER.csv|REGISTER.ndjson --output DIR
+       python -m src.services.address_index query DIR|REGISTER "12 collins st melbourne" [--limit N]
+"""
+
+import os
+import re
+import sys
+import json
+import mmap
+import time
+import argparse
+import numpy as np
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+ADDRESS_CACHE_SIZE = int(os.getenv('ADDRESS_CACHE_SIZE', '65536'))
+
+# Geocodable places in match-priority order: when an address names several,
+# the earliest entry here decides the coordinates. (name, lat, lng, country, city)
+PLACES = (
+    # North America
+    ('new york', 40.7128, -74.0060, 'US', 'new york'),
+    ('manhattan', 40.7831, -73.9712, 'US', 'new york'),
+    ('brooklyn', 40.6782, -73.9442, 'US', 'new york'),
+    ('los angeles', 34.0522, -118.2437, 'US', 'los angeles'),
+    ('hollywood', 34.0928, -118.3287, 'US', 'los angeles'),
+    ('toronto', 43.6532, -79.3832, 'CA', 'toronto'),
+    ('chicago', 41.8781, -87.6298, 'US', 'chicago'),
+    ('miami', 25.7617, -80.1918, 'US', 'miami'),
+    ('seattle', 47.6062, -122.3321, 'US', 'seattle'),
+
+    # Europe
+    ('london', 51.5074, -0.1278, 'UK', 'london'),
+    ('westminster', 51.4994, -0.1245, 'UK', 'london'),
+    ('berlin', 52.5200, 13.4050, 'DE', 'berlin'),
+    ('paris', 48.8566, 2.3522, 'FR', 'paris'),
+    ('madrid', 40.4168, -3.7038, 'ES', 'madrid'),
+    ('rome', 41.9028, 12.4964, 'IT', 'rome'),
+
+    # Asia-Pacific
+    ('sydney', -33.8688, 151.2093, 'AU', 'sydney'),
+    ('melbourne', -37.8136, 144.9631, 'AU', 'melbourne'),
+    ('brisbane', -27.4698, 153.0251, 'AU', 'brisbane'),
+    ('perth', -31.9505, 115.8605, 'AU', 'perth'),
+    ('adelaide', -34.9285, 138.6007, 'AU', 'adelaide'),
+    ('tokyo', 35.6762, 139.6503, 'JP', 'tokyo'),
+    ('singapore', 1.3521, 103.8198, 'SG', 'singapore'),
+    ('hong kong', 22.3193, 114.1694, 'HK', 'hong kong'),
+    ('seoul', 37.5665, 126.9780, 'KR', 'seoul'),
+
+    # Other regions
+    ('dubai', 25.2048, 55.2708, 'AE', 'dubai'),
+    ('mumbai', 19.0760, 72.8777, 'IN', 'mumbai'),
+    ('sao paulo', -23.5505, -46.6333, 'BR', 'sao paulo'),
+    ('mexico city', 19.4326, -99.1332, 'MX', 'mexico city'),
+
+    # Premium suburbs, after the cities so "Toorak, Melbourne" still geocodes to Melbourne
+    ('toorak', -37.8416, 145.0176, 'AU', 'melbourne'),
+    ('mosman', -33.8290, 151.2440, 'AU', 'sydney'),
+)
+
+# Australian location tiers used by the data pipeline; Premium wins over Major, anything else is Regional
+PREMIUM_LOCATIONS = ('sydney', 'melbourne', 'toorak', 'mosman')
+MAJOR_LOCATIONS = ('brisbane', 'perth', 'adelaide')
+# Market sentiment uplift by location; the largest matching boost applies
+SENTIMENT_BOOSTS = {'sydney': 0.2, 'melbourne': 0.2, 'brisbane': 0.1, 'perth': 0.1}
+# Globally premium markets priced up by the property data client
+PREMIUM_MARKETS = ('manhattan', 'westminster', 'beverly hills', 'tokyo', 'singapore', 'sydney')
+APARTMENT_WORDS = ('apt', 'unit', 'apartment', 'condo', '/')
+
+# Tokens are runs of letters/digits; '/' is kept as its own token for unit numbers like 2/15
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+|/")
+
+
+class AddressInfo(NamedTuple):
+    normalized: str
+    matches: Tuple[str, ...]
+    city: Optional[str]
+    country: Optional[str]
+    lat: Optional[float]
+    lng: Optional[float]
+    tier: str
+    sentiment_boost: float
+    is_premium_market: bool
+    is_apartment: bool
+
+
+def tokenize_address(address: str) -> List[str]:
+    return TOKEN_PATTERN.findall((address or '').lower())
+
+
+def normalize_address(address: str) -> str:
+    """Lower-cased tokens joined by single spaces; punctuation other than '/' is dropped"""
+    return ' '.join(tokenize_address(address))
+
+
+def _compile_index() -> Tuple[Dict[str, List[Tuple[Tuple[str, ...], str]]], Dict[str, Tuple]]:
+    """first token -> [(phrase tokens, phrase)] longest first, and phrase -> place row"""
+    phrases = {name for name, *_ in PLACES}
+    phrases.update(PREMIUM_LOCATIONS, MAJOR_LOCATIONS, SENTIMENT_BOOSTS, PREMIUM_MARKETS, APARTMENT_WORDS)
+    index = {}
+    for phrase in phrases:
+        tokens = tuple(tokenize_address(phrase))
+        index.setdefault(tokens[0], []).append((tokens, phrase))
+    for candidates in index.values():
+        candidates.sort(key=lambda candidate: -len(candidate[0]))
+    places = {name: (priority, lat, lng, country, city) for priority, (name, lat, lng, country, city) in enumerate(PLACES)}
+    return index, places
+
+
+_PHRASE_INDEX, _PLACE_ROWS = _compile_index()
+_PREMIUM = frozenset(PREMIUM_LOCATIONS)
+_MAJOR = frozenset(MAJOR_LOCATIONS)
+_PREMIUM_MARKETS = frozenset(PREMIUM_MARKETS)
+_APARTMENT = frozenset(APARTMENT_WORDS)
+
+
+def match_phrases(tokens: List[str]) -> List[str]:
+    """Known phrases in the token list, in order of appearance; one pass with a hash probe per token"""
+    matches = []
+    for i, token in enumerate(tokens):
+        candidates = _PHRASE_INDEX.get(token)
+        if candidates is None:
+            continue
+        for phrase_tokens, phrase in candidates:
+            if len(phrase_tokens) == 1 or tuple(tokens[i:i + len(phrase_tokens)]) == phrase_tokens:
+                matches.append(phrase)
+    return matches
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _lookup_normalized(normalized: str) -> AddressInfo:
+    matches = tuple(dict.fromkeys(match_phrases(normalized.split())))
+    found = set(matches)
+
+    place = min((_PLACE_ROWS[name] for name in matches if name in _PLACE_ROWS), default=None)
+    _, lat, lng, country, city = place if place else (None, None, None, None, None)
+    tier = 'Premium' if found & _PREMIUM else 'Major' if found & _MAJOR else 'Regional'
+
+    return AddressInfo(
+        normalized=normalized,
+        matches=matches,
+        city=city,
+        country=country,
+        lat=lat,
+        lng=lng,
+        tier=tier,
+        sentiment_boost=max((SENTIMENT_BOOSTS[name] for name in matches if name in SENTIMENT_BOOSTS), default=0.0),
+        is_premium_market=bool(found & _PREMIUM_MARKETS),
+        is_apartment=bool(found & _APARTMENT)
+    )
+
+
+def lookup_address(address: str) -> AddressInfo:
+    """Location facts for an address, memoised per normalised form"""
+    return _lookup_normalized(normalize_address(address))
+
+
+def place_country(name: str, default: str = 'US') -> str:
+    """Country code of a known place name"""
+    row = _PLACE_ROWS.get(name)
+    return row[3] if row else default
+
+
+def lookup_cache_stats() -> Dict[str, int]:
+    info = _lookup_normalized.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'entries': info.currsize, 'max_entries': info.maxsize}
+
+
+# Register index: street types are folded to one spelling ("st" -> "street") and, like state
+# codes, never seed candidates on their own since nearly every address has one
+STREET_TYPE_ABBREVIATIONS = {
+    'st': 'street', 'rd': 'road', 'ave': 'avenue', 'dr': 'drive', 'ln': 'lane', 'pl': 'place', 'ct': 'court',
+    'cres': 'crescent', 'pde': 'parade', 'hwy': 'highway', 'tce': 'terrace', 'blvd': 'boulevard', 'cl': 'close'
+}
+STREET_TYPES = frozenset(STREET_TYPE_ABBREVIATIONS.values()) | {'way'}
+STATES = frozenset(('nsw', 'vic', 'qld', 'wa', 'sa', 'tas', 'act', 'nt'))
+# Terms matching more records than this only re-rank candidates seeded by rarer terms
+MAX_SEED_POSTINGS = int(os.getenv('ADDRESS_INDEX_MAX_SEED_POSTINGS', '20000'))
+# A match must cover at least this share of the record's idf weight, unless it is the sole best match
+MIN_MATCH_COVERAGE = 0.3
+# Score of a typo-corrected word relative to an exact one; words shorter than this are never corrected
+FUZZY_WEIGHT = 0.8
+FUZZY_MIN_LENGTH = 4
+INDEX_FORMAT_VERSION = 1
+
+
+class AddressMatch(NamedTuple):
+    score: float
+    address: str
+    record: Dict[str, Any]
+
+
+def _is_number(token: str) -> bool:
+    return token[0].isdigit()
+
+
+def _is_numeric_key(key: str) -> bool:
+    """Street-number, unit and postcode keys: '#12', 'u:5', 'pc:3000'"""
+    return key.startswith('#') or ':' in key
+
+
+def address_keys(address: str) -> List[str]:
+    """Index keys of a register address: words, '#<street number>', 'u:<unit>' and 'pc:<postcode>'"""
+    tokens = [token for token in tokenize_address(address) if token != '/']
+    keys = []
+    first_word = next((i for i, token in enumerate(tokens) if not _is_number(token)), len(tokens))
+    leading = tokens[:first_word]
+    if leading:
+        keys.append('#' + leading[-1])
+        keys.extend('u:' + token for token in leading[:-1])
+    trailing = [token for token in tokens[first_word:] if _is_number(token)]
+    if trailing and len(trailing[-1]) in (4, 5) and trailing[-1].isdigit():
+        keys.append('pc:' + trailing[-1])
+    keys.extend(STREET_TYPE_ABBREVIATIONS.get(token, token) for token in tokens[first_word:] if not _is_number(token))
+    return list(dict.fromkeys(keys))
+
+
+def _query_keys(query: str) -> List[str]:
+    """Keys a free-text query may hit; a bare number could be a street number, unit or postcode"""
+    keys = []
+    for token in tokenize_address(query):
+        if token == '/':
+            continue
+        if _is_number(token):
+            keys.extend(('#' + token, 'u:' + token, 'pc:' + token))
+        else:
+            keys.append(STREET_TYPE_ABBREVIATIONS.get(token, token))
+    return list(dict.fromkeys(keys))
+
+
+def _deletes(word: str) -> List[str]:
+    return [word[:i] + word[i + 1:] for i in range(len(word))]
+
+
+class _RecordFile:
+    """NDJSON records read on demand from a memory-mapped file"""
+
+    def __init__(self, path: str, offsets: np.ndarray):
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else b''
+        self._offsets = offsets
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        return json.loads(self._map[int(self._offsets[i]):int(self._offsets[i + 1])])
+
+
+class _StoredField:
+    """One field of every stored record, indexable like a list"""
+
+    def __init__(self, records: _RecordFile, field: str):
+        self._records = records
+        self._field = field
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, i: int):
+        return self._records[i][self._field]
+
+
+class AddressIndex:
+    """Inverted index of register addresses with ranked, typo-tolerant lookup"""
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray, postings: np.ndarray,
+                 doc_weight: np.ndarray, addresses, records, source: str = 'memory'):
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+        self.doc_weight = doc_weight
+        self.addresses = addresses
+        self.records = records
+        self.source = source
+        self._key_ids = {key: i for i, key in enumerate(keys.tolist())}
+        document_frequency = np.diff(offsets)
+        self._idf = np.log1p(len(doc_weight) / np.maximum(document_frequency, 1))
+        self._deletion_map = None
+
+    def __len__(self):
+        return len(self.doc_weight)
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, Dict[str, Any]]], source: str = 'memory') -> 'AddressIndex':
+        """Index (address, record) pairs held in memory"""
+        key_ids: Dict[str, int] = {}
+        key_postings: List[List[int]] = []
+        doc_keys: List[List[int]] = []
+        addresses, records = [], []
+        for doc, (address, record) in enumerate(entries):
+            ids = []
+            for key in address_keys(address):
+                key_id = key_ids.get(key)
+                if key_id is None:
+                    key_id = key_ids[key] = len(key_postings)
+                    key_postings.append([])
+                key_postings[key_id].append(doc)
+                ids.append(key_id)
+            doc_keys.append(ids)
+            addresses.append(address)
+            records.append(record)
+
+        lengths = np.array([len(p) for p in key_postings], dtype=np.int64)
+        offsets = np.zeros(len(key_postings) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        postings = np.fromiter((doc for p in key_postings for doc in p), dtype=np.int32, count=int(offsets[-1]))
+        idf = np.log1p(len(doc_keys) / np.maximum(lengths, 1))
+        doc_weight = np.array([idf[ids].sum() for ids in doc_keys], dtype=np.float64)
+        keys = np.array(list(key_ids), dtype=str) if key_ids else np.array([], dtype='<U1')
+        return cls(keys, offsets, postings, doc_weight, addresses, records, source)
+
+    @classmethod
+    def from_register(cls, path: str, address_field: str = 'address') -> 'AddressIndex':
+        """Index a CSV or NDJSON register file; rows without an address are skipped"""
+        from src.services.bulk_ingest import detect_format, iter_lines, iter_records
+
+        def entries():
+            with open(path, 'rb') as f:
+                for _, record in iter_records(iter_lines(f), detect_format(filename=path)):
+                    if isinstance(record, dict) and record.get(address_field):
+                        yield str(record[address_field]), record
+
+        return cls.build(entries(), source=path)
+
+    def save(self, directory: str):
+        """Write the index as .npy arrays plus an NDJSON record file, for open() to memory-map"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, 'keys.npy'), self.keys)
+        np.save(os.path.join(directory, 'offsets.npy'), self.offsets)
+        np.save(os.path.join(directory, 'postings.npy'), self.postings)
+        np.save(os.path.join(directory, 'doc_weight.npy'), self.doc_weight)
+        record_offsets = [0]
+        with open(os.path.join(directory, 'records.ndjson'), 'wb') as f:
+            for address, record in zip(self.addresses, self.records):
+                line = json.dumps({'address': address, 'record': record}, default=str).encode() + b'\n'
+                f.write(line)
+                record_offsets.append(record_offsets[-1] + len(line))
+        np.save(os.path.join(directory, 'record_offsets.npy'), np.array(record_offsets, dtype=np.int64))
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'version': INDEX_FORMAT_VERSION, 'records': len(self), 'keys': len(self.keys),
+                       'source': self.source}, f, indent=2)
+
+    @classmethod
+    def open(cls, directory: str) -> 'AddressIndex':
+        """Saved index with postings and records memory-mapped; only the key table is loaded into memory"""
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"{directory} holds index format {meta.get('version')}, expected {INDEX_FORMAT_VERSION}")
+
+        def load(name, mmap_mode='r'):
+            # Plain ndarray view of the memmap: slicing a np.memmap subclass costs microseconds per call
+            return np.asarray(np.load(os.path.join(directory, name), mmap_mode=mmap_mode))
+
+        records = _RecordFile(os.path.join(directory, 'records.ndjson'), load('record_offsets.npy', None))
+        return cls(load('keys.npy', None), load('offsets.npy', None), load('postings.npy'), load('doc_weight.npy'),
+                   _StoredField(records, 'address'), _StoredField(records, 'record'), source=directory)
+
+    def _postings(self, key_id: int) -> np.ndarray:
+        return self.postings[self.offsets[key_id]:self.offsets[key_id + 1]]
+
+    def _corrections(self, word: str) -> List[int]:
+        """Indexed words within one deletion of word on either side (covers one insert, delete or substitution)"""
+        if self._deletion_map is None:
+            deletion_map: Dict[str, List[int]] = {}
+            for key_id, key in enumerate(self.keys.tolist()):
+                if len(key) >= FUZZY_MIN_LENGTH - 1 and not _is_numeric_key(key):
+                    for variant in _deletes(key):
+                        deletion_map.setdefault(variant, []).append(key_id)
+            self._deletion_map = deletion_map
+        found = set(self._deletion_map.get(word, ()))
+        for variant in _deletes(word):
+            key_id = self._key_ids.get(variant)
+            if key_id is not None:
+                found.add(key_id)
+            found.update(self._deletion_map.get(variant, ()))
+        return sorted(found)
+
+    def _query_terms(self, query: str) -> Dict[int, Tuple[float, bool]]:
+        """key id -> (weight, may seed candidates)"""
+        terms = {}
+        for key in _query_keys(query):
+            key_id = self._key_ids.get(key)
+            if key_id is not None:
+                matched = [(key_id, 1.0)]
+            elif not _is_numeric_key(key) and len(key) >= FUZZY_MIN_LENGTH and key not in STREET_TYPES:
+                # Only words are typo-corrected: a near-miss street number or postcode is a different address
+                matched = [(key_id, FUZZY_WEIGHT) for key_id in self._corrections(key)]
+            else:
+                continue
+            for key_id, factor in matched:
+                # Seeding is decided on the indexed key, so a word corrected to "street" or "vic" never seeds
+                indexed = self.keys[key_id]
+                seeds = indexed not in STREET_TYPES and indexed not in STATES and \
+                    self.offsets[key_id + 1] - self.offsets[key_id] <= MAX_SEED_POSTINGS
+                weight = float(self._idf[key_id]) * factor
+                if weight > terms.get(key_id, (0.0, False, False))[0]:
+                    terms[key_id] = (weight, seeds, _is_numeric_key(indexed))
+
+        # Numbers only seed when the query has no usable word: "12" alone is a poor way to find candidates
+        has_word_seed = any(seeds and not numeric for _, seeds, numeric in terms.values())
+        return {key_id: (weight, seeds and not (numeric and has_word_seed))
+                for key_id, (weight, seeds, numeric) in terms.items()}
+
+    def search(self, query: str, limit: int = 5) -> List[AddressMatch]:
+        """Best-matching register entries for a free-text query, highest score first"""
+        terms = self._query_terms(query)
+        seeds = [(key_id, weight) for key_id, (weight, seeds) in terms.items() if seeds]
+        if not seeds:
+            return []
+
+        # Candidates come from the selective terms; scores accumulate with one bincount
+        seed_postings = [self._postings(key_id) for key_id, _ in seeds]
+        docs = np.concatenate(seed_postings)
+        weights = np.repeat([weight for _, weight in seeds], [len(p) for p in seed_postings])
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights, minlength=len(candidates))
+
+        # Common terms ("street", state codes, frequent numbers) only add to existing candidates
+        for key_id, (weight, seeds) in terms.items():
+            if seeds:
+                continue
+            postings = self._postings(key_id)
+            position = np.minimum(np.searchsorted(postings, candidates), len(postings) - 1)
+            scores += (postings[position] == candidates) * weight
+
+        coverage = np.minimum(scores / np.maximum(self.doc_weight[candidates], 1e-9), 1.0)
+        keep = coverage >= MIN_MATCH_COVERAGE
+        if not keep.any():
+            # A suburb or street alone ("risk for brisbane") covers little of any address; take the best
+            # partial match only when no other candidate matched as much of the query
+            best = np.flatnonzero(np.isclose(scores, scores.max()))
+            if len(best) == 1:
+                keep[best] = True
+        candidates, scores, coverage = candidates[keep], scores[keep], coverage[keep]
+        ranked = scores * (0.5 + 0.5 * coverage)
+        if len(ranked) > limit:
+            top = np.argpartition(-ranked, limit - 1)[:limit]
+        else:
+            top = np.arange(len(ranked))
+        top = top[np.lexsort((candidates[top], -ranked[top]))]
+        return [AddressMatch(round(float(ranked[i]), 4), self.addresses[int(candidates[i])],
+                             self.records[int(candidates[i])]) for i in top]
+
+    def find(self, query: str) -> Optional[Dict[str, Any]]:
+        """Record of the best match, or None"""
+        matches = self.search(query, limit=1)
+        return matches[0].record if matches else None
+
+
+def load_address_index(path: str) -> AddressIndex:
+    """Open a saved index directory, or build one from a CSV/NDJSON register file"""
+    if os.path.isdir(path):
+        return AddressIndex.open(path)
+    return AddressIndex.from_register(path)
+
+
+def main(argv=None):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+    parser = argparse.ArgumentParser(description="Build or query a property register address index")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Index a CSV or NDJSON register into a directory")
+    build.add_argument('register', help="Register file with an address column")
+    build.add_argument('--output', required=True, help="Index directory")
+    build.add_argument('--address-field', default='address', help="Column holding the address")
+    query = commands.add_parser('query', help="Look up an address")
+    query.add_argument('index', help="Index directory or register file")
+    query.add_argument('text', help="Address or free-text command")
+    query.add_argument('--limit', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    if args.command == 'build':
+        index = AddressIndex.from_register(args.register, args.address_field)
+        index.save(args.output)
+        print(f"Indexed {len(index)} addresses ({len(index.keys)} keys) in {time.time() - started:.1f}s; "
+              f"saved to {args.output}")
+        return
+
+    index = load_address_index(args.index)
+    loaded = time.time()
+    matches = index.search(args.text, args.limit)
+    print(f"Loaded {len(index)} addresses in {loaded - started:.2f}s; "
+          f"query took {(time.time() - loaded) * 1000:.2f}ms")
+    for match in matches:
+        print(f"{match.score:8.3f}  {match.address}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Streaming bulk ingest for the property data pipeline
+Records are parsed lazily from NDJSON or CSV, one line at a time, and each
+one flows through validate -> enrich -> risk scoring as a generator chain,
+so memory stays flat however long the feed is. Failures are reported inline
+as {"index", "success": false, "error"} lines and never abort the batch
+
+Usage: python -m src.services.bulk_ingest [INPUT|-] [--format ndjson|csv] [--output PATH]
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Tuple
+
+# Longest accepted input line; anything longer is reported as a bad record
+MAX_LINE_BYTES = int(os.getenv('BULK_INGEST_MAX_LINE_BYTES', str(1024 * 1024)))
+# Result lines are written out in groups of this many records
+FLUSH_RECORDS = int(os.getenv('BULK_INGEST_FLUSH_RECORDS', '100'))
+FORMATS = ('ndjson', 'csv')
+
+
+class RecordError(ValueError):
+    """An input record that could not be parsed"""
+
+
+class OverlongLine(str):
+    """Stands in for a line over MAX_LINE_BYTES, whose bytes were read and discarded"""
+
+
+def iter_lines(stream: BinaryIO) -> Iterator[str]:
+    """Decoded lines of a binary stream, read incrementally"""
+    while True:
+        line = stream.readline(MAX_LINE_BYTES + 1)
+        if not line:
+            return
+        if len(line) > MAX_LINE_BYTES and not line.endswith(b'\n'):
+            # Skip to the end of the line so its tail is not read as further records
+            while line and not line.endswith(b'\n'):
+                line = stream.readline(MAX_LINE_BYTES + 1)
+            yield OverlongLine('\n')
+            continue
+        yield line.decode('utf-8', errors='replace')
+
+
+def iter_ndjson_records(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """(index, record or RecordError) for every non-blank line"""
+    index = 0
+    for line in lines:
+        if isinstance(line, OverlongLine):
+            record = RecordError(f"line longer than {MAX_LINE_BYTES} bytes")
+        elif not line.strip():
+            continue
+        else:
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    record = RecordError("each line must be a JSON object")
+            except ValueError as e:
+                record = RecordError(f"invalid JSON: {e}")
+        yield index, record
+        index += 1
+
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[Tuple[int, Any]]:
+    """(index, record or RecordError) for every CSV row after the header; blank cells are left out"""
+    overlong = []
+
+    def flag_overlong(lines):
+        for line in lines:
+            if isinstance(line, OverlongLine):
+                overlong.append(True)
+            yield line
+
+    reader = csv.reader(flag_overlong(lines))
+    header = next(reader, None)
+    if header is None:
+        return
+    if overlong:
+        yield 0, RecordError(f"header line longer than {MAX_LINE_BYTES} bytes")
+        return
+    header = [name.strip() for name in header]
+    for index, row in enumerate(reader):
+        if overlong:
+            overlong.clear()
+            yield index, RecordError(f"line longer than {MAX_LINE_BYTES} bytes")
+            continue
+        if len(row) > len(header):
+            yield index, RecordError(f"row has {len(row)} cells but the header has {len(header)}")
+            continue
+        yield index, {name: value for name, value in zip(header, row) if value != ''}
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    return iter_csv_records(lines) if fmt == 'csv' else iter_ndjson_records(lines)
+
+
+def iter_ndjson_output(results: Iterator[Dict[str, Any]], summary: Dict[str, Any]) -> Iterator[str]:
+    """Result dicts as NDJSON text in FLUSH_RECORDS-sized pieces, then a summary line; summary is filled in place"""
+    started = time.time()
+    buffer = []
+    processed = failed = 0
+    for result in results:
+        processed += 1
+        failed += not result['success']
+        buffer.append(json.dumps(result, default=str))
+        if len(buffer) >= FLUSH_RECORDS:
+            yield '\n'.join(buffer) + '\n'
+            buffer = []
+    if buffer:
+        yield '\n'.join(buffer) + '\n'
+
+    elapsed = time.time() - started
+    summary.update(
+        records=processed,
+        successful=processed - failed,
+        failed=failed,
+        elapsed_seconds=round(elapsed, 4),
+        records_per_second=round(processed / elapsed, 1) if elapsed > 0 else None
+    )
+    yield json.dumps({'summary': summary}) + '\n'
+
+
+def detect_format(content_type: str = '', filename: str = '') -> str:
+    """ndjson unless the content type or file extension says CSV"""
+    if 'csv' in (content_type or '').lower() or (filename or '').lower().endswith('.csv'):
+        return 'csv'
+    return 'ndjson'
+
+
+def main(argv=None):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    from src.routes.data_pipeline import pipeline_manager
+
+    parser = argparse.ArgumentParser(description="Run an NDJSON or CSV property feed through the data pipeline")
+    parser.add_argument('input', nargs='?', default='-', help="Input file, or - for stdin")
+    parser.add_argument('--format', choices=FORMATS, help="Input format; defaults from the file extension")
+    parser.add_argument('--output', help="NDJSON results path; defaults to stdout")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(filename=args.input)
+    source = sys.stdin.buffer if args.input == '-' else open(args.input, 'rb')
+    sink = open(args.output, 'w') if args.output else sys.stdout
+    summary = {'source': args.input, 'format': fmt}
+    try:
+        results = pipeline_manager.iter_bulk(iter_records(iter_lines(source), fmt))
+        for piece in iter_ndjson_output(results, summary):
+            sink.write(piece)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(f"Ingested {summary['records']} records ({summary['failed']} failed) in {summary['elapsed_seconds']}s "
+          f"({summary['records_per_second']} records/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+In-process result caching for PropGuard AI
+LRU eviction with optional TTL and an approximate memory bound, plus an
+optional SQLite tier that keeps entries evicted from memory
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def canonical_hash(*parts) -> str:
+    """Content hash of JSON-like values, independent of dict key order"""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value in bytes"""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 256
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count, total size and entry age"""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None, on_evict: Optional[Callable[[List[Tuple[str, Any, float]]], None]] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # Called outside the lock with the (key, value, stored_at) entries pushed out by a put
+        self.on_evict = on_evict
+        self._entries = OrderedDict()  # key -> (value, stored_at, size)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str, default=None):
+        """Return the cached value and mark it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, stored_at, size = entry
+            if self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Any, size: Optional[int] = None, stored_at: Optional[float] = None):
+        """Store a value, evicting least recently used entries to stay within bounds"""
+        size = estimate_size(value) if size is None else size
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        evicted = []
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.time() if stored_at is None else stored_at, size)
+            self.current_bytes += size
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or
+                (self.max_bytes is not None and self.current_bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._entries))
+                if self.on_evict is not None:
+                    evicted.append((oldest, self._entries[oldest][0], self._entries[oldest][1]))
+                self._remove(oldest)
+                self.evictions += 1
+
+        if evicted:
+            self.on_evict(evicted)
+
+    def invalidate(self, key: str) -> bool:
+        """Drop a single entry"""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            self.invalidations += 1
+            return True
+
+    def clear(self):
+        """Drop every entry, e.g. when the model that produced them changes"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: str):
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, bounds and hit/miss/eviction counters"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations
+        }
+
+
+SPILL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    stored_at REAL NOT NULL
+)
+"""
+
+
+class SpillCache:
+    """
+    LRU cache of JSON-serialisable results whose evicted entries spill to SQLite
+    Values are stored as JSON text in both tiers, so sizes are exact and every
+    get returns a fresh copy the caller may mutate
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = None,
+                 max_bytes: Optional[int] = None, spill_path: Optional[str] = None, max_spill_entries: int = 100000):
+        self.memory = LRUCache(max_entries, ttl_seconds, max_bytes, on_evict=self._spill if spill_path else None)
+        self.ttl_seconds = ttl_seconds
+        self.spill_path = spill_path or None
+        self.max_spill_entries = max_spill_entries
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.spill_stats = {'hits': 0, 'misses': 0, 'writes': 0, 'errors': 0}
+        self.latency = {'hit': [0, 0.0, 0.0], 'miss': [0, 0.0, 0.0]}  # count, total seconds, max seconds
+
+        if self.spill_path:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = self._connection()
+            conn.execute(SPILL_SCHEMA)
+            conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.spill_path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str):
+        with self._stats_lock:
+            self.spill_stats[name] += 1
+
+    def _spill(self, entries: List[Tuple[str, str, float]]):
+        try:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO cache_entries (key, value, stored_at) VALUES (?, ?, ?)", entries)
+                # Trim the oldest rows once the disk tier outgrows its bound
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE key IN (SELECT key FROM cache_entries ORDER BY stored_at "
+                    "LIMIT max(0, (SELECT COUNT(*) FROM cache_entries) - ?))", (self.max_spill_entries,)
+                )
+            with self._stats_lock:
+                self.spill_stats['writes'] += len(entries)
+        except sqlite3.Error as e:
+            print(f"Cache spill to {self.spill_path} failed: {e}")
+            self._count('errors')
+
+    def _load_spilled(self, key: str) -> Optional[Tuple[str, float]]:
+        try:
+            conn = self._connection()
+            row = conn.execute("SELECT value, stored_at FROM cache_entries WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                with conn:
+                    conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            print(f"Cache spill lookup in {self.spill_path} failed: {e}")
+            self._count('errors')
+            return None
+        if row is None or (self.ttl_seconds is not None and time.time() - row[1] > self.ttl_seconds):
+            self._count('misses')
+            return None
+        self._count('hits')
+        return row
+
+    def get(self, key: str) -> Optional[Any]:
+        payload = self.memory.get(key)
+        if payload is None and self.spill_path:
+            spilled = self._load_spilled(key)
+            if spilled is not None:
+                # Keep the original store time so the TTL still counts from when it was computed
+                payload, stored_at = spilled
+                self.memory.put(key, payload, size=len(payload), stored_at=stored_at)
+        return None if payload is None else json.loads(payload)
+
+    def put(self, key: str, value: Any):
+        payload = json.dumps(value, default=str)
+        self.memory.put(key, payload, size=len(payload))
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Tuple[Any, bool]:
+        """(value, cache_hit); compute() runs on a miss and its result is stored"""
+        started = time.perf_counter()
+        value = self.get(key)
+        hit = value is not None
+        if not hit:
+            value = compute()
+            self.put(key, value)
+        self._record_latency('hit' if hit else 'miss', time.perf_counter() - started)
+        return value, hit
+
+    def _record_latency(self, kind: str, seconds: float):
+        with self._stats_lock:
+            entry = self.latency[kind]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    def clear(self):
+        self.memory.clear()
+        if self.spill_path:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM cache_entries")
+
+    def __len__(self) -> int:
+        return len(self.memory)
+
+    def stats(self) -> Dict[str, Any]:
+        """Memory tier stats, disk tier stats and hit/miss latency in milliseconds"""
+        with self._stats_lock:
+            latency = {
+                kind: {
+                    'count': count,
+                    'mean_ms': round(total / count * 1000, 3) if count else 0.0,
+                    'max_ms': round(peak * 1000, 3)
+                }
+                for kind, (count, total, peak) in self.latency.items()
+            }
+            spill = dict(self.spill_stats)
+        if self.spill_path:
+            try:
+                spill['entries'] = self._connection().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+            except sqlite3.Error:
+                spill['entries'] = None
+            spill.update(path=self.spill_path, max_entries=self.max_spill_entries)
+
+        memory = self.memory.stats()
+        lookups = memory['hits'] + memory['misses']
+        hits = memory['hits'] + spill['hits']
+        return {
+            'memory': memory,
+            'spill': spill if self.spill_path else None,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'latency': latency
+        }
@@ -0,0 +1,103 @@
+"""
+Columnar file I/O shared by the batch pipelines
+Tables are dicts of equal-length NumPy arrays. Parquet needs pyarrow, which is
+in requirements.txt; where it is missing, results default to a compressed .npz
+and inputs must be CSV. Both writers hold at most one chunk in memory
+"""
+
+import csv
+import zipfile
+import tempfile
+import importlib.util
+import numpy as np
+from typing import Dict, List, Tuple
+
+
+def default_extension() -> str:
+    """'.parquet' when pyarrow is installed, '.npz' otherwise"""
+    return '.parquet' if importlib.util.find_spec('pyarrow') is not None else '.npz'
+
+
+def read_columns(path: str) -> Dict[str, np.ndarray]:
+    """Whole CSV or Parquet file as {column: array}; CSV cells stay strings, blanks as ''"""
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Reading Parquet requires pyarrow; convert the file to CSV or install pyarrow")
+        table = pq.read_table(path)
+        return {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        cells: List[List[str]] = [[] for _ in header]
+        for row in reader:
+            for i, column in enumerate(cells):
+                column.append(row[i] if i < len(row) else '')
+    return {name: np.array(column, dtype=str) for name, column in zip(header, cells)}
+
+
+class ColumnarWriter:
+    """Append result chunks to Parquet as they arrive, or spool them to disk and assemble one .npz on close"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self._spool = None
+        # One {column: (spool offset, dtype, rows)} per written chunk
+        self._spooled: List[Dict[str, Tuple[int, np.dtype, int]]] = []
+        if self.parquet:
+            try:
+                import pyarrow
+                import pyarrow.parquet
+                self._pa = pyarrow
+            except ImportError:
+                raise RuntimeError("Writing Parquet requires pyarrow; use a .npz output instead")
+
+    def write(self, columns: Dict[str, np.ndarray]):
+        if not self.parquet:
+            self._spool_chunk(columns)
+            return
+        table = self._pa.table({name: self._pa.array(values.tolist() if values.dtype == object else values)
+                                for name, values in columns.items()})
+        if self._writer is None:
+            self._writer = self._pa.parquet.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def _spool_chunk(self, columns: Dict[str, np.ndarray]):
+        if self._spool is None:
+            self._spool = tempfile.TemporaryFile()
+        entry = {}
+        for name, values in columns.items():
+            # Text columns are stored as fixed-width unicode so the file loads without pickle
+            values = values.astype(str) if values.dtype == object else values
+            entry[name] = (self._spool.tell(), values.dtype, len(values))
+            np.save(self._spool, values)
+        self._spooled.append(entry)
+
+    def close(self):
+        if self.parquet:
+            if self._writer is not None:
+                self._writer.close()
+            return
+        if not self._spooled:
+            return
+        path = self.path if self.path.endswith('.npz') else self.path + '.npz'
+        try:
+            # Same layout as np.savez_compressed, written one column and one chunk at a time
+            with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+                for name in self._spooled[0]:
+                    parts = [chunk[name] for chunk in self._spooled]
+                    dtype = np.result_type(*[part_dtype for _, part_dtype, _ in parts])
+                    header = {'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False,
+                              'shape': (sum(rows for _, _, rows in parts),)}
+                    with archive.open(f"{name}.npy", 'w', force_zip64=True) as member:
+                        np.lib.format.write_array_header_2_0(member, header)
+                        for offset, _, _ in parts:
+                            self._spool.seek(offset)
+                            member.write(np.load(self._spool).astype(dtype, copy=False).tobytes())
+        finally:
+            self._spool.close()
+            self._spool = None
@@ -0,0 +1,146 @@
+"""
+Persistent per-property feature vectors for XNode valuation
+Vectors are keyed by property id and tagged with hashes of the inputs that
+produced them, so unchanged properties skip feature engineering entirely and
+market moves only refresh the market-dependent slots
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import numpy as np
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+FEATURE_DIM = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS property_features (
+    property_id TEXT PRIMARY KEY,
+    stable_hash TEXT NOT NULL,
+    market_hash TEXT NOT NULL,
+    features BLOB NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+# SQLite caps bound parameters per statement; look ids up in slices below it
+LOOKUP_CHUNK = 500
+
+
+class FeatureRecord:
+    """A stored feature vector and the input hashes it was built from"""
+
+    __slots__ = ('property_id', 'stable_hash', 'market_hash', 'features', 'updated_at')
+
+    def __init__(self, property_id: str, stable_hash: str, market_hash: str, features: np.ndarray, updated_at: float):
+        self.property_id = property_id
+        self.stable_hash = stable_hash
+        self.market_hash = market_hash
+        self.features = features
+        self.updated_at = updated_at
+
+
+class FeatureStore:
+    """SQLite-backed feature vector store with one connection per thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.stats_counters = {'reads': 0, 'hits': 0, 'misses': 0, 'writes': 0, 'full_builds': 0, 'market_refreshes': 0}
+
+        conn = self._connection()
+        conn.execute(SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def count(self, **increments):
+        """Bump named usage counters, e.g. full_builds or market_refreshes"""
+        with self._stats_lock:
+            for name, value in increments.items():
+                self.stats_counters[name] += value
+
+    def get_many(self, property_ids: Iterable[str]) -> Dict[str, FeatureRecord]:
+        """Stored records for the given ids; unknown ids are simply absent"""
+        ids = list(dict.fromkeys(str(property_id) for property_id in property_ids))
+        records = {}
+        conn = self._connection()
+        for start in range(0, len(ids), LOOKUP_CHUNK):
+            chunk = ids[start:start + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT property_id, stable_hash, market_hash, features, updated_at "
+                f"FROM property_features WHERE property_id IN ({placeholders})",
+                chunk
+            ).fetchall()
+            for property_id, stable_hash, market_hash, blob, updated_at in rows:
+                records[property_id] = FeatureRecord(
+                    property_id, stable_hash, market_hash, np.frombuffer(blob, dtype=np.float64), updated_at
+                )
+
+        self.count(reads=len(ids), hits=len(records), misses=len(ids) - len(records))
+        return records
+
+    def get(self, property_id: str) -> Optional[FeatureRecord]:
+        return self.get_many([property_id]).get(str(property_id))
+
+    def put_many(self, rows: List[Tuple[str, str, str, Any]]):
+        """Insert or replace (property_id, stable_hash, market_hash, features) rows in one transaction"""
+        if not rows:
+            return
+        now = time.time()
+        payload = [
+            (str(property_id), stable_hash, market_hash,
+             np.ascontiguousarray(features, dtype=np.float64).reshape(FEATURE_DIM).tobytes(), now)
+            for property_id, stable_hash, market_hash, features in rows
+        ]
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO property_features "
+                "(property_id, stable_hash, market_hash, features, updated_at) VALUES (?, ?, ?, ?, ?)",
+                payload
+            )
+        self.count(writes=len(payload))
+
+    def put(self, property_id: str, stable_hash: str, market_hash: str, features):
+        self.put_many([(property_id, stable_hash, market_hash, features)])
+
+    def delete(self, property_id: str) -> bool:
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM property_features WHERE property_id = ?", (str(property_id),))
+        return cursor.rowcount > 0
+
+    def load_matrix(self, property_ids: List[str]) -> Tuple[np.ndarray, List[str]]:
+        """(N x 50) matrix of stored vectors in request order, plus the ids that were not found"""
+        records = self.get_many(property_ids)
+        found = [str(property_id) for property_id in property_ids if str(property_id) in records]
+        missing = [str(property_id) for property_id in property_ids if str(property_id) not in records]
+        matrix = np.empty((len(found), FEATURE_DIM), dtype=np.float64)
+        for row, property_id in enumerate(found):
+            matrix[row] = records[property_id].features
+        return matrix, missing
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM property_features").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            counters = dict(self.stats_counters)
+        counters['hit_rate'] = round(counters['hits'] / counters['reads'], 4) if counters['reads'] else 0.0
+        counters['properties'] = len(self)
+        counters['path'] = self.path
+        return counters
@@ -0,0 +1,144 @@
+"""
+Shared Ollama HTTP client
+One pooled requests.Session per process: connections to Ollama are kept alive
+and reused across requests and threads instead of a new TCP connection per
+call. Connection failures and 502/503/504 responses are retried with
+exponential backoff; read timeouts are not, since a slow generation would
+only be repeated. Timeouts are per endpoint and pool use is reported by stats().
+iter_generate streams Ollama's NDJSON chunks as they arrive; for a streamed
+call the read timeout is the longest allowed gap between chunks
+"""
+
+import os
+import json
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Dict, Iterator, Optional
+from src.services.metrics import registry
+
+OLLAMA_BASE_URL = os.getenv('OLLAMA_BASE_URL', 'http://localhost:11434')
+# Largest number of connections kept open to Ollama; callers beyond it wait for a free one
+OLLAMA_POOL_SIZE = int(os.getenv('OLLAMA_POOL_SIZE', '10'))
+OLLAMA_RETRIES = int(os.getenv('OLLAMA_RETRIES', '2'))
+OLLAMA_BACKOFF_SECONDS = float(os.getenv('OLLAMA_BACKOFF_SECONDS', '0.5'))
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv('OLLAMA_CONNECT_TIMEOUT', '3'))
+# Read timeout per API path, in seconds
+OLLAMA_TIMEOUTS = {
+    '/api/generate': float(os.getenv('OLLAMA_GENERATE_TIMEOUT', '60')),
+    '/api/tags': float(os.getenv('OLLAMA_TAGS_TIMEOUT', '5'))
+}
+DEFAULT_READ_TIMEOUT = 30.0
+RETRY_STATUSES = (502, 503, 504)
+
+OLLAMA_POOL_IN_USE = registry.gauge('ollama_pool_in_use', 'Ollama HTTP requests currently holding a pooled connection')
+OLLAMA_HTTP_REQUESTS = registry.counter('ollama_http_requests_total', 'Ollama HTTP requests by path and outcome',
+                                        ('path', 'outcome'))
+
+
+class OllamaClient:
+    """Keep-alive connection pool to one Ollama server"""
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, pool_size: int = OLLAMA_POOL_SIZE,
+                 retries: int = OLLAMA_RETRIES, backoff: float = OLLAMA_BACKOFF_SECONDS):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            # generate has no side effects, so retrying the POST is safe
+            allowed_methods=frozenset(('GET', 'POST')),
+            raise_on_status=False
+        )
+        self._adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', self._adapter)
+        self.session.mount('https://', self._adapter)
+
+    def request(self, method: str, path: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        """Send one request over the pool; the read timeout defaults to the path's entry in OLLAMA_TIMEOUTS"""
+        read_timeout = timeout if timeout is not None else OLLAMA_TIMEOUTS.get(path, DEFAULT_READ_TIMEOUT)
+        outcome = 'error'
+        try:
+            with OLLAMA_POOL_IN_USE.track_inprogress():
+                # Without stream=True the body is read here, which returns the connection to the pool
+                response = self.session.request(method, self.base_url + path,
+                                                timeout=(OLLAMA_CONNECT_TIMEOUT, read_timeout), **kwargs)
+            outcome = str(response.status_code)
+            return response
+        finally:
+            OLLAMA_HTTP_REQUESTS.labels(path=path, outcome=outcome).inc()
+
+    def get(self, path: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        return self.request('GET', path, timeout, **kwargs)
+
+    def post(self, path: str, timeout: Optional[float] = None, **kwargs) -> requests.Response:
+        return self.request('POST', path, timeout, **kwargs)
+
+    def generate(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> requests.Response:
+        return self.post('/api/generate', timeout, json=payload)
+
+    def iter_generate(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Parsed chunks of a streaming generate call; the connection is held until the last chunk or close()"""
+        path = '/api/generate'
+        read_timeout = timeout if timeout is not None else OLLAMA_TIMEOUTS[path]
+        outcome = 'error'
+        try:
+            with OLLAMA_POOL_IN_USE.track_inprogress():
+                response = self.session.post(self.base_url + path, json=dict(payload, stream=True), stream=True,
+                                             timeout=(OLLAMA_CONNECT_TIMEOUT, read_timeout))
+                with response:
+                    outcome = str(response.status_code)
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if line:
+                            yield json.loads(line)
+        finally:
+            OLLAMA_HTTP_REQUESTS.labels(path=path, outcome=outcome).inc()
+
+    def is_available(self) -> bool:
+        try:
+            return self.get('/api/tags').status_code == 200
+        except requests.RequestException:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, connections in use or idle, and lifetime connection and request counts"""
+        opened = served = idle = 0
+        for key in list(self._adapter.poolmanager.pools.keys()):
+            pool = self._adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            served += pool.num_requests
+            # The pool queue holds idle connections plus None placeholders for unopened slots
+            idle += sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool else 0
+        in_use = OLLAMA_POOL_IN_USE.value
+        return {
+            'base_url': self.base_url,
+            'pool_size': self.pool_size,
+            'in_use': in_use,
+            'idle': idle,
+            'utilisation': round(in_use / self.pool_size, 4) if self.pool_size else None,
+            'connections_opened': opened,
+            'requests_served': served,
+            'connection_reuse_ratio': round(1 - opened / served, 4) if served else None
+        }
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client() -> OllamaClient:
+    """Process-wide OllamaClient"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient()
+        return _client
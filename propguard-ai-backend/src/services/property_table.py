@@ -0,0 +1,67 @@
+"""
+Columnar re-enrichment of a whole property dataset
+Loads a CSV or Parquet table into NumPy columns and runs
+DataPipelineManager.process_table over it in one vectorised pass, instead of
+one validate/enrich/risk call chain per record, then writes every input,
+enrichment, climate factor, risk score and grade to a columnar file
+
+Usage: python -m src.services.property_table PROPERTIES.csv|PROPERTIES.parquet [--output PATH] [--seed N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from typing import Any, Dict, Optional
+from src.services.columnar_io import ColumnarWriter, default_extension, read_columns
+
+
+def enrich_property_table(input_path: str, output_path: str, seed: Optional[int] = None) -> Dict[str, Any]:
+    """Enrich and risk-score every row of input_path into output_path; returns a run summary"""
+    from src.routes.data_pipeline import pipeline_manager, RISK_GRADES
+
+    started = time.time()
+    columns = read_columns(input_path)
+    loaded = time.time()
+    table = pipeline_manager.process_table(columns, seed=seed)
+    processed = time.time()
+
+    writer = ColumnarWriter(output_path)
+    writer.write(table)
+    writer.close()
+
+    rows = len(table['valid'])
+    grades, counts = np.unique(table['risk_grade'], return_counts=True)
+    grade_counts = dict(zip(grades.tolist(), counts.tolist()))
+    return {
+        'rows': rows,
+        'invalid_rows': int((~table['valid']).sum()),
+        'risk_grades': {grade: grade_counts.get(grade, 0) for grade in RISK_GRADES},
+        'load_seconds': round(loaded - started, 3),
+        'process_seconds': round(processed - loaded, 3),
+        'write_seconds': round(time.time() - processed, 3),
+        'rows_per_second': round(rows / (processed - loaded), 1) if processed > loaded else None
+    }
+
+
+def main(argv=None):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+    parser = argparse.ArgumentParser(description="Vectorised enrichment and risk scoring of a property dataset")
+    parser.add_argument('input', help="CSV or Parquet property table")
+    parser.add_argument('--output', help="Results path (.parquet or .npz); defaults to Parquet next to the input, "
+                                         "or .npz without pyarrow")
+    parser.add_argument('--seed', type=int, help="Seed for the simulated suburb medians and forecast confidence")
+    args = parser.parse_args(argv)
+
+    output = args.output or f"{os.path.splitext(args.input)[0]}_enriched{default_extension()}"
+    summary = enrich_property_table(args.input, output, args.seed)
+    print(f"Enriched {summary['rows']} properties ({summary['invalid_rows']} invalid) in "
+          f"{summary['process_seconds']}s ({summary['rows_per_second']} rows/s); "
+          f"load {summary['load_seconds']}s, write {summary['write_seconds']}s; results in {output}")
+    print("Risk grades: " + ", ".join(f"{grade} {count}" for grade, count in summary['risk_grades'].items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Reproducible climate-risk noise and a geohash-keyed risk cache
+In deterministic mode the mock noise in every risk calculator is a hash of the
+coordinate, the noise stream and the risk model version, so the same location
+always gets the same answer and assessments can be memoised per geohash cell
+
+RISK_NOISE_MODE=random restores fresh random draws per call (and disables caching)
+"""
+
+import os
+import random
+import hashlib
+import threading
+import numpy as np
+from functools import lru_cache
+from typing import Any, Callable, Dict, Tuple
+from src.services.cache import LRUCache
+
+# Bump when risk formulas change so cached results and noise streams roll over
+RISK_MODEL_VERSION = os.getenv('RISK_MODEL_VERSION', 'climate-v1')
+NOISE_MODE = os.getenv('RISK_NOISE_MODE', 'deterministic')
+# Precision 7 cells are roughly 150 m x 150 m
+GEOHASH_PRECISION = int(os.getenv('RISK_CACHE_GEOHASH_PRECISION', '7'))
+RISK_CACHE_MAX_ENTRIES = int(os.getenv('RISK_CACHE_MAX_ENTRIES', '100000'))
+# Coordinates are quantised to 1e-6 degrees (~0.1 m) before hashing
+NOISE_COORDINATE_SCALE = 1e6
+
+GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Cached assessments are small dicts of floats; skip json sizing on every put
+RISK_ENTRY_BYTES = 512
+
+_MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(x: int) -> int:
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+
+def _splitmix64_array(x: np.ndarray) -> np.ndarray:
+    """_splitmix64 over a uint64 array; multiplication wraps modulo 2**64 as intended"""
+    with np.errstate(over='ignore'):
+        x = x + np.uint64(0x9E3779B97F4A7C15)
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+@lru_cache(maxsize=256)
+def _stream_seed(stream: str, version: str) -> int:
+    return int.from_bytes(hashlib.sha256(f"{version}:{stream}".encode()).digest()[:8], 'little')
+
+
+def coordinate_noise(lat, lng, stream: str, version: str = None):
+    """Uniform [0, 1) value that depends only on the coordinate, the noise stream and the model version"""
+    seed = _stream_seed(stream, version or RISK_MODEL_VERSION)
+    if np.ndim(lat) == 0 and np.ndim(lng) == 0:
+        h = _splitmix64(seed ^ (int(round(float(lat) * NOISE_COORDINATE_SCALE)) & _MASK64))
+        h = _splitmix64(h ^ (int(round(float(lng) * NOISE_COORDINATE_SCALE)) & _MASK64))
+        return (h >> 11) / 9007199254740992.0
+
+    lat, lng = np.broadcast_arrays(np.asarray(lat, dtype=np.float64), np.asarray(lng, dtype=np.float64))
+    quantised_lat = np.round(lat * NOISE_COORDINATE_SCALE).astype(np.int64).view(np.uint64)
+    quantised_lng = np.round(lng * NOISE_COORDINATE_SCALE).astype(np.int64).view(np.uint64)
+    h = _splitmix64_array(np.uint64(seed) ^ quantised_lat)
+    h = _splitmix64_array(h ^ quantised_lng)
+    return (h >> np.uint64(11)).astype(np.float64) / 9007199254740992.0
+
+
+def risk_noise(lat, lng, stream: str):
+    """Noise for the risk calculators: coordinate-derived when deterministic, fresh draws otherwise"""
+    if NOISE_MODE == 'random':
+        if np.ndim(lat) == 0:
+            return random.random()
+        return np.random.random(np.shape(lat))
+    return coordinate_noise(lat, lng, stream)
+
+
+def _spread_bits(x: int) -> int:
+    """Move bit k of a 32-bit value to bit 2k"""
+    x &= 0xFFFFFFFF
+    x = (x | (x << 16)) & 0x0000FFFF0000FFFF
+    x = (x | (x << 8)) & 0x00FF00FF00FF00FF
+    x = (x | (x << 4)) & 0x0F0F0F0F0F0F0F0F
+    x = (x | (x << 2)) & 0x3333333333333333
+    return (x | (x << 1)) & 0x5555555555555555
+
+
+def geohash_cell(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> Tuple[str, float, float]:
+    """Geohash of a point plus the centre of its cell"""
+    # A geohash alternates longitude and latitude bits starting with longitude, so
+    # quantise each axis once and interleave the integers instead of bisecting bit by bit
+    total_bits = 5 * precision
+    lng_bits, lat_bits = (total_bits + 1) // 2, total_bits // 2
+    lat_index = min(max(int((lat + 90.0) / 180.0 * (1 << lat_bits)), 0), (1 << lat_bits) - 1)
+    lng_index = min(max(int((lng + 180.0) / 360.0 * (1 << lng_bits)), 0), (1 << lng_bits) - 1)
+    if total_bits % 2:
+        code = _spread_bits(lng_index) | (_spread_bits(lat_index) << 1)
+    else:
+        code = (_spread_bits(lng_index) << 1) | _spread_bits(lat_index)
+
+    cell = ''.join(GEOHASH_BASE32[(code >> shift) & 31] for shift in range(total_bits - 5, -1, -5))
+    lat_step, lng_step = 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+    return cell, -90.0 + (lat_index + 0.5) * lat_step, -180.0 + (lng_index + 0.5) * lng_step
+
+
+def geohash_cell_centres(lats, lngs, precision: int = GEOHASH_PRECISION) -> Tuple[np.ndarray, np.ndarray]:
+    """Centres of the geohash cells containing each point, identical to geohash_cell's centre per point"""
+    total_bits = 5 * precision
+    lng_bits, lat_bits = (total_bits + 1) // 2, total_bits // 2
+    lats = np.asarray(lats, dtype=np.float64)
+    lngs = np.asarray(lngs, dtype=np.float64)
+    lat_index = np.clip(((lats + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64), 0, (1 << lat_bits) - 1)
+    lng_index = np.clip(((lngs + 180.0) / 360.0 * (1 << lng_bits)).astype(np.int64), 0, (1 << lng_bits) - 1)
+    lat_step, lng_step = 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+    return -90.0 + (lat_index + 0.5) * lat_step, -180.0 + (lng_index + 0.5) * lng_step
+
+
+class RiskCache:
+    """Memoised risk assessments, one per geohash cell and risk model version"""
+
+    def __init__(self, name: str, precision: int = GEOHASH_PRECISION, max_entries: int = RISK_CACHE_MAX_ENTRIES):
+        self.name = name
+        self.precision = precision
+        self.cache = LRUCache(max_entries=max_entries)
+        with _registry_lock:
+            _registry[name] = self
+
+    @property
+    def enabled(self) -> bool:
+        # Random noise would make the first caller's draw stick for the whole cell
+        return NOISE_MODE == 'deterministic' and self.precision > 0
+
+    def get_or_compute(self, lat: float, lng: float, compute: Callable[[float, float], Dict[str, Any]]) -> Dict[str, Any]:
+        """compute(cell_lat, cell_lng) once per geohash cell; every point in the cell shares the result"""
+        if not self.enabled:
+            return compute(lat, lng)
+
+        cell, cell_lat, cell_lng = geohash_cell(lat, lng, self.precision)
+        key = f"{RISK_MODEL_VERSION}:{cell}"
+        value = self.cache.get(key)
+        if value is None:
+            value = compute(cell_lat, cell_lng)
+            self.cache.put(key, value, size=RISK_ENTRY_BYTES)
+        return dict(value)
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'geohash_precision': self.precision,
+            'model_version': RISK_MODEL_VERSION,
+            **self.cache.stats()
+        }
+
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+def risk_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every risk cache in this process, by name"""
+    with _registry_lock:
+        caches = dict(_registry)
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    return {'noise_mode': NOISE_MODE, 'caches': stats}
@@ -0,0 +1,187 @@
+"""
+Precomputed climate-risk raster for XNode risk lookups
+Every deterministic risk factor is evaluated once over an Australian lat/lng
+lattice and stored as a (layers x rows x cols) float32 .npy with a JSON
+sidecar; point queries become bilinear lookups on a memory-mapped array
+
+XNode falls back to on-the-fly assessment when the grid is missing or was
+built from different geographic reference data. Build it, and rebuild it after
+changing the risk model, with: python -m src.services.risk_grid [--resolution 0.05] [--output PATH]
+XNODE_RISK_GRID_AUTOBUILD=1 makes XNode build it at import instead
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Layers produced by RiskWorker._risk_layers; fire_base excludes the vegetation noise term
+LAYERS = ('flood', 'fire_base', 'coastal', 'subsidence', 'cyclone', 'heatwave', 'confidence')
+# Step functions would be smeared across thresholds by interpolation, so they use the nearest cell
+NEAREST_LAYERS = ('coastal', 'cyclone')
+# (lat_min, lat_max, lng_min, lng_max)
+AUSTRALIA_BOUNDS = (-44.0, -10.0, 112.0, 154.0)
+DEFAULT_RESOLUTION = 0.05
+# Lattice rows evaluated per builder step, bounding temporary memory
+BUILD_ROW_CHUNK = 64
+
+
+class RiskGrid:
+    """Regular lat/lng lattice of risk layers with O(1) point lookups"""
+
+    def __init__(self, data: np.ndarray, bounds: Tuple[float, float, float, float], resolution: float,
+                 layers: List[str] = LAYERS, metadata: Optional[Dict] = None):
+        self.data = data
+        self.bounds = tuple(bounds)
+        self.resolution = resolution
+        self.layers = list(layers)
+        self.metadata = metadata or {}
+        self.rows, self.cols = data.shape[1], data.shape[2]
+        # Plain-ndarray (layers x cells) view; slicing an np.memmap pays subclass overhead per call
+        self._flat = np.asarray(data).reshape(data.shape[0], -1)
+
+    @classmethod
+    def build(cls, layer_fn: Callable, bounds=AUSTRALIA_BOUNDS, resolution: float = DEFAULT_RESOLUTION,
+              source: Optional[str] = None) -> 'RiskGrid':
+        """Evaluate layer_fn(lat_array, lng_array) -> {layer: array} over the whole lattice; source tags the inputs used"""
+        lat_min, lat_max, lng_min, lng_max = bounds
+        lats = lat_min + np.arange(int(round((lat_max - lat_min) / resolution)) + 1) * resolution
+        lngs = lng_min + np.arange(int(round((lng_max - lng_min) / resolution)) + 1) * resolution
+
+        data = np.empty((len(LAYERS), len(lats), len(lngs)), dtype=np.float32)
+        started = time.time()
+        for start in range(0, len(lats), BUILD_ROW_CHUNK):
+            lat_block, lng_block = np.meshgrid(lats[start:start + BUILD_ROW_CHUNK], lngs, indexing='ij')
+            values = layer_fn(lat_block, lng_block)
+            for i, name in enumerate(LAYERS):
+                data[i, start:start + len(lat_block)] = np.broadcast_to(values[name], lat_block.shape)
+
+        metadata = {'built_at': time.time(), 'build_seconds': round(time.time() - started, 3), 'source': source}
+        return cls(data, bounds, resolution, LAYERS, metadata)
+
+    @classmethod
+    def open(cls, path: str) -> 'RiskGrid':
+        """Memory-map a saved grid read-only"""
+        with open(cls._metadata_path(path)) as f:
+            metadata = json.load(f)
+        data = np.load(path, mmap_mode='r')
+        return cls(data, metadata['bounds'], metadata['resolution'], metadata['layers'], metadata)
+
+    def save(self, path: str):
+        """Write the grid and its sidecar, replacing any previous grid atomically"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(self.data))
+        metadata = dict(self.metadata, bounds=list(self.bounds), resolution=self.resolution,
+                        layers=self.layers, shape=list(self.data.shape))
+        tmp_metadata = f"{self._metadata_path(path)}.{os.getpid()}.tmp"
+        with open(tmp_metadata, 'w') as f:
+            json.dump(metadata, f, indent=2)
+        os.replace(tmp_path, path)
+        os.replace(tmp_metadata, self._metadata_path(path))
+
+    @staticmethod
+    def _metadata_path(path: str) -> str:
+        return f"{os.path.splitext(path)[0]}.json"
+
+    def covers(self, lat, lng) -> bool:
+        lat_min, lat_max, lng_min, lng_max = self.bounds
+        return lat_min <= lat <= lat_max and lng_min <= lng <= lng_max
+
+    def lookup(self, lat: float, lng: float) -> Dict[str, float]:
+        """Every layer at one point: bilinear for smooth layers, nearest cell for step layers"""
+        lat_min, _, lng_min, _ = self.bounds
+        y = (lat - lat_min) / self.resolution
+        x = (lng - lng_min) / self.resolution
+        row = min(max(int(y), 0), self.rows - 2)
+        col = min(max(int(x), 0), self.cols - 2)
+        dy = min(max(y - row, 0.0), 1.0)
+        dx = min(max(x - col, 0.0), 1.0)
+
+        # Two contiguous slices give the cell's corners for every layer; blending plain floats
+        # is cheaper than numpy dispatch at this size
+        cell = row * self.cols + col
+        top = self._flat[:, cell:cell + 2].tolist()
+        bottom = self._flat[:, cell + self.cols:cell + self.cols + 2].tolist()
+        w00, w01, w10, w11 = (1 - dy) * (1 - dx), (1 - dy) * dx, dy * (1 - dx), dy * dx
+        near_row, near_col = dy >= 0.5, int(dx >= 0.5)
+
+        result = {}
+        for name, (t0, t1), (b0, b1) in zip(self.layers, top, bottom):
+            if name in NEAREST_LAYERS:
+                result[name] = ((b0, b1) if near_row else (t0, t1))[near_col]
+            else:
+                result[name] = t0 * w00 + t1 * w01 + b0 * w10 + b1 * w11
+        return result
+
+    def lookup_many(self, lats, lngs) -> Dict[str, np.ndarray]:
+        """Vectorised lookup of N points; points outside the grid are clamped to its edge"""
+        lat_min, _, lng_min, _ = self.bounds
+        y = (np.asarray(lats, dtype=np.float64) - lat_min) / self.resolution
+        x = (np.asarray(lngs, dtype=np.float64) - lng_min) / self.resolution
+        row = np.clip(y.astype(np.int64), 0, self.rows - 2)
+        col = np.clip(x.astype(np.int64), 0, self.cols - 2)
+        dy = np.clip(y - row, 0.0, 1.0)
+        dx = np.clip(x - col, 0.0, 1.0)
+
+        result = {}
+        for i, name in enumerate(self.layers):
+            layer = self.data[i]
+            if name in NEAREST_LAYERS:
+                result[name] = layer[row + (dy >= 0.5), col + (dx >= 0.5)].astype(np.float64)
+            else:
+                result[name] = (layer[row, col] * (1 - dy) * (1 - dx) + layer[row, col + 1] * (1 - dy) * dx +
+                                layer[row + 1, col] * dy * (1 - dx) + layer[row + 1, col + 1] * dy * dx)
+        return result
+
+    def info(self) -> Dict:
+        return {
+            'bounds': list(self.bounds),
+            'resolution': self.resolution,
+            'shape': list(self.data.shape),
+            'layers': self.layers,
+            'bytes': int(self.data.nbytes),
+            'built_at': self.metadata.get('built_at'),
+            'source': self.metadata.get('source')
+        }
+
+
+def load_risk_grid(path: str, source: Optional[str] = None) -> Optional[RiskGrid]:
+    """Open the grid at path if one has been generated from the given source"""
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        grid = RiskGrid.open(path)
+    except Exception as e:
+        print(f"Risk grid at {path} could not be loaded: {e}")
+        return None
+    if source is not None and grid.metadata.get('source') != source:
+        print(f"Risk grid at {path} was built from different reference data, ignoring it")
+        return None
+    return grid
+
+
+def main(argv=None):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    from src.services.spatial_index import get_geo_reference
+    from src.services.xnode_workers import RiskWorker, RISK_GRID_PATH, RISK_GRID_RESOLUTION
+
+    parser = argparse.ArgumentParser(description="Regenerate the precomputed climate-risk grid")
+    parser.add_argument('--resolution', type=float, default=RISK_GRID_RESOLUTION, help="Lattice spacing in degrees")
+    parser.add_argument('--output', default=RISK_GRID_PATH, help="Destination .npy path")
+    args = parser.parse_args(argv)
+
+    grid = RiskGrid.build(RiskWorker("risk_grid_builder")._risk_layers, AUSTRALIA_BOUNDS, args.resolution,
+                          source=get_geo_reference().checksum)
+    grid.save(args.output)
+    print(f"Risk grid {grid.data.shape} at {args.resolution} deg written to {args.output} "
+          f"({grid.data.nbytes / 1e6:.1f} MB, built in {grid.metadata['build_seconds']}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Spatial index over the geographic reference data used by the risk calculators
+Coastline vertices, urban centres, mining areas and major cities are loaded
+once from CSV files (falling back to built-in reference points) and queried
+with great-circle distances; large point sets are served by a haversine
+BallTree, small ones by a single (N x K) distance matrix
+
+Files read from GEO_REFERENCE_DIR (default src/database/geo), all optional:
+    coastline.csv       lat,lng
+    urban_centers.csv   lat,lng,radius_km[,name]
+    mining_areas.csv    area,lat,lng,risk_level   (one row per polygon vertex or point)
+    major_cities.csv    lat,lng[,name]
+
+A mining area given as three or more vertices, in boundary order, is a
+polygon: points inside it take the area's full risk level. Areas with fewer
+vertices are point sites scored by distance alone
+"""
+
+import os
+import csv
+import hashlib
+import threading
+import numpy as np
+from typing import Dict, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+# Great-circle length of one degree, for thresholds that were historically given in degrees
+DEGREE_KM = EARTH_RADIUS_KM * np.pi / 180
+# Mining areas raise subsidence risk within this distance of their nearest vertex
+MINING_RADIUS_KM = 2 * DEGREE_KM
+# Part of the GeoReference checksum; bump when the same files start to mean something different
+GEO_REFERENCE_VERSION = 'geo-v2'
+# Fewest vertices for a mining area to be treated as a polygon rather than point sites
+MIN_POLYGON_VERTICES = 3
+# Below this many points a brute-force distance matrix beats building a tree
+BRUTE_FORCE_MAX_POINTS = 64
+# Cells per brute-force distance matrix (queries x points), bounding its memory to ~32 MB
+MATRIX_CELLS = 1 << 22
+
+DEFAULT_GEO_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'geo')
+
+# Built-in reference points, used for any file that is not present
+DEFAULT_COASTLINE = [
+    (-33.8688, 151.2093),  # Sydney
+    (-37.8136, 144.9631),  # Melbourne
+    (-31.9505, 115.8605),  # Perth
+    (-27.4698, 153.0251),  # Brisbane
+]
+DEFAULT_URBAN_CENTERS = [
+    (-33.8688, 151.2093, 0.5 * DEGREE_KM, 'Sydney'),
+    (-37.8136, 144.9631, 0.5 * DEGREE_KM, 'Melbourne'),
+    (-27.4698, 153.0251, 0.3 * DEGREE_KM, 'Brisbane'),
+    (-31.9505, 115.8605, 0.3 * DEGREE_KM, 'Perth'),
+    (-34.9285, 138.6007, 0.2 * DEGREE_KM, 'Adelaide'),
+]
+DEFAULT_MINING_AREAS = [
+    ('Hunter Valley', -32.5, 151.5, 0.6),
+    ('Latrobe Valley', -37.5, 145.0, 0.4),
+    ('Bowen Basin', -23.5, 150.5, 0.5),
+]
+DEFAULT_MAJOR_CITIES = [
+    (-33.8688, 151.2093, 'Sydney'),
+    (-37.8136, 144.9631, 'Melbourne'),
+    (-27.4698, 153.0251, 'Brisbane'),
+]
+
+
+def _point_in_polygon(lat: np.ndarray, lng: np.ndarray, polygon_lats: np.ndarray, polygon_lngs: np.ndarray) -> np.ndarray:
+    """Even-odd ray casting in the lat/lng plane, for flat query arrays; fine for areas far smaller than a hemisphere"""
+    inside = np.zeros(len(lat), dtype=bool)
+    candidates = np.flatnonzero((lat >= polygon_lats.min()) & (lat <= polygon_lats.max()) &
+                                (lng >= polygon_lngs.min()) & (lng <= polygon_lngs.max()))
+    if not len(candidates):
+        return inside
+    y, x = lat[candidates], lng[candidates]
+    crossings = np.zeros(len(candidates), dtype=bool)
+    for y1, x1, y2, x2 in zip(polygon_lats, polygon_lngs, np.roll(polygon_lats, -1), np.roll(polygon_lngs, -1)):
+        if y1 == y2:
+            continue
+        straddles = (y1 > y) != (y2 > y)
+        crossings ^= straddles & (x < x1 + (y - y1) * (x2 - x1) / (y2 - y1))
+    inside[candidates] = crossings
+    return inside
+
+
+def _ball_tree(radians: np.ndarray):
+    """Haversine BallTree over (K x 2) lat/lng radians, or None when scikit-learn is unavailable"""
+    try:
+        from sklearn.neighbors import BallTree
+    except ImportError:
+        print(f"scikit-learn not available, indexing {len(radians)} points with brute-force distances")
+        return None
+    return BallTree(radians, metric='haversine')
+
+
+class SpatialIndex:
+    """Nearest-neighbour and radius queries over a fixed set of lat/lng points, in great-circle km"""
+
+    def __init__(self, lats, lngs, **attributes):
+        self.lats = np.asarray(lats, dtype=np.float64).reshape(-1)
+        self.lngs = np.asarray(lngs, dtype=np.float64).reshape(-1)
+        self.attributes = {name: np.asarray(values) for name, values in attributes.items()}
+        self._lat_radians = np.radians(self.lats)
+        self._lng_radians = np.radians(self.lngs)
+        self._cos_lat = np.cos(self._lat_radians)
+        self._query_chunk = max(1, MATRIX_CELLS // max(1, len(self)))
+        self._tree = (_ball_tree(np.column_stack([self._lat_radians, self._lng_radians]))
+                      if len(self) > BRUTE_FORCE_MAX_POINTS else None)
+
+    def __len__(self) -> int:
+        return len(self.lats)
+
+    @property
+    def backend(self) -> str:
+        return 'balltree' if self._tree is not None else 'brute-force'
+
+    @staticmethod
+    def _queries(lat, lng) -> Tuple[np.ndarray, np.ndarray, tuple]:
+        """Flattened query lat/lng radians plus the shape to restore results to"""
+        lat = np.asarray(lat, dtype=np.float64)
+        lng = np.asarray(lng, dtype=np.float64)
+        if lng.shape != lat.shape:
+            lng = np.broadcast_to(lng, lat.shape)
+        return np.radians(lat.reshape(-1)), np.radians(lng.reshape(-1)), lat.shape
+
+    def _distance_matrix(self, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """(Q x K) great-circle km from query radians to every indexed point"""
+        lat, lng = lat[:, None], lng[:, None]
+        a = (np.sin((self._lat_radians - lat) / 2)**2 +
+             np.cos(lat) * self._cos_lat * np.sin((self._lng_radians - lng) / 2)**2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+
+    def nearest(self, lat, lng) -> Tuple[np.ndarray, np.ndarray]:
+        """(distance_km, point index) of the closest indexed point, shaped like lat"""
+        lat, lng, shape = self._queries(lat, lng)
+        if self._tree is not None:
+            distances, indices = self._tree.query(np.column_stack([lat, lng]), k=1)
+            return (distances[:, 0] * EARTH_RADIUS_KM).reshape(shape), indices[:, 0].reshape(shape)
+
+        if len(lat) <= self._query_chunk:
+            matrix = self._distance_matrix(lat, lng)
+            indices = matrix.argmin(axis=1)
+            return np.take_along_axis(matrix, indices[:, None], axis=1).reshape(shape), indices.reshape(shape)
+
+        distances = np.empty(len(lat))
+        indices = np.empty(len(lat), dtype=np.int64)
+        for start in range(0, len(lat), self._query_chunk):
+            matrix = self._distance_matrix(lat[start:start + self._query_chunk], lng[start:start + self._query_chunk])
+            nearest = matrix.argmin(axis=1)
+            indices[start:start + len(matrix)] = nearest
+            distances[start:start + len(matrix)] = matrix[np.arange(len(matrix)), nearest]
+        return distances.reshape(shape), indices.reshape(shape)
+
+    def within(self, lat, lng, radius_km: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Every (query index, point index, distance_km) pair closer than radius_km, over flattened queries"""
+        lat, lng, _ = self._queries(lat, lng)
+        if self._tree is not None:
+            indices, distances = self._tree.query_radius(np.column_stack([lat, lng]), r=radius_km / EARTH_RADIUS_KM,
+                                                         return_distance=True)
+            counts = np.array([len(hits) for hits in indices], dtype=np.int64)
+            if not counts.sum():
+                empty = np.empty(0, dtype=np.int64)
+                return empty, empty, np.empty(0)
+            return (np.repeat(np.arange(len(lat)), counts), np.concatenate(indices).astype(np.int64),
+                    np.concatenate(distances) * EARTH_RADIUS_KM)
+
+        if len(lat) <= self._query_chunk:
+            matrix = self._distance_matrix(lat, lng)
+            rows, cols = np.nonzero(matrix < radius_km)
+            return rows, cols, matrix[rows, cols]
+
+        query_hits, point_hits, distance_hits = [], [], []
+        for start in range(0, len(lat), self._query_chunk):
+            matrix = self._distance_matrix(lat[start:start + self._query_chunk], lng[start:start + self._query_chunk])
+            rows, cols = np.nonzero(matrix < radius_km)
+            query_hits.append(rows + start)
+            point_hits.append(cols)
+            distance_hits.append(matrix[rows, cols])
+        return np.concatenate(query_hits), np.concatenate(point_hits), np.concatenate(distance_hits)
+
+
+class GeoReference:
+    """Shared spatial indexes for coast, urban-centre, mining-area and major-city proximity"""
+
+    def __init__(self, coastline: SpatialIndex, urban_centers: SpatialIndex, mining_areas: SpatialIndex,
+                 major_cities: SpatialIndex, source: str = None):
+        self.coastline = coastline
+        self.urban_centers = urban_centers
+        self.mining_areas = mining_areas
+        self.major_cities = major_cities
+        self.source = source
+
+        # Mining vertices grouped by area, so each area contributes once per query
+        areas, self._mining_area_of_point = np.unique(mining_areas.attributes['area'], return_inverse=True)
+        self._mining_area_levels = np.zeros(len(areas))
+        self._mining_area_levels[self._mining_area_of_point] = mining_areas.attributes['risk_level']
+        # (area, vertex lats, vertex lngs) for every area outlined by enough vertices to enclose points
+        self._mining_polygons = []
+        for area in range(len(areas)):
+            vertices = np.flatnonzero(self._mining_area_of_point == area)
+            if len(vertices) >= MIN_POLYGON_VERTICES:
+                self._mining_polygons.append((area, mining_areas.lats[vertices], mining_areas.lngs[vertices]))
+
+        digest = hashlib.sha256(GEO_REFERENCE_VERSION.encode())
+        for index in (coastline, urban_centers, mining_areas, major_cities):
+            digest.update(np.column_stack([index.lats, index.lngs]).tobytes())
+        digest.update(urban_centers.attributes['radius_km'].astype(np.float64).tobytes())
+        digest.update(self._mining_area_levels.tobytes())
+        self.checksum = digest.hexdigest()
+
+    def distance_to_coast(self, lat, lng):
+        """Great-circle km to the nearest coastline vertex"""
+        return self.coastline.nearest(lat, lng)[0]
+
+    def distance_to_major_city(self, lat, lng):
+        return self.major_cities.nearest(lat, lng)[0]
+
+    def in_urban_area(self, lat, lng):
+        """Whether each point lies inside any urban centre's radius"""
+        shape = np.shape(lat)
+        radius_km = self.urban_centers.attributes['radius_km']
+        queries, points, distances = self.urban_centers.within(lat, lng, float(radius_km.max()))
+        inside = np.zeros(int(np.prod(shape)), dtype=bool)
+        inside[queries[distances < radius_km[points]]] = True
+        return inside.reshape(shape)
+
+    def mining_influence(self, lat, lng, radius_km: float = MINING_RADIUS_KM):
+        """
+        Sum over mining areas of risk_level * (1 - d / radius), d being the distance to the area's nearest
+        vertex, or zero inside a polygon area
+        """
+        shape = np.shape(lat)
+        queries, points, distances = self.mining_areas.within(lat, lng, radius_km)
+        nearest = np.full((int(np.prod(shape)), len(self._mining_area_levels)), np.inf)
+        np.minimum.at(nearest, (queries, self._mining_area_of_point[points]), distances)
+        if self._mining_polygons:
+            flat_lat = np.asarray(lat, dtype=np.float64).reshape(-1)
+            flat_lng = np.broadcast_to(np.asarray(lng, dtype=np.float64), shape).reshape(-1)
+            for area, polygon_lats, polygon_lngs in self._mining_polygons:
+                nearest[_point_in_polygon(flat_lat, flat_lng, polygon_lats, polygon_lngs), area] = 0.0
+        influence = np.where(np.isfinite(nearest), self._mining_area_levels * (1 - nearest / radius_km), 0.0)
+        return influence.sum(axis=1).reshape(shape)
+
+    def info(self) -> Dict:
+        return {
+            'source': self.source,
+            'checksum': self.checksum,
+            'indexes': {
+                name: {'points': len(index), 'backend': index.backend}
+                for name, index in (('coastline', self.coastline), ('urban_centers', self.urban_centers),
+                                    ('mining_areas', self.mining_areas), ('major_cities', self.major_cities))
+            }
+        }
+
+
+def _read_csv(path: str):
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def load_geo_reference(directory: str = DEFAULT_GEO_DIR) -> GeoReference:
+    """Build every index from the CSV files in directory, using built-in points for missing files"""
+    def rows(filename, default):
+        path = os.path.join(directory, filename) if directory else None
+        if path and os.path.isfile(path):
+            return _read_csv(path), path
+        return default, None
+
+    sources = []
+
+    coastline, path = rows('coastline.csv', [{'lat': lat, 'lng': lng} for lat, lng in DEFAULT_COASTLINE])
+    sources.append(path)
+    coastline_index = SpatialIndex([r['lat'] for r in coastline], [r['lng'] for r in coastline])
+
+    urban, path = rows('urban_centers.csv', [
+        {'lat': lat, 'lng': lng, 'radius_km': radius, 'name': name} for lat, lng, radius, name in DEFAULT_URBAN_CENTERS
+    ])
+    sources.append(path)
+    urban_index = SpatialIndex(
+        [r['lat'] for r in urban], [r['lng'] for r in urban],
+        radius_km=np.array([float(r['radius_km']) for r in urban]), name=[r.get('name', '') for r in urban]
+    )
+
+    mining, path = rows('mining_areas.csv', [
+        {'area': area, 'lat': lat, 'lng': lng, 'risk_level': level} for area, lat, lng, level in DEFAULT_MINING_AREAS
+    ])
+    sources.append(path)
+    mining_index = SpatialIndex(
+        [r['lat'] for r in mining], [r['lng'] for r in mining],
+        area=[str(r['area']) for r in mining], risk_level=np.array([float(r['risk_level']) for r in mining])
+    )
+
+    cities, path = rows('major_cities.csv', [{'lat': lat, 'lng': lng, 'name': name} for lat, lng, name in DEFAULT_MAJOR_CITIES])
+    sources.append(path)
+    cities_index = SpatialIndex([r['lat'] for r in cities], [r['lng'] for r in cities], name=[r.get('name', '') for r in cities])
+
+    loaded = [path for path in sources if path]
+    return GeoReference(coastline_index, urban_index, mining_index, cities_index,
+                        source=', '.join(loaded) if loaded else 'built-in')
+
+
+_geo_reference = None
+_geo_reference_lock = threading.Lock()
+
+
+def get_geo_reference() -> GeoReference:
+    """Process-wide GeoReference, built from GEO_REFERENCE_DIR on first use"""
+    global _geo_reference
+    with _geo_reference_lock:
+        if _geo_reference is None:
+            _geo_reference = load_geo_reference(os.getenv('GEO_REFERENCE_DIR', DEFAULT_GEO_DIR))
+        return _geo_reference
@@ -0,0 +1,188 @@
+"""
+Versioned model weight store for XNode valuation workers
+Each version is a directory of flat .npy files, one per ensemble member, that
+every worker and cluster process memory-maps read-only
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import numpy as np
+from typing import Dict, List, Any, Optional, Tuple
+
+CURRENT_FILE = 'CURRENT'
+MANIFEST_FILE = 'manifest.json'
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_text_atomic(path: str, text: str):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class WeightStore:
+    """Loads, generates and hot-swaps versioned weight sets for a fixed layer layout"""
+
+    def __init__(self, root: str, architecture: str, layout: List[Tuple[str, tuple]],
+                 members: int = 3, seed: int = 0):
+        self.root = root
+        self.architecture = architecture
+        self.layout = [(name, tuple(shape)) for name, shape in layout]
+        self.members = members
+        self.seed = seed
+        self._lock = threading.RLock()
+        self._manifest = None
+        self._loaded = {}  # member -> (weights, checksum)
+
+    @property
+    def manifest(self) -> Dict[str, Any]:
+        """Manifest of the active version, creating the initial version on first use"""
+        with self._lock:
+            if self._manifest is None:
+                self._manifest = self._read_active_manifest()
+            return self._manifest
+
+    @property
+    def version(self) -> str:
+        return self.manifest['version']
+
+    @property
+    def checksum(self) -> str:
+        """Checksum of the whole active version, derived from its member checksums"""
+        digest = hashlib.sha256(self.architecture.encode())
+        for member in self.manifest['members']:
+            digest.update(member['sha256'].encode())
+        return digest.hexdigest()
+
+    def load(self, member: int) -> Tuple[Dict[str, np.ndarray], str]:
+        """Read-only weight views for one ensemble member plus that member's checksum"""
+        manifest = self.manifest
+        with self._lock:
+            if member not in self._loaded:
+                entry = manifest['members'][member % len(manifest['members'])]
+                flat = np.load(os.path.join(self.root, manifest['version'], entry['file']), mmap_mode='r')
+                weights, offset = {}, 0
+                for name, shape in self.layout:
+                    size = int(np.prod(shape))
+                    weights[name] = np.asarray(flat[offset:offset + size]).reshape(shape)
+                    offset += size
+                self._loaded[member] = (weights, entry['sha256'])
+            return self._loaded[member]
+
+    def reload(self, version: Optional[str] = None) -> Dict[str, Any]:
+        """Activate a version (or re-read CURRENT) and drop every loaded member"""
+        with self._lock:
+            if version is not None:
+                self._read_manifest(version)
+                _write_text_atomic(os.path.join(self.root, CURRENT_FILE), version)
+            self._manifest = self._read_active_manifest()
+            self._loaded = {}
+            return self._manifest
+
+    def publish(self, version: str, member_weights: List[Dict[str, np.ndarray]],
+                activate: bool = True) -> Dict[str, Any]:
+        """Write a new weight version; an existing version of the same name is left untouched"""
+        os.makedirs(self.root, exist_ok=True)
+        version_dir = os.path.join(self.root, version)
+        if not os.path.isdir(version_dir):
+            # Build in a private directory and rename so concurrent writers never see a partial version
+            tmp_dir = os.path.join(self.root, f".{version}.{os.getpid()}.tmp")
+            os.makedirs(tmp_dir, exist_ok=True)
+            members = []
+            for index, weights in enumerate(member_weights):
+                flat = np.concatenate([
+                    np.asarray(weights[name], dtype=np.float64).reshape(-1) for name, _ in self.layout
+                ])
+                filename = f"member_{index}.npy"
+                path = os.path.join(tmp_dir, filename)
+                np.save(path, flat)
+                members.append({'file': filename, 'sha256': _sha256_file(path)})
+
+            manifest = {
+                'version': version,
+                'architecture': self.architecture,
+                'layout': [[name, list(shape)] for name, shape in self.layout],
+                'seed': self.seed,
+                'members': members,
+                'created_at': time.time()
+            }
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+            try:
+                os.rename(tmp_dir, version_dir)
+            except OSError:
+                # Another process published the same version first
+                for name in os.listdir(tmp_dir):
+                    os.remove(os.path.join(tmp_dir, name))
+                os.rmdir(tmp_dir)
+
+        if activate:
+            return self.reload(version)
+        return self._read_manifest(version)
+
+    def generate(self, seed: Optional[int] = None) -> List[Dict[str, np.ndarray]]:
+        """Deterministic N(0, 0.1) weights for every ensemble member"""
+        seed = self.seed if seed is None else seed
+        member_weights = []
+        for member in range(self.members):
+            rng = np.random.default_rng([seed, member])
+            member_weights.append({name: rng.normal(0, 0.1, shape) for name, shape in self.layout})
+        return member_weights
+
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if os.path.isfile(os.path.join(self.root, name, MANIFEST_FILE))
+        )
+
+    def info(self) -> Dict[str, Any]:
+        manifest = self.manifest
+        return {
+            'root': self.root,
+            'architecture': self.architecture,
+            'active_version': manifest['version'],
+            'checksum': self.checksum,
+            'members': manifest['members'],
+            'available_versions': self.versions(),
+            'created_at': manifest.get('created_at')
+        }
+
+    def _read_manifest(self, version: str) -> Dict[str, Any]:
+        path = os.path.join(self.root, version, MANIFEST_FILE)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Weight version not found: {version}")
+        with open(path) as f:
+            manifest = json.load(f)
+
+        if manifest.get('architecture') != self.architecture:
+            raise ValueError(f"Weight version {version} is for {manifest.get('architecture')}, expected {self.architecture}")
+        for member in manifest['members']:
+            if _sha256_file(os.path.join(self.root, version, member['file'])) != member['sha256']:
+                raise ValueError(f"Checksum mismatch for {version}/{member['file']}")
+        return manifest
+
+    def _read_active_manifest(self) -> Dict[str, Any]:
+        current_path = os.path.join(self.root, CURRENT_FILE)
+        if os.path.isfile(current_path):
+            with open(current_path) as f:
+                return self._read_manifest(f.read().strip())
+
+        # First boot: persist a seeded initial version so every process and restart agrees
+        version = 'v1'
+        if version not in self.versions():
+            self.publish(version, self.generate(), activate=False)
+        _write_text_atomic(current_path, version)
+        return self._read_manifest(version)
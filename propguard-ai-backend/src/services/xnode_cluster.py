@@ -0,0 +1,173 @@
+"""
+XNode process cluster
+Hosts ValuationWorker and RiskWorker instances in dedicated OS processes so
+consensus valuation, feature engineering included, can use every core instead
+of sharing the Flask GIL. Each process runs src.services.xnode_process, which
+imports the worker module only, never the routes and their initialisation
+"""
+
+import os
+import sys
+import json
+import atexit
+import threading
+import time
+import subprocess
+import multiprocessing
+import numpy as np
+from typing import Dict, List, Any, Tuple
+
+# Directory holding the src package, put on the worker processes' import path
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def pack_array(array) -> Tuple[tuple, str, bytes]:
+    """Pack an ndarray as (shape, dtype, raw buffer) for IPC"""
+    array = np.ascontiguousarray(array)
+    return array.shape, array.dtype.str, array.tobytes()
+
+
+def unpack_array(packed) -> np.ndarray:
+    """Rebuild an ndarray from pack_array output"""
+    shape, dtype, buffer = packed
+    return np.frombuffer(buffer, dtype=np.dtype(dtype)).reshape(shape)
+
+
+class _ProcessSlot:
+    """One OS process and the pipe, lock and counters used to talk to it"""
+
+    def __init__(self, index: int, specs: List[Dict[str, Any]]):
+        self.index = index
+        self.specs = specs
+        self.lock = threading.Lock()
+        self.counter_lock = threading.Lock()
+        self.queue_depth = 0
+        self.restarts = 0
+        self.requests_served = 0
+        self.last_error = None
+        self.process = None
+        self.conn = None
+        self.start()
+
+    def start(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [PACKAGE_ROOT, env.get('PYTHONPATH')]))
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'src.services.xnode_process', str(child_conn.fileno()), json.dumps(self.specs)],
+            pass_fds=(child_conn.fileno(),),
+            env=env
+        )
+        child_conn.close()
+        self.conn = parent_conn
+
+    def is_alive(self) -> bool:
+        return self.process.poll() is None
+
+    def join(self, timeout: float):
+        """Wait up to timeout seconds for the process to exit, killing it if it does not"""
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def restart(self, reason: str):
+        self.last_error = reason
+        self.restarts += 1
+        print(f"XNode process {self.index} restarting: {reason}")
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        if self.is_alive():
+            self.process.kill()
+        self.join(timeout=5)
+        self.start()
+
+    def node_ids(self) -> List[str]:
+        return [spec['node_id'] for spec in self.specs]
+
+
+class XNodeProcessCluster:
+    """Pool of worker processes, each hosting a fixed subset of the XNode workers"""
+
+    def __init__(self, pool_size: int, specs: List[Dict[str, Any]], call_timeout: float = 30.0):
+        self.pool_size = max(1, min(pool_size, len(specs)))
+        self.call_timeout = call_timeout
+        # Round-robin worker assignment so each process carries a similar load
+        assignments = [specs[i::self.pool_size] for i in range(self.pool_size)]
+        self._slots = [_ProcessSlot(i, assigned) for i, assigned in enumerate(assignments)]
+        self._slot_by_node = {node_id: slot for slot in self._slots for node_id in slot.node_ids()}
+        atexit.register(self.shutdown)
+
+    def call(self, node_id: str, op: str, payload=None, **options):
+        """Send one request to the process hosting node_id and wait for its reply"""
+        slot = self._slot_by_node[node_id]
+        with slot.counter_lock:
+            slot.queue_depth += 1
+        try:
+            with slot.lock:
+                if not slot.is_alive():
+                    slot.restart(f"process exited with code {slot.process.returncode}")
+                try:
+                    slot.conn.send((op, node_id, payload, options))
+                    if not slot.conn.poll(self.call_timeout):
+                        slot.restart(f"no reply within {self.call_timeout}s")
+                        raise TimeoutError(f"XNode process {slot.index} timed out")
+                    ok, result, error = slot.conn.recv()
+                except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+                    slot.restart(f"pipe failure: {e}")
+                    raise RuntimeError(f"XNode process {slot.index} crashed") from e
+                slot.requests_served += 1
+        finally:
+            with slot.counter_lock:
+                slot.queue_depth -= 1
+
+        if not ok:
+            raise RuntimeError(error)
+        return result
+
+    def value_batch(self, node_id: str, items: List[Dict[str, Any]], batch_key: str = None,
+                    mode: str = None, mc_samples: int = None) -> List[Dict[str, Any]]:
+        """Build features for and value a batch on a valuation node's process, one result per item"""
+        return self.call(node_id, 'value_batch', items, batch_key=batch_key, mode=mode, mc_samples=mc_samples)
+
+    def assess_risk(self, node_id: str, coords: np.ndarray):
+        """Run a risk node over an (N x 2) lat/lng array in its process"""
+        packed, errors = self.call(node_id, 'risk', pack_array(np.asarray(coords, dtype=np.float64)))
+        return unpack_array(packed), errors
+
+    def reload_weights(self, node_id: str) -> str:
+        """Make a valuation node's process load the active weight version, returning its checksum"""
+        return self.call(node_id, 'reload_weights')
+
+    def is_node_alive(self, node_id: str) -> bool:
+        return self._slot_by_node[node_id].is_alive()
+
+    def health(self) -> List[Dict[str, Any]]:
+        """Per-process status, queue depth and restart counts"""
+        return [
+            {
+                'process_index': slot.index,
+                'pid': slot.process.pid,
+                'status': 'running' if slot.is_alive() else 'stopped',
+                'node_ids': slot.node_ids(),
+                'queue_depth': slot.queue_depth,
+                'restarts': slot.restarts,
+                'requests_served': slot.requests_served,
+                'last_error': slot.last_error
+            }
+            for slot in self._slots
+        ]
+
+    def shutdown(self):
+        """Stop every worker process"""
+        for slot in self._slots:
+            try:
+                slot.conn.send(('stop', None, None, {}))
+            except (OSError, ValueError):
+                pass
+        deadline = time.time() + 5
+        for slot in self._slots:
+            slot.join(timeout=max(0.1, deadline - time.time()))
@@ -0,0 +1,103 @@
+"""
+Entrypoint of one XNode cluster process
+XNodeProcessCluster starts this module with python -m rather than through
+multiprocessing, whose spawn children re-import the parent's __main__ (and with
+it every Flask route). A process only loads the worker module, builds its
+workers and serves requests over the connection it inherited
+
+Usage: python -m src.services.xnode_process <connection fd> <worker specs JSON>
+"""
+
+import os
+import json
+import asyncio
+import argparse
+import numpy as np
+from collections import OrderedDict
+from multiprocessing.connection import Connection
+from typing import Dict, List, Any
+
+from src.services.xnode_cluster import pack_array, unpack_array
+from src.services.xnode_workers import ValuationWorker, RiskWorker, RISK_COLUMNS, get_weight_store
+
+# Prepared batches a process keeps so the valuation workers it hosts build each batch's features once
+PREPARED_BATCHES_PER_PROCESS = 4
+
+
+def serve(conn, specs: List[Dict[str, Any]]):
+    """Build the assigned workers once, then answer requests until stopped or disconnected"""
+    loop = asyncio.new_event_loop()
+    prepared_batches = OrderedDict()
+    workers = {}
+    for spec in specs:
+        if spec['kind'] == 'valuation':
+            worker = ValuationWorker(spec['node_id'], dtype=spec['dtype'], member=spec['member'])
+        else:
+            worker = RiskWorker(spec['node_id'])
+        worker.initialized = True
+        workers[spec['node_id']] = worker
+
+    while True:
+        try:
+            op, node_id, payload, options = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        if op == 'stop':
+            break
+
+        try:
+            if op == 'ping':
+                result = os.getpid()
+            elif op == 'value_batch':
+                result = _value_batch(loop, workers[node_id], prepared_batches, payload, **options)
+            elif op == 'reload_weights':
+                get_weight_store().reload()
+                result = workers[node_id].reload_weights()
+            elif op == 'risk':
+                result = _assess_risk_rows(loop, workers[node_id], unpack_array(payload))
+            else:
+                raise ValueError(f"Unknown op: {op}")
+            conn.send((True, result, None))
+        except Exception as e:
+            conn.send((False, None, str(e)))
+
+    conn.close()
+    loop.close()
+
+
+def _value_batch(loop, worker, prepared_batches, items, batch_key=None, mode=None, mc_samples=None):
+    """Value a batch end to end, sharing one PreparedBatch between the workers that receive the same batch_key"""
+    prepared = prepared_batches.get(batch_key) if batch_key is not None else None
+    if prepared is None:
+        prepared = worker.prepare_batch(items)
+        if batch_key is not None:
+            prepared_batches[batch_key] = prepared
+            while len(prepared_batches) > PREPARED_BATCHES_PER_PROCESS:
+                prepared_batches.popitem(last=False)
+    return loop.run_until_complete(worker.calculate_batch(items, prepared, mode, mc_samples))
+
+
+def _assess_risk_rows(loop, worker, coords: np.ndarray):
+    """Assess an (N x 2) lat/lng array, returning packed (N x 8) rows and per-row errors"""
+    try:
+        return pack_array(loop.run_until_complete(worker.assess_climate_risk_batch(coords))), {}
+    except Exception as e:
+        # Same fallback a single failed assessment reports, applied to every row
+        fallback = worker._get_fallback_risks(None, None)
+        rows = np.empty((len(coords), len(RISK_COLUMNS) + 1), dtype=np.float64)
+        rows[:, :-1] = [fallback[column] for column in RISK_COLUMNS]
+        rows[:, -1] = 0.3
+        return pack_array(rows), {i: str(e) for i in range(len(coords))}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve XNode workers for an XNodeProcessCluster")
+    parser.add_argument('fd', type=int, help="Inherited file descriptor of the cluster connection")
+    parser.add_argument('specs', help="JSON list of worker specs, as produced by worker_spec")
+    args = parser.parse_args(argv)
+    serve(Connection(args.fd), json.loads(args.specs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,837 @@
+"""
+XNode valuation and risk workers
+Shared by the Flask routes and the XNode cluster processes, so importing this
+module does no route-level setup: the weight store, feature store and risk
+grid are opened on first use, once per process
+"""
+
+import hashlib
+import math
+import os
+import random
+import threading
+import time
+import numpy as np
+from datetime import datetime
+from functools import lru_cache
+from typing import Optional
+from src.services.cache import LRUCache, canonical_hash
+from src.services.weight_store import WeightStore
+from src.services.feature_store import FeatureStore
+from src.services.risk_grid import RiskGrid, load_risk_grid, DEFAULT_RESOLUTION
+from src.services.spatial_index import get_geo_reference, DEGREE_KM
+from src.services.risk_cache import RiskCache, risk_noise
+
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database')
+# Persisted weights are memory-mapped read-only and shared by every worker and cluster process
+WEIGHTS_DIR = os.getenv('XNODE_WEIGHTS_DIR', os.path.join(DATABASE_DIR, 'xnode_weights'))
+# Per-property feature vectors persisted across requests; set XNODE_FEATURE_STORE='' to disable
+FEATURE_STORE_PATH = os.getenv('XNODE_FEATURE_STORE', os.path.join(DATABASE_DIR, 'xnode_features.db'))
+# Precomputed climate-risk raster; build it with python -m src.services.risk_grid
+RISK_GRID_PATH = os.getenv('XNODE_RISK_GRID', os.path.join(DATABASE_DIR, 'risk_grid.npy'))
+RISK_GRID_RESOLUTION = float(os.getenv('XNODE_RISK_GRID_RESOLUTION', str(DEFAULT_RESOLUTION)))
+# Dropout passes per property in 'mc_dropout' mode
+MC_DROPOUT_SAMPLES = int(os.getenv('XNODE_MC_SAMPLES', '32'))
+# Risk columns of an assessment row, followed by the worker confidence
+RISK_COLUMNS = ['flood', 'fire', 'coastal', 'subsidence', 'cyclone', 'heatwave', 'composite']
+# Single-point assessments memoised per geohash cell; shared by every risk worker in this process
+climate_risk_cache = RiskCache('xnode')
+
+class XNodeWorker:
+    """Base XNode worker class for distributed computation"""
+    
+    def __init__(self, node_id: str = None):
+        self.node_id = node_id or f"node_{random.randint(1000, 9999)}"
+        self.initialized = False
+        self.computation_cache = LRUCache(
+            max_entries=int(os.getenv('XNODE_CACHE_MAX_ENTRIES', '10000')),
+            ttl_seconds=float(os.getenv('XNODE_CACHE_TTL', '86400')),
+            max_bytes=int(os.getenv('XNODE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+        )
+        self.consensus_threshold = 0.75
+        
+    async def initialize(self):
+        """Initialize the worker"""
+        self.initialized = True
+        print(f"XNode Worker {self.node_id} initialized")
+
+class PreparedBatch:
+    """Valuation inputs plus their content hashes and lazily built, shared feature rows"""
+    
+    STABLE_FIELDS = (('property_data', dict), ('comparables', list), ('risk_data', dict))
+    
+    def __init__(self, items, worker, store=None):
+        self.items = items
+        self.errors = {}
+        self._worker = worker
+        self._store = store
+        self._features = {}
+        self._lock = threading.Lock()
+        
+        # Persisted vectors are fetched in one query for every item that carries a property_id
+        property_ids = [item['property_id'] for item in items if item.get('property_id') is not None]
+        self._records = store.get_many(property_ids) if store is not None and property_ids else {}
+        
+        # Inputs hash in two parts so a market move can reuse the property-specific features
+        self.stable_hashes, self.market_hashes, self.content_hashes = [], [], []
+        for i, item in enumerate(items):
+            market_hash = canonical_hash(item.get('market_factors', {}))
+            if 'property_data' in item:
+                stable_hash = canonical_hash(*(item.get(field, default()) for field, default in self.STABLE_FIELDS))
+            else:
+                record = self._records.get(str(item.get('property_id')))
+                stable_hash = record.stable_hash if record else None
+                if record is None:
+                    self.errors[i] = f"Unknown property_id: {item.get('property_id')}"
+            self.stable_hashes.append(stable_hash)
+            self.market_hashes.append(market_hash)
+            self.content_hashes.append(canonical_hash(stable_hash or item.get('property_id'), market_hash))
+    
+    def missing_from_store(self, indices):
+        """Items with property_data and a property_id whose current vector is not yet in the store"""
+        if self._store is None:
+            return []
+        missing = []
+        for i in indices:
+            item = self.items[i]
+            if item.get('property_id') is None or 'property_data' not in item or i in self._features or i in self.errors:
+                continue
+            record = self._records.get(str(item['property_id']))
+            if record is None or record.stable_hash != self.stable_hashes[i] or record.market_hash != self.market_hashes[i]:
+                missing.append(i)
+        return missing
+    
+    def features_for(self, indices):
+        """Feature matrix for the given items, building any rows not yet computed"""
+        with self._lock:
+            writes = []
+            for i in indices:
+                if i in self._features or i in self.errors:
+                    continue
+                try:
+                    self._features[i] = self._build(i, writes)
+                except Exception as e:
+                    self.errors[i] = str(e)
+            
+            if writes and self._store is not None:
+                try:
+                    self._store.put_many(writes)
+                except Exception as e:
+                    print(f"Feature store write failed: {e}")
+        
+        rows = [i for i in indices if i in self._features]
+        return np.asarray([self._features[i] for i in rows], dtype=np.float64).reshape(len(rows), 50), rows
+    
+    def _build(self, i, writes):
+        """Stored vector if still current, a market-only refresh of it, or a full feature build"""
+        item = self.items[i]
+        property_id = item.get('property_id')
+        market_factors = item.get('market_factors', {})
+        record = self._records.get(str(property_id)) if property_id is not None else None
+        
+        if record is not None and record.stable_hash == self.stable_hashes[i]:
+            if record.market_hash == self.market_hashes[i]:
+                return record.features
+            features = self._worker._apply_market_features(record.features.tolist(), market_factors)
+            self._store.count(market_refreshes=1)
+        else:
+            features = self._worker._prepare_features(
+                item['property_data'], item.get('comparables', []), item.get('risk_data', {}), market_factors
+            )
+            if self._store is not None:
+                self._store.count(full_builds=1)
+        
+        if property_id is not None:
+            writes.append((property_id, self.stable_hashes[i], self.market_hashes[i], features))
+        return features
+
+# Sales within this many days count as recent comparables
+RECENT_SALE_DAYS = 180
+
+@lru_cache(maxsize=65536)
+def _parse_sale_date(sale_date):
+    """Day ordinal of a YYYY-MM-DD sale date, or None if missing or malformed"""
+    if not sale_date or not isinstance(sale_date, str):
+        return None
+    try:
+        return datetime.strptime(sale_date, '%Y-%m-%d').toordinal()
+    except ValueError:
+        return None
+
+class ComparablesSummary:
+    """Every comparable-sales statistic used by the valuation features, gathered in one pass"""
+    
+    DEFAULT_PRICE = 800000
+    
+    def __init__(self, property_data, comparables):
+        prop_size = property_data.get('floor_area', 150)
+        prop_age = 2024 - property_data.get('year_built', 2000)
+        prop_type = property_data.get('property_type', 'House')
+        today = datetime.now().toordinal()
+        
+        prices = []
+        recent = type_matches = 0
+        size_total = age_total = market_total = quality_total = 0.0
+        
+        for comp in comparables:
+            price = comp.get('price', 0)
+            if price > 0:
+                prices.append(price)
+            
+            sale_day = _parse_sale_date(comp.get('sale_date', ''))
+            is_recent = sale_day is not None and today - sale_day < RECENT_SALE_DAYS
+            recent += is_recent
+            
+            comp_size = comp.get('floor_area', 150)
+            size_total += max(0, 1 - abs(prop_size - comp_size) / max(prop_size, comp_size))
+            age_total += max(0, 1 - abs(prop_age - (2024 - comp.get('year_built', 2000))) / 50)  # 50 year max difference
+            type_matches += comp.get('property_type') == prop_type
+            # Faster sale = better
+            market_total += 1 - min(1.0, comp.get('days_on_market', 45) / 100)
+            
+            score = 0.5
+            if is_recent:
+                score += 0.2
+            if comp.get('bedrooms') and comp.get('bathrooms') and price:
+                score += 0.2
+            if 200000 <= price <= 5000000:
+                score += 0.1
+            quality_total += min(1.0, score)
+        
+        count = len(comparables)
+        self.count = count
+        self.priced_count = len(prices)
+        self.recent_count = recent
+        
+        if prices:
+            mean_price = sum(prices) / len(prices)
+            prices.sort()
+            n = len(prices)
+            self.average_price = mean_price
+            self.median_price = prices[n // 2] if n % 2 == 1 else (prices[n // 2 - 1] + prices[n // 2]) / 2
+        else:
+            mean_price = None
+            self.average_price = self.median_price = self.DEFAULT_PRICE
+        
+        if count >= 2 and len(prices) >= 2:
+            variance = sum((p - mean_price) ** 2 for p in prices) / len(prices)
+            self.price_variance = min(1.0, variance / (mean_price ** 2))
+        else:
+            self.price_variance = 0.5
+        
+        self.size_similarity = size_total / count if count else 0.5
+        self.age_similarity = age_total / count if count else 0.5
+        self.type_match = type_matches / count if count else 0.5
+        self.market_time = market_total / count if count else 0.5
+        self.quality_score = quality_total / count if count else 0.5
+        # Mock distance factor; a real implementation would use comparable coordinates
+        self.distance_factor = 0.8 if count > 3 else 0.6
+
+class ValuationWorker(XNodeWorker):
+    """Distributed property valuation worker"""
+    
+    # Layer order of the 50 -> 64 -> 32 -> 16 -> 1 network
+    LAYERS = [('layer1', 'bias1'), ('layer2', 'bias2'), ('layer3', 'bias3'), ('output', 'output_bias')]
+    LAYER_SHAPES = [
+        ('layer1', (50, 64)),
+        ('bias1', (64,)),
+        ('layer2', (64, 32)),
+        ('bias2', (32,)),
+        ('layer3', (32, 16)),
+        ('bias3', (16,)),
+        ('output', (16, 1)),
+        ('output_bias', (1,))
+    ]
+    ARCHITECTURE = 'mlp-50-64-32-16-1'
+    # Dropout follows the first two hidden layers; it is not inverted, so training sees 80% of each activation
+    DROPOUT_RATE = 0.2
+    DROPOUT_LAYERS = 2
+    # 'inference' is deterministic, 'train' applies dropout, 'mc_dropout' samples K dropout passes
+    MODES = ('inference', 'train', 'mc_dropout')
+    
+    def __init__(self, node_id: str = None, dtype=np.float64, member: int = 0, mode: str = 'inference'):
+        super().__init__(node_id)
+        self.dtype = np.dtype(dtype)
+        self.member = member
+        self.set_mode(mode)
+        self.set_model_weights(*self._initialize_model_weights())
+    
+    def set_mode(self, mode):
+        """Select the default forward pass used when a request does not ask for one"""
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown inference mode: {mode}")
+        self.mode = mode
+    
+    def set_model_weights(self, weights, checksum=None):
+        """Swap in new weights, bump the model version and drop results computed with the old ones"""
+        if checksum is None:
+            digest = hashlib.sha256()
+            for name in sorted(weights):
+                digest.update(name.encode())
+                digest.update(np.ascontiguousarray(weights[name], dtype=np.float64).tobytes())
+            checksum = digest.hexdigest()
+        self.model_weights = weights
+        # Inference folds the expected dropout keep rate into the layers that consume dropped activations
+        keep = 1.0 - self.DROPOUT_RATE
+        self.inference_weights = dict(weights)
+        for weight_name, _ in self.LAYERS[1:self.DROPOUT_LAYERS + 1]:
+            self.inference_weights[weight_name] = np.ascontiguousarray(weights[weight_name] * keep, dtype=self.dtype)
+        self.weights_checksum = checksum
+        self.model_version = f"{self.ARCHITECTURE}:{checksum[:16]}"
+        self.computation_cache.clear()
+    
+    def reload_weights(self):
+        """Pick up the weight store's active version"""
+        self.set_model_weights(*self._initialize_model_weights())
+        return self.weights_checksum
+        
+    def _initialize_model_weights(self):
+        """This worker's ensemble member from the shared weight store, as (in, out) ndarrays"""
+        weights, checksum = get_weight_store().load(self.member)
+        if self.dtype != np.float64:
+            # Reduced precision needs a private copy; float64 workers share the read-only mapping
+            weights = {name: np.ascontiguousarray(w, dtype=self.dtype) for name, w in weights.items()}
+        return weights, checksum
+    
+    async def calculate_valuation(self, property_data, comparables, risk_data, market_factors):
+        """Distributed valuation calculation"""
+        try:
+            # Prepare features for neural network
+            features = self._prepare_features(property_data, comparables, risk_data, market_factors)
+            
+            # Run through mock neural network
+            valuation = self._forward_pass(features, self.mode if self.mode != 'mc_dropout' else 'inference')
+            
+            # Apply risk adjustments
+            risk_adjustment = self._calculate_risk_adjustment(risk_data)
+            final_valuation = valuation * risk_adjustment
+            
+            # Calculate confidence
+            confidence = self._calculate_confidence(property_data, comparables, risk_data)
+            
+            return {
+                'value': int(final_valuation),
+                'confidence': confidence,
+                'methodology': ['XNode Distributed Neural Network', 'Risk-Adjusted Valuation'],
+                'node_id': self.node_id,
+                'computation_time': time.time()
+            }
+            
+        except Exception as e:
+            print(f"Valuation error on node {self.node_id}: {e}")
+            return {
+                'value': 0,
+                'confidence': 0,
+                'error': str(e),
+                'node_id': self.node_id
+            }
+    
+    def prepare_batch(self, items):
+        """Wrap a batch so its feature rows are built at most once and shared by every worker"""
+        return PreparedBatch(items, self, get_feature_store())
+    
+    def _cache_key(self, content_hash):
+        return f"{content_hash}:{self.model_version}"
+    
+    async def calculate_batch(self, items, prepared=None, mode=None, mc_samples=None):
+        """Distributed valuation of many properties in a single forward pass"""
+        if prepared is None:
+            prepared = PreparedBatch(items, self, get_feature_store())
+        mode = mode or self.mode
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown inference mode: {mode}")
+        # Only the deterministic path is reproducible enough to cache
+        use_cache = mode == 'inference'
+        
+        # Repeat inputs are served from the cache without feature engineering or inference
+        results = [None] * len(items)
+        pending = []
+        for i, content_hash in enumerate(prepared.content_hashes):
+            cached = self.computation_cache.get(self._cache_key(content_hash)) if use_cache else None
+            if cached is not None:
+                results[i] = dict(cached, cached=True)
+            else:
+                pending.append(i)
+        
+        # A cache hit skips feature building, so write its vector through to the store here;
+        # otherwise a later request by property_id alone would not find it
+        cached_hits = [i for i, result in enumerate(results) if result is not None]
+        unstored = prepared.missing_from_store(cached_hits)
+        if unstored:
+            prepared.features_for(unstored)
+        
+        if not pending:
+            return results
+        
+        features, rows = prepared.features_for(pending)
+        for i in pending:
+            if i in prepared.errors:
+                results[i] = {'value': 0, 'confidence': 0, 'error': prepared.errors[i], 'node_id': self.node_id}
+        
+        if rows:
+            try:
+                if mode == 'mc_dropout':
+                    samples = self._forward_pass_samples(features, mc_samples or MC_DROPOUT_SAMPLES)
+                    valuations = samples.mean(axis=0)
+                    lower, upper = np.percentile(samples, [5, 95], axis=0)
+                    spread = samples.std(axis=0)
+                else:
+                    valuations = self._forward_pass_batch(features, mode)
+            except Exception as e:
+                print(f"Valuation error on node {self.node_id}: {e}")
+                for i in rows:
+                    results[i] = {'value': 0, 'confidence': 0, 'error': str(e), 'node_id': self.node_id}
+                return results
+            
+            computation_time = time.time()
+            for row, (i, valuation) in enumerate(zip(rows, valuations)):
+                item = items[i]
+                try:
+                    # Items valued from a stored vector alone carry their composite risk in feature 16
+                    risk_data = item.get('risk_data')
+                    if risk_data is None:
+                        risk_data = {'composite': float(features[row, 16])}
+                    risk_adjustment = self._calculate_risk_adjustment(risk_data)
+                    value = valuation * risk_adjustment
+                    if mode == 'mc_dropout':
+                        # Predictive spread across dropout samples replaces the data-completeness heuristic
+                        confidence = max(0.3, min(0.95, 1.0 - (upper[row] - lower[row]) / max(value, 1.0)))
+                    else:
+                        confidence = self._calculate_confidence(item.get('property_data', {}), item.get('comparables', []), risk_data)
+                    results[i] = {
+                        'value': int(value),
+                        'confidence': float(confidence),
+                        'methodology': ['XNode Distributed Neural Network', 'Risk-Adjusted Valuation'],
+                        'node_id': self.node_id,
+                        'inference_mode': mode,
+                        'model_version': self.model_version,
+                        'weights_checksum': self.weights_checksum,
+                        'computation_time': computation_time
+                    }
+                    if mode == 'mc_dropout':
+                        results[i]['prediction_interval'] = {
+                            'lower': int(lower[row] * risk_adjustment),
+                            'upper': int(upper[row] * risk_adjustment),
+                            'level': 0.9
+                        }
+                        results[i]['prediction_std'] = float(spread[row] * risk_adjustment)
+                        results[i]['mc_samples'] = int(len(samples))
+                    if use_cache:
+                        self.computation_cache.put(self._cache_key(prepared.content_hashes[i]), results[i])
+                except Exception as e:
+                    results[i] = {'value': 0, 'confidence': 0, 'error': str(e), 'node_id': self.node_id}
+        
+        return results
+    
+    def _prepare_features(self, property_data, comparables, risk_data, market_factors):
+        """Prepare 50-dimensional feature vector using pure Python"""
+        features = [0.0] * 50
+        
+        # Property features (0-9)
+        features[0] = property_data.get('bedrooms', 3) / 5.0
+        features[1] = property_data.get('bathrooms', 2) / 3.0
+        features[2] = property_data.get('land_size', 600) / 1000.0
+        features[3] = property_data.get('floor_area', 150) / 200.0
+        features[4] = min((2024 - property_data.get('year_built', 2000)) / 50.0, 1.0)
+        features[5] = 1.0 if property_data.get('property_type') == 'House' else 0.0
+        summary = ComparablesSummary(property_data, comparables)
+        features[6] = len(comparables) / 10.0
+        features[7] = summary.average_price / 1000000.0
+        features[8] = self._get_location_score(property_data.get('address', ''))
+        features[9] = property_data.get('last_sale_price', 800000) / 1000000.0
+        
+        # Risk features (10-19)
+        features[10] = risk_data.get('flood', 0.3)
+        features[11] = risk_data.get('fire', 0.3)
+        features[12] = risk_data.get('coastal_erosion', 0.1)
+        features[13] = risk_data.get('subsidence', 0.1)
+        features[14] = risk_data.get('cyclone', 0.1)
+        features[15] = risk_data.get('heatwave', 0.2)
+        features[16] = risk_data.get('composite', 0.25)
+        features[17] = 1.0 - risk_data.get('composite', 0.25)  # Risk inverse
+        features[18] = min(risk_data.get('flood', 0) + risk_data.get('fire', 0), 1.0)
+        features[19] = max(risk_data.get('coastal_erosion', 0), risk_data.get('subsidence', 0))
+        
+        # Comparable features (30-39)
+        features[30] = summary.recent_count / 5.0
+        features[31] = summary.price_variance
+        features[32] = summary.size_similarity
+        features[33] = summary.age_similarity
+        features[34] = summary.type_match
+        features[35] = min(summary.priced_count, 10) / 10.0
+        features[36] = summary.median_price / 1000000.0
+        features[37] = summary.distance_factor
+        features[38] = summary.market_time
+        features[39] = summary.quality_score
+        
+        return self._apply_market_features(features, market_factors)
+    
+    def _apply_market_features(self, features, market_factors):
+        """Fill the market slots (20-29) and the interaction slots (40-49), the only ones market moves change"""
+        # Market features (20-29)
+        features[20] = market_factors.get('interest_rates', 0.05) / 0.1
+        features[21] = market_factors.get('unemployment', 0.05) / 0.1
+        features[22] = market_factors.get('inflation', 0.03) / 0.1
+        features[23] = market_factors.get('population_growth', 0.02) / 0.05
+        features[24] = market_factors.get('market_sentiment', 0.7)
+        features[25] = market_factors.get('rental_yield', 0.035) / 0.1
+        features[26] = market_factors.get('auction_clearance', 0.7)
+        features[27] = market_factors.get('days_on_market', 45) / 100.0
+        features[28] = market_factors.get('price_growth', 0.05) / 0.2
+        features[29] = market_factors.get('volume_change', 0.1) / 0.5
+        
+        # Additional engineered features (40-49)
+        features[40] = features[0] * features[1]  # Bed-bath interaction
+        features[41] = features[2] * features[5]  # Land size * house type
+        features[42] = features[10] * features[11]  # Flood * fire risk
+        features[43] = features[20] * features[24]  # Interest rate * sentiment
+        features[44] = features[7] * features[16]  # Comparable price * risk
+        features[45] = math.sqrt(features[2] * features[3])  # Size composite
+        features[46] = (features[10] + features[11] + features[12]) / 3  # Climate risk avg
+        features[47] = (features[20] + features[21] + features[22]) / 3  # Economic factors avg
+        features[48] = features[6] * features[31]  # Comparable count * variance
+        features[49] = features[8] * features[24]  # Location * sentiment
+        
+        return features
+    
+    def _matrix_multiply(self, matrix, vector):
+        """Vector-matrix product (vector @ matrix) using pure Python"""
+        return [sum(v * w for v, w in zip(vector, column)) for column in zip(*matrix)]
+    
+    def _vector_add(self, vec1, vec2):
+        """Vector addition using pure Python"""
+        return [a + b for a, b in zip(vec1, vec2)]
+    
+    def _relu(self, vector):
+        """ReLU activation function"""
+        return [max(0, x) for x in vector]
+    
+    def _dropout(self, x, rate=0.2):
+        """Simulate dropout during training"""
+        return x * (np.random.random_sample(x.shape) > rate)
+    
+    def _forward_pass(self, features, mode='inference'):
+        """Forward pass through mock neural network as BLAS matmuls"""
+        x = np.asarray(features, dtype=self.dtype)[np.newaxis, :]
+        return float(self._forward_pass_batch(x, mode)[0])
+    
+    def _forward_pass_batch(self, feature_matrix, mode='inference'):
+        """Forward pass of an (N x 50) feature matrix, returns N valuations"""
+        if mode == 'train':
+            return self._scale_output(self._forward_logits(feature_matrix, self.model_weights, self.DROPOUT_RATE))
+        if mode != 'inference':
+            raise ValueError(f"Forward pass mode must be 'inference' or 'train', got {mode}")
+        return self._scale_output(self._forward_logits(feature_matrix, self.inference_weights, 0.0))
+    
+    def _forward_pass_samples(self, feature_matrix, samples):
+        """K Monte Carlo dropout passes stacked into one (K*N x 50) batch, returns a (K x N) array"""
+        x = np.asarray(feature_matrix, dtype=self.dtype)
+        stacked = np.tile(x, (samples, 1))
+        logits = self._forward_logits(stacked, self.model_weights, self.DROPOUT_RATE)
+        return self._scale_output(logits).reshape(samples, len(x))
+    
+    def _forward_logits(self, feature_matrix, weights, dropout_rate):
+        """Pre-sigmoid network output; dropout applies after the first DROPOUT_LAYERS hidden layers"""
+        x = np.asarray(feature_matrix, dtype=self.dtype)
+        last = len(self.LAYERS) - 1
+        
+        for i, (weight_name, bias_name) in enumerate(self.LAYERS):
+            x = x @ weights[weight_name] + weights[bias_name]
+            if i == last:
+                break
+            np.maximum(x, 0, out=x)
+            if dropout_rate and i < self.DROPOUT_LAYERS:
+                x = self._dropout(x, dropout_rate)
+        
+        return x[:, 0]
+    
+    def _forward_pass_reference(self, features, mode='inference'):
+        """Pure Python forward pass, kept as the parity/benchmark baseline"""
+        weights = {name: value.tolist() for name, value in self.model_weights.items()}
+        keep = 1.0 - self.DROPOUT_RATE
+        x = list(features)
+        last = len(self.LAYERS) - 1
+        
+        for i, (weight_name, bias_name) in enumerate(self.LAYERS):
+            x = self._matrix_multiply(weights[weight_name], x)
+            x = self._vector_add(x, weights[bias_name])
+            if i == last:
+                break
+            x = self._relu(x)
+            if i < self.DROPOUT_LAYERS:
+                if mode == 'train':
+                    x = [v if random.random() > self.DROPOUT_RATE else 0 for v in x]
+                else:
+                    x = [v * keep for v in x]
+        
+        return self._scale_output(x[0])
+    
+    def _scale_output(self, output):
+        """Apply sigmoid-like scaling to get reasonable property values"""
+        return 500000 + (1000000 * (1 / (1 + np.exp(-output))))
+    
+    
+    def _calculate_risk_adjustment(self, risk_data):
+        """Calculate risk adjustment multiplier"""
+        composite_risk = risk_data.get('composite', 0.25)
+        # Risk adjustment between 0.7 and 1.0
+        return max(0.7, 1.0 - (composite_risk * 0.3))
+    
+    def _calculate_confidence(self, property_data, comparables, risk_data):
+        """Calculate confidence score"""
+        confidence = 0.5  # Base confidence
+        
+        # More comparables = higher confidence
+        confidence += min(0.3, len(comparables) * 0.03)
+        
+        # Recent comparables boost confidence
+        recent_count = len([c for c in comparables if self._is_recent_sale(c.get('sale_date', ''))])
+        confidence += min(0.2, recent_count * 0.04)
+        
+        # Complete property data
+        if all(property_data.get(field) for field in ['bedrooms', 'bathrooms', 'land_size']):
+            confidence += 0.1
+        
+        # Lower risk = higher confidence
+        confidence += (1 - risk_data.get('composite', 0.25)) * 0.15
+        
+        return max(0.3, min(0.95, confidence))
+    
+    def _get_location_score(self, address):
+        """Get location premium score"""
+        premium_areas = ['sydney', 'melbourne', 'toorak', 'mosman', 'double bay', 'paddington']
+        address_lower = address.lower()
+        return 0.8 if any(area in address_lower for area in premium_areas) else 0.5
+    
+    def _is_recent_sale(self, sale_date):
+        """Check if sale is within last 6 months"""
+        sale_day = _parse_sale_date(sale_date)
+        return sale_day is not None and datetime.now().toordinal() - sale_day < RECENT_SALE_DAYS
+
+class RiskWorker(XNodeWorker):
+    """Distributed risk assessment worker"""
+    
+    async def assess_climate_risk(self, lat, lng):
+        """Distributed climate risk assessment"""
+        try:
+            assessment = climate_risk_cache.get_or_compute(lat, lng, self._assess_point)
+            
+            return {
+                'risks': dict(assessment['risks']),
+                'confidence': assessment['confidence'],
+                'data_source': 'xnode_distributed',
+                'node_id': self.node_id,
+                'computation_time': time.time()
+            }
+            
+        except Exception as e:
+            print(f"Risk assessment error on node {self.node_id}: {e}")
+            return {
+                'risks': self._get_fallback_risks(lat, lng),
+                'confidence': 0.3,
+                'data_source': 'fallback',
+                'node_id': self.node_id,
+                'error': str(e)
+            }
+    
+    def _assess_point(self, lat, lng):
+        """Risks and confidence at one point, from the precomputed raster when it covers the point"""
+        risk_grid = get_risk_grid()
+        if risk_grid is not None and risk_grid.covers(lat, lng):
+            layers = risk_grid.lookup(lat, lng)
+        else:
+            layers = self._risk_layers(lat, lng)
+        
+        risks = {name: float(layers[name]) for name in ('flood', 'coastal', 'subsidence', 'cyclone', 'heatwave')}
+        risks['fire'] = float(np.minimum(1.0, layers['fire_base'] + self._vegetation_factor(lat, lng) * 0.3))
+        risks['composite'] = self._calculate_composite_risk(risks)
+        return {'risks': risks, 'confidence': float(layers['confidence'])}
+    
+    async def assess_climate_risk_batch(self, coords):
+        """Assess an (N x 2) lat/lng array at once, returning (N x 8) RISK_COLUMNS + confidence rows"""
+        return self.risk_rows(coords)
+    
+    def risk_rows(self, coords):
+        """Vectorised assess_climate_risk: grid lookups where the grid covers a point, direct factors elsewhere"""
+        coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+        lat, lng = coords[:, 0], coords[:, 1]
+        
+        risk_grid = get_risk_grid()
+        if risk_grid is not None:
+            lat_min, lat_max, lng_min, lng_max = risk_grid.bounds
+            covered = (lat >= lat_min) & (lat <= lat_max) & (lng >= lng_min) & (lng <= lng_max)
+        else:
+            covered = np.zeros(len(coords), dtype=bool)
+        
+        if covered.all():
+            layers = risk_grid.lookup_many(lat, lng)
+        elif not covered.any():
+            layers = self._risk_layers(lat, lng)
+        else:
+            direct = self._risk_layers(lat, lng)
+            looked_up = risk_grid.lookup_many(lat[covered], lng[covered])
+            layers = {}
+            for name, values in direct.items():
+                values = np.array(np.broadcast_to(values, lat.shape), dtype=np.float64)
+                values[covered] = looked_up[name]
+                layers[name] = values
+        
+        risks = {name: layers[name] for name in ('flood', 'coastal', 'subsidence', 'cyclone', 'heatwave')}
+        risks['fire'] = np.minimum(1.0, layers['fire_base'] + self._vegetation_factor(lat, lng) * 0.3)
+        risks['composite'] = self._calculate_composite_risk(risks)
+        
+        rows = np.empty((len(coords), len(RISK_COLUMNS) + 1), dtype=np.float64)
+        for i, column in enumerate(RISK_COLUMNS):
+            rows[:, i] = risks[column]
+        rows[:, -1] = layers['confidence']
+        return rows
+    
+    def _risk_layers(self, lat, lng):
+        """Deterministic risk factors for scalar or equally shaped lat/lng arrays"""
+        distance = self._distance_from_coast(lat, lng)
+        return {
+            'flood': self._calculate_flood_risk(lat, lng, distance),
+            'fire_base': self._calculate_fire_base_risk(lat, lng, distance),
+            'coastal': self._calculate_coastal_risk(lat, lng, distance),
+            'subsidence': self._calculate_subsidence_risk(lat, lng),
+            'cyclone': self._calculate_cyclone_risk(lat),
+            'heatwave': self._calculate_heatwave_risk(lat, lng, distance),
+            'confidence': self._calculate_risk_confidence(lat, lng)
+        }
+    
+    def _calculate_flood_risk(self, lat, lng, distance=None):
+        """Calculate flood risk based on location"""
+        if distance is None:
+            distance = self._distance_from_coast(lat, lng)
+        # Simulate flood risk calculation
+        coastal_factor = np.maximum(0, 1 - distance / 20)
+        river_factor = np.abs(np.sin(lat * 10) * np.cos(lng * 10))
+        elevation_factor = np.maximum(0, 1 - np.abs(lat + 33) * 0.1)  # Lower elevation = higher risk
+        
+        return np.minimum(1.0, (coastal_factor * 0.4 + river_factor * 0.4 + elevation_factor * 0.2))
+    
+    def _calculate_fire_base_risk(self, lat, lng, distance=None):
+        """Location-driven part of bushfire risk, before vegetation density"""
+        if distance is None:
+            distance = self._distance_from_coast(lat, lng)
+        # Higher risk for inland and northern areas
+        inland_factor = np.minimum(1.0, distance / 100)
+        northern_factor = np.maximum(0, (lat + 20) / 15)  # More northern = higher risk
+        
+        return inland_factor * 0.3 + northern_factor * 0.4
+    
+    def _vegetation_factor(self, lat, lng):
+        """Mock vegetation density for scalar or array coordinates"""
+        return 0.6 + risk_noise(lat, lng, 'vegetation') * 0.4
+    
+    def _calculate_fire_risk(self, lat, lng, distance=None):
+        """Calculate bushfire risk"""
+        return np.minimum(1.0, self._calculate_fire_base_risk(lat, lng, distance) + self._vegetation_factor(lat, lng) * 0.3)
+    
+    def _calculate_coastal_risk(self, lat, lng, distance=None):
+        """Calculate coastal erosion risk"""
+        if distance is None:
+            distance = self._distance_from_coast(lat, lng)
+        return np.where(distance > 10, 0.0, np.where(distance > 5, 0.1, np.where(distance > 1, 0.3, 0.7)))
+    
+    def _calculate_subsidence_risk(self, lat, lng):
+        """Calculate subsidence risk"""
+        # Each mining area contributes within MINING_RADIUS_KM of its nearest vertex
+        return np.minimum(1.0, 0.1 + get_geo_reference().mining_influence(lat, lng))
+    
+    def _calculate_cyclone_risk(self, lat):
+        """Calculate cyclone risk based on latitude"""
+        return np.where(
+            lat > -20,
+            np.minimum(0.8, np.maximum(0.3, (lat + 20) / 15)),
+            np.where(lat > -25, 0.2, 0.05)
+        )
+    
+    def _calculate_heatwave_risk(self, lat, lng, distance=None):
+        """Calculate heatwave risk"""
+        if distance is None:
+            distance = self._distance_from_coast(lat, lng)
+        inland_factor = np.minimum(0.4, distance / 100)
+        northern_factor = np.minimum(0.4, (35 - np.abs(lat)) / 20)
+        base_risk = 0.2
+        
+        return np.minimum(1.0, base_risk + inland_factor + northern_factor)
+    
+    def _calculate_composite_risk(self, risks):
+        """Calculate weighted composite risk"""
+        weights = {
+            'flood': 0.25,
+            'fire': 0.25,
+            'coastal': 0.15,
+            'subsidence': 0.15,
+            'cyclone': 0.10,
+            'heatwave': 0.10
+        }
+        
+        composite = 0
+        for risk_type, weight in weights.items():
+            if risk_type in risks:
+                composite += risks[risk_type] * weight
+        
+        return composite
+    
+    def _calculate_risk_confidence(self, lat, lng):
+        """Calculate confidence in risk assessment"""
+        # Higher confidence for well-known areas
+        min_distance = get_geo_reference().distance_to_major_city(lat, lng)
+        
+        # Closer to major cities = higher confidence, reaching the floor ten degrees out
+        return np.maximum(0.5, 1 - min_distance / (10 * DEGREE_KM))
+    
+    def _distance_from_coast(self, lat, lng):
+        """Calculate approximate distance from Australian coast"""
+        # Great-circle km to the nearest indexed coastline vertex
+        return get_geo_reference().distance_to_coast(lat, lng)
+    
+    def _get_fallback_risks(self, lat, lng):
+        """Get fallback risk values"""
+        return {
+            'flood': 0.3,
+            'fire': 0.3,
+            'coastal': 0.1,
+            'subsidence': 0.1,
+            'cyclone': 0.1,
+            'heatwave': 0.2,
+            'composite': 0.25
+        }
+
+_UNSET = object()
+_weight_store = None
+_feature_store = _UNSET
+_risk_grid = _UNSET
+_resources_lock = threading.Lock()
+
+def get_weight_store() -> WeightStore:
+    """Process-wide weight store, opened on first use"""
+    global _weight_store
+    with _resources_lock:
+        if _weight_store is None:
+            _weight_store = WeightStore(
+                root=WEIGHTS_DIR,
+                architecture=ValuationWorker.ARCHITECTURE,
+                layout=ValuationWorker.LAYER_SHAPES,
+                members=int(os.getenv('XNODE_ENSEMBLE_SIZE', '3')),
+                seed=int(os.getenv('XNODE_WEIGHTS_SEED', '42'))
+            )
+        return _weight_store
+
+def get_feature_store() -> Optional[FeatureStore]:
+    """Process-wide feature store, or None when FEATURE_STORE_PATH is empty"""
+    global _feature_store
+    with _resources_lock:
+        if _feature_store is _UNSET:
+            _feature_store = FeatureStore(FEATURE_STORE_PATH) if FEATURE_STORE_PATH else None
+        return _feature_store
+
+def get_risk_grid(reload: bool = False) -> Optional[RiskGrid]:
+    """Process-wide memory-mapped risk grid, or None if it is missing or was built from other reference data"""
+    global _risk_grid
+    with _resources_lock:
+        if _risk_grid is _UNSET or reload:
+            _risk_grid = load_risk_grid(RISK_GRID_PATH, get_geo_reference().checksum) if RISK_GRID_PATH else None
+        return _risk_grid
@@ -0,0 +1,50 @@
+import pytest
+
+from src.routes.propguard import find_property_by_address
+from src.services.address_index import AddressIndex
+
+ADDRESSES = [
+    '123 Collins Street, Melbourne VIC 3000',
+    '124 Collins Street, Melbourne VIC 3000',
+    '234 Collins Street, Melbourne VIC 3000',
+    '50 Collins Street, Melbourne VIC 3000',
+    '77 Collins Street, Melbourne VIC 3000',
+    '456 George Street, Sydney NSW 2000',
+]
+
+
+def build_index():
+    return AddressIndex.build((address, {'address': address}) for address in ADDRESSES)
+
+
+def test_unknown_street_number_is_not_typo_corrected():
+    index = build_index()
+    assert index.find('123 collins st')['address'] == '123 Collins Street, Melbourne VIC 3000'
+    # 1234 is one edit from 123, 124 and 234, none of which is the address asked for
+    matched = [match.address for match in index.search('1234 collins st', limit=10)]
+    assert not [address for address in matched if address.split()[0] in ('123', '124', '234')]
+
+
+def test_misspelt_word_is_corrected():
+    match = build_index().search('456 goerge street sydney', limit=1)[0]
+    assert match.address == '456 George Street, Sydney NSW 2000'
+
+
+def test_word_corrected_to_street_type_does_not_seed():
+    assert build_index().search('stret', limit=5) == []
+
+
+@pytest.mark.parametrize('command, address', [
+    ('what about melbourne', '123 Collins Street, Melbourne VIC 3000'),
+    ('risk for brisbane', '789 Queen Street, Brisbane QLD 4000'),
+    ('show me george street', '456 George Street, Sydney NSW 2000'),
+    ('check the property on queen st', '789 Queen Street, Brisbane QLD 4000'),
+])
+def test_suburb_or_street_mention_finds_the_only_match(command, address):
+    assert find_property_by_address(command)['address'] == address
+
+
+def test_suburb_or_street_mention_shared_by_several_addresses_finds_nothing():
+    index = build_index()
+    assert index.find('what about melbourne') is None
+    assert index.find('show me george street')['address'] == '456 George Street, Sydney NSW 2000'
@@ -0,0 +1,32 @@
+import io
+
+from src.services import bulk_ingest
+from src.services.bulk_ingest import RecordError, iter_lines, iter_records
+
+
+def records(data: bytes, fmt: str):
+    return list(iter_records(iter_lines(io.BytesIO(data)), fmt))
+
+
+def test_overlong_ndjson_line_is_one_bad_record(monkeypatch):
+    monkeypatch.setattr(bulk_ingest, 'MAX_LINE_BYTES', 50)
+    result = records(b'{"a": 1}\n{"address": "' + b'x' * 200 + b'"}\n{"b": 2}\n', 'ndjson')
+    assert [index for index, _ in result] == [0, 1, 2]
+    assert result[0][1] == {'a': 1} and result[2][1] == {'b': 2}
+    assert isinstance(result[1][1], RecordError)
+
+
+def test_line_limit_counts_bytes_not_characters(monkeypatch):
+    monkeypatch.setattr(bulk_ingest, 'MAX_LINE_BYTES', 50)
+    # 20 characters but 60 bytes of UTF-8
+    result = records(('{"a": "' + '€' * 20 + '"}\n{"b": 2}\n').encode(), 'ndjson')
+    assert isinstance(result[0][1], RecordError)
+    assert result[1] == (1, {'b': 2})
+
+
+def test_overlong_csv_row_is_one_bad_record(monkeypatch):
+    monkeypatch.setattr(bulk_ingest, 'MAX_LINE_BYTES', 50)
+    result = records(b'address,bedrooms\n1 A St,3\n"' + b'y' * 300 + b'",2\n2 B St,4\n', 'csv')
+    assert [index for index, _ in result] == [0, 1, 2]
+    assert isinstance(result[1][1], RecordError)
+    assert result[2][1] == {'address': '2 B St', 'bedrooms': '4'}
@@ -0,0 +1,18 @@
+import numpy as np
+import pytest
+
+from src.routes.ai_features import ClimateRiskCalculator
+
+
+def test_scalar_and_batch_risk_factors_agree():
+    rng = np.random.default_rng(3)
+    # Random Australian points plus the edges of the cyclone and mining bands
+    lats = np.concatenate([rng.uniform(-44, -10, 500), [-33.8688, -20, -25, -32, -28]])
+    lngs = np.concatenate([rng.uniform(112, 154, 500), [151.2093, 140, 148, 150, 152]])
+    batch = ClimateRiskCalculator.get_risk_factors_batch(lats, lngs)
+    for i, (lat, lng) in enumerate(zip(lats.tolist(), lngs.tolist())):
+        scalar = ClimateRiskCalculator._compute_risk_factors(lat, lng)
+        assert set(scalar) == set(batch)
+        for name, value in scalar.items():
+            assert isinstance(value, float)
+            assert value == pytest.approx(float(batch[name][i]), abs=1e-12), (name, lat, lng)
@@ -0,0 +1,50 @@
+import pytest
+from flask import Flask
+
+from src.routes.ai_features import ai_features_bp
+from src.services.monte_carlo import MonteCarloEngine
+
+URL = '/api/risk-simulation/monte-carlo'
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(ai_features_bp, url_prefix='/api')
+    return app.test_client()
+
+
+def test_seeded_address_run_is_reproducible(client):
+    body = {'location': 'Sydney', 'seed': 7, 'simulations': 1000}
+    assert client.post(URL, json=body).get_json() == client.post(URL, json=body).get_json()
+
+
+@pytest.mark.parametrize('item', [
+    {'value': 'abc'},
+    {'value': 'nan'},
+    {'value': 1e6, 'loan_amount': 'abc'},
+    {'value': 1e6, 'risks': 'high'},
+    {'value': 1e6, 'risks': {'flood': 'high'}},
+    {'value': 1e6, 'risks': {'flood': 2}},
+])
+def test_invalid_property_is_rejected(client, item):
+    assert client.post(URL, json={'properties': [item]}).status_code == 400
+
+
+def test_high_hazard_score_is_not_certain():
+    result = MonteCarloEngine(1000, seed=1).simulate([{'value': 1e6, 'risks': {'flood': 1.0, 'fire': 0.0}}])
+    assert 0.5 < result['properties'][0]['shock_probabilities']['flood'] < 0.95
+
+
+@pytest.mark.parametrize('options', [
+    {'simulations': [1]},
+    {'simulations': 'many'},
+    {'simulations': 1000, 'seed': [1]},
+    {'simulations': 1000, 'seed': -1},
+    {'simulations': 1000, 'correlation': 'high'},
+    {'simulations': 1000, 'market_probabilities': [0.3]},
+    {'simulations': 1000, 'market_probabilities': {'economic_downturn': 'likely'}},
+])
+def test_malformed_engine_options_are_rejected_by_both_routes(client, options):
+    assert client.post('/api/risk-simulation', json=dict(options, location='Sydney')).status_code == 400
+    assert client.post(URL, json=dict(options, location='Sydney')).status_code == 400
@@ -0,0 +1,34 @@
+import numpy as np
+
+from src.services.columnar_io import ColumnarWriter
+from src.services.portfolio_stress import SUMMARY_PERCENTILES, SUMMARY_RESOLUTION, ScenarioSummary
+
+
+def test_streamed_summary_matches_whole_book():
+    rng = np.random.default_rng(0)
+    summary = ScenarioSummary()
+    chunks = [(rng.random(500) * 1.5, rng.random(500) * 0.3, rng.random(500) * 1e6, rng.random(500) > 0.1)
+              for _ in range(20)]
+    for chunk in chunks:
+        summary.add(*chunk)
+    lvr, _, exposure, compliant = (np.concatenate(column) for column in zip(*chunks))
+
+    result = summary.result()
+    assert result['loans'] == len(lvr)
+    assert result['apra_breaches'] == int((~compliant).sum())
+    assert result['exposure_weighted_lvr'] == round(float((lvr * exposure).sum() / exposure.sum()), 4)
+    for p, expected in zip(SUMMARY_PERCENTILES, np.percentile(lvr, SUMMARY_PERCENTILES)):
+        assert abs(result['lvr']['percentiles'][f"p{p}"] - expected) <= 2 * SUMMARY_RESOLUTION
+
+
+def test_npz_writer_concatenates_chunks(tmp_path):
+    chunks = [{'loan_id': np.array(['L1', 'L22'], dtype=object), 'lvr': np.array([0.5, 0.9])},
+              {'loan_id': np.array(['L333'], dtype=object), 'lvr': np.array([1.1])}]
+    writer = ColumnarWriter(str(tmp_path / 'stress.npz'))
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.close()
+
+    with np.load(tmp_path / 'stress.npz') as saved:
+        assert saved['loan_id'].tolist() == ['L1', 'L22', 'L333']
+        assert saved['lvr'].tolist() == [0.5, 0.9, 1.1]
@@ -0,0 +1,12 @@
+from src.routes.ai_features import PropertyGeocoder, ClimateRiskCalculator, climate_risk_cache
+
+
+def test_repeated_address_hits_the_risk_cache():
+    first = PropertyGeocoder.address_to_coords('1 Example Street, Melbourne VIC 3000')
+    second = PropertyGeocoder.address_to_coords('1 Example Street, Melbourne VIC 3000')
+    assert (first['lat'], first['lng']) == (second['lat'], second['lng'])
+
+    hits = climate_risk_cache.stats()['hits']
+    ClimateRiskCalculator.get_risk_factors(first['lat'], first['lng'])
+    ClimateRiskCalculator.get_risk_factors(second['lat'], second['lng'])
+    assert climate_risk_cache.stats()['hits'] >= hits + 1
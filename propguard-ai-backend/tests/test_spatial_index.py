@@ -0,0 +1,28 @@
+import numpy as np
+
+from src.services.spatial_index import MINING_RADIUS_KM, load_geo_reference
+
+
+def write_mining_areas(directory, rows):
+    with open(directory / 'mining_areas.csv', 'w') as f:
+        f.write('area,lat,lng,risk_level\n')
+        f.writelines(f"{area},{lat},{lng},{level}\n" for area, lat, lng, level in rows)
+
+
+def test_point_deep_inside_mining_polygon_gets_full_influence(tmp_path):
+    # A 3 x 3 degree footprint: its centre is over 2 degrees from every corner
+    write_mining_areas(tmp_path, [('Basin', -22, 149, 0.5), ('Basin', -22, 152, 0.5),
+                                  ('Basin', -25, 152, 0.5), ('Basin', -25, 149, 0.5)])
+    geo = load_geo_reference(str(tmp_path))
+    influence = geo.mining_influence(np.array([-23.5, -23.5, -30.0]), np.array([150.5, 148.9, 150.5]))
+    assert influence[0] == 0.5
+    # Just outside the western edge: distance-based and below the full level
+    assert 0 < influence[1] < 0.5
+    assert influence[2] == 0
+
+
+def test_point_sites_are_scored_by_distance(tmp_path):
+    write_mining_areas(tmp_path, [('Pit', -30, 150, 0.4), ('Pit', -30, 150.01, 0.4)])
+    geo = load_geo_reference(str(tmp_path))
+    assert geo.mining_influence(-30.0, 150.005) > 0.39
+    assert 0 < float(geo.mining_influence(-30.0, 150 + MINING_RADIUS_KM / 200)) < 0.4
@@ -0,0 +1,49 @@
+import asyncio
+import subprocess
+import sys
+
+import numpy as np
+
+from src.services import xnode_workers
+from src.services.feature_store import FeatureStore
+from src.services.xnode_cluster import PACKAGE_ROOT, XNodeProcessCluster
+
+ITEMS = [
+    {
+        'property_id': f'CL-{i}',
+        'property_data': {'address': f'{i} Cluster Road, Sydney', 'bedrooms': i % 5 + 1, 'land_size': 400 + i},
+        'comparables': [{'price': 850000 + i * 1000, 'sale_date': '2024-03-01', 'floor_area': 140}],
+        'risk_data': {'composite': 0.2},
+        'market_factors': {'interest_rates': 0.04}
+    }
+    for i in range(20)
+]
+
+
+def test_process_entrypoint_does_not_import_routes():
+    code = "import sys, src.services.xnode_process; print(any(m.startswith(('src.routes', 'flask')) for m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', code], cwd=PACKAGE_ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == 'False'
+
+
+def test_process_builds_features_and_values_like_a_local_worker(tmp_path, monkeypatch):
+    monkeypatch.setenv('XNODE_FEATURE_STORE', str(tmp_path / 'remote.db'))
+    monkeypatch.setattr(xnode_workers, '_feature_store', FeatureStore(str(tmp_path / 'local.db')))
+    local = xnode_workers.ValuationWorker('val_node_0', member=0)
+    expected = asyncio.run(local.calculate_batch(ITEMS))
+
+    cluster = XNodeProcessCluster(1, [
+        {'kind': 'valuation', 'node_id': 'val_node_0', 'dtype': '<f8', 'member': 0},
+        {'kind': 'risk', 'node_id': 'risk_node_0'}
+    ])
+    try:
+        results = cluster.value_batch('val_node_0', ITEMS, batch_key='batch-1', mode='inference')
+        rows, errors = cluster.assess_risk('risk_node_0', [(-33.87, 151.21)])
+    finally:
+        cluster.shutdown()
+
+    assert [result['value'] for result in results] == [result['value'] for result in expected]
+    # The process wrote the feature vectors to the store it opened itself
+    assert len(FeatureStore(str(tmp_path / 'remote.db'))) == len(ITEMS)
+    assert not errors
+    assert np.allclose(rows, xnode_workers.RiskWorker('risk_node_0').risk_rows([(-33.87, 151.21)]))
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+from flask import Flask
+
+from src.routes import xnode
+from src.services import xnode_workers
+from src.services.feature_store import FeatureStore
+
+PROPERTY = {
+    'property_data': {'address': '7 Feature Store Lane', 'floor_area': 142, 'year_built': 1998, 'bedrooms': 3},
+    'comparables': [{'price': 910000, 'sale_date': '2024-01-15', 'floor_area': 150}],
+    'risk_data': {'composite': 0.2}
+}
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(xnode_workers, '_feature_store', FeatureStore(str(tmp_path / 'features.db')))
+    app = Flask(__name__)
+    app.register_blueprint(xnode.xnode_bp, url_prefix='/api/xnode')
+    return app.test_client()
+
+
+def value_batch(client, items):
+    response = client.post('/api/xnode/distributed-valuation/batch', json={'properties': items})
+    assert response.status_code == 200
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_cached_valuation_still_writes_feature_vector(client):
+    first = value_batch(client, [dict(PROPERTY)])[0]
+    assert first['success']
+
+    # Same inputs under a property_id: served from the computation cache
+    cached = value_batch(client, [dict(PROPERTY, property_id='FS-1')])[0]
+    assert cached['success']
+    assert all(result.get('cached') for result in cached['individual_results'])
+    assert xnode_workers.get_feature_store().get('FS-1') is not None
+
+    by_id = value_batch(client, [{'property_id': 'FS-1'}])[0]
+    assert by_id['success'], by_id
+    assert by_id['consensus_result']['final_value'] == first['consensus_result']['final_value']
+
+
+def test_health_reports_empty_feature_store(client):
+    health = client.get('/api/xnode/xnode-health').get_json()
+    assert health['cluster_health']['cluster_stats']['feature_store'] is not None
+
+
+@pytest.mark.parametrize('options', [{'mc_samples': None}, {'mc_samples': [4]}, {'mc_samples': 'many'},
+                                     {'engine': ['batched']}])
+def test_malformed_inference_options_are_rejected(client, options):
+    for path in ('/api/xnode/distributed-valuation', '/api/xnode/distributed-valuation/batch'):
+        body = dict(PROPERTY, **options) if path.endswith('valuation') else dict({'properties': [PROPERTY]}, **options)
+        assert client.post(path, json=body).status_code == 400